@@ -0,0 +1,304 @@
+import os
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+
+def _soma_por(bloco, chave):
+    """Soma o valor do bloco agrupando pela chave (índice sem categorias)."""
+    soma = bloco.groupby(chave, observed=True)['valor'].sum()
+    if isinstance(soma.index, pd.CategoricalIndex):
+        soma.index = soma.index.astype(object)
+    return soma
+
+
+def _acumular(atual, novo):
+    """Soma duas séries de agregados alinhando pelo índice."""
+    if atual is None:
+        return novo
+    if novo is None:
+        return atual
+    return atual.add(novo, fill_value=0)
+
+
+def _contar_caixas(caixas):
+    """Série número da caixa -> quantidade de valores nela."""
+    numeros, contagens = np.unique(caixas, return_counts=True)
+    return pd.Series(contagens, index=numeros)
+
+
+# Largura inicial das caixas do histograma (na unidade do valor) e o máximo de
+# caixas guardadas; passando disso a largura dobra
+LARGURA_HISTOGRAMA = 1.0
+MAX_CAIXAS_HISTOGRAMA = 4096
+
+# Erro relativo máximo dos quantis e máximo de caixas de cada sinal no esboço
+PRECISAO_QUANTIS = 0.01
+MAX_CAIXAS_QUANTIS = 2048
+
+
+class Histograma:
+    """Contagem dos valores em caixas de largura fixa [k * largura, (k + 1) * largura).
+
+    A memória fica limitada a `max_caixas`: se passar disso a largura dobra e as
+    caixas vizinhas se juntam. As caixas são sempre alinhadas em zero, então
+    dois histogramas podem ser combinados na maior das duas larguras.
+    """
+
+    def __init__(self, largura=LARGURA_HISTOGRAMA, max_caixas=MAX_CAIXAS_HISTOGRAMA):
+        self.largura = largura
+        self.max_caixas = max_caixas
+        self.contagens = None  # Série: número da caixa -> quantidade de valores
+
+    def atualizar(self, valores):
+        """Conta os valores de um bloco."""
+        outro = Histograma(self.largura, self.max_caixas)
+        outro.contagens = _contar_caixas(np.floor(np.asarray(valores, dtype=float) / self.largura).astype(np.int64))
+        return self.combinar(outro)
+
+    def combinar(self, outro):
+        """Soma as contagens de outro histograma."""
+        contagens, largura = outro.contagens, outro.largura
+        if contagens is None:
+            return self
+        while self.largura < largura:
+            self._dobrar()
+        while largura < self.largura:
+            contagens = contagens.groupby(contagens.index // 2).sum()
+            largura *= 2
+        self.contagens = _acumular(self.contagens, contagens)
+        while len(self.contagens) > self.max_caixas:
+            self._dobrar()
+        return self
+
+    def _dobrar(self):
+        if self.contagens is not None:
+            self.contagens = self.contagens.groupby(self.contagens.index // 2).sum()
+        self.largura *= 2
+
+    def caixas(self, maximo=None):
+        """(início de cada caixa, contagens, largura), com no máximo `maximo` caixas.
+
+        Para caber em `maximo`, grupos de caixas vizinhas viram uma só (a largura
+        devolvida é a das caixas juntadas). Caixas vazias não aparecem.
+        """
+        if self.contagens is None:
+            return np.array([]), np.array([]), self.largura
+        contagens = self.contagens.sort_index()
+        numeros = contagens.index.to_numpy()
+        fator = 1
+        if maximo:
+            fator = max(1, -(-(numeros[-1] - numeros[0] + 1) // maximo))
+        grupos = (numeros - numeros[0]) // fator
+        somas = contagens.groupby(grupos).sum()
+        inicio = (numeros[0] + somas.index.to_numpy() * fator) * self.largura
+        return inicio, somas.to_numpy(), self.largura * fator
+
+
+class EsbocoQuantis:
+    """Esboço de quantis com erro relativo limitado (a ideia do DDSketch).
+
+    Um valor positivo x cai na caixa ceil(log_gama(x)), com gama =
+    (1 + precisao) / (1 - precisao); os negativos vão, pelo módulo, para outro
+    conjunto de caixas e os zeros são só contados. Todo valor da caixa fica a no
+    máximo `precisao` (relativo) do representante dela, então o quantil também.
+    Acima de `max_caixas` caixas de um sinal, as de menor módulo são juntadas
+    (só os valores mais perto de zero perdem precisão).
+    """
+
+    def __init__(self, precisao=PRECISAO_QUANTIS, max_caixas=MAX_CAIXAS_QUANTIS):
+        self.precisao = precisao
+        self.gama = (1 + precisao) / (1 - precisao)
+        self.max_caixas = max_caixas
+        self.positivos = None  # Série: caixa -> quantidade de valores
+        self.negativos = None
+        self.zeros = 0
+        self.n = 0
+
+    def atualizar(self, valores):
+        """Conta os valores de um bloco."""
+        valores = np.asarray(valores, dtype=float)
+        outro = EsbocoQuantis(self.precisao, self.max_caixas)
+        for nome, modulos in [('positivos', valores[valores > 0]), ('negativos', -valores[valores < 0])]:
+            if len(modulos):
+                setattr(outro, nome, _contar_caixas(np.ceil(np.log(modulos) / np.log(self.gama)).astype(np.int64)))
+        outro.zeros = int((valores == 0).sum())
+        outro.n = len(valores)
+        return self.combinar(outro)
+
+    def combinar(self, outro):
+        """Soma as contagens de outro esboço (com a mesma precisão)."""
+        self.positivos = self._limitar(_acumular(self.positivos, outro.positivos))
+        self.negativos = self._limitar(_acumular(self.negativos, outro.negativos))
+        self.zeros += outro.zeros
+        self.n += outro.n
+        return self
+
+    def _limitar(self, caixas):
+        if caixas is None or len(caixas) <= self.max_caixas:
+            return caixas
+        caixas = caixas.sort_index()
+        excesso = len(caixas) - self.max_caixas + 1
+        restantes = caixas.iloc[excesso:].copy()
+        restantes.iloc[0] += caixas.iloc[:excesso].sum()
+        return restantes
+
+    def _representante(self, caixas):
+        # Valor da caixa (gama^(k-1), gama^k] a no máximo `precisao` de qualquer ponto dela
+        return 2 * self.gama ** caixas.astype(float) / (self.gama + 1)
+
+    def valores_ordenados(self):
+        """Representantes das caixas em ordem crescente e suas contagens."""
+        valores, contagens = [], []
+        if self.negativos is not None:
+            negativos = self.negativos.sort_index(ascending=False)
+            valores.append(-self._representante(negativos.index.to_numpy()))
+            contagens.append(negativos.to_numpy())
+        if self.zeros:
+            valores.append(np.zeros(1))
+            contagens.append(np.array([self.zeros]))
+        if self.positivos is not None:
+            positivos = self.positivos.sort_index()
+            valores.append(self._representante(positivos.index.to_numpy()))
+            contagens.append(positivos.to_numpy())
+        if not valores:
+            return np.array([]), np.array([])
+        return np.concatenate(valores), np.concatenate(contagens)
+
+    def quantil(self, q):
+        """Quantil com interpolação linear (como o pandas), com o erro do esboço."""
+        if not self.n:
+            return float('nan')
+        valores, contagens = self.valores_ordenados()
+        acumulado = np.cumsum(contagens)
+        posicao = (self.n - 1) * q
+        abaixo = int(np.floor(posicao))
+        acima = min(abaixo + 1, self.n - 1)
+        valor_abaixo = valores[np.searchsorted(acumulado, abaixo, side='right')]
+        valor_acima = valores[np.searchsorted(acumulado, acima, side='right')]
+        return float(valor_abaixo + (posicao - abaixo) * (valor_acima - valor_abaixo))
+
+
+# Agregados existentes, para as travas atravessarem o fork (modo 'processo' do
+# paralelo.py): seguradas durante o fork, o filho nunca herda uma trava presa
+# por uma thread que não existe nele nem um agregado pela metade
+_instancias = weakref.WeakSet()
+
+
+def _travar_todos():
+    for agregados in list(_instancias):
+        agregados.trava.acquire()
+
+
+def _liberar_todos():
+    for agregados in list(_instancias):
+        agregados.trava.release()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_travar_todos, after_in_parent=_liberar_todos, after_in_child=_liberar_todos)
+
+
+class AgregadosVendas:
+    """Agregados de vendas que podem ser atualizados bloco a bloco.
+
+    Guarda as somas por produto, região, (ano, mês), data e dia da semana, o
+    estado de média/variância (n, média, M2), um histograma de largura fixa e
+    um esboço para os quantis, ambos com memória limitada. Dois agregados podem
+    ser combinados, então blocos podem ser processados separadamente.
+
+    As escritas (combinar) e as leituras de mais de um campo acontecem com
+    `trava`; quem lê os atributos diretamente deve segurá-la também.
+    """
+
+    def __init__(self):
+        self.trava = threading.RLock()
+        self.por_produto = None
+        self.por_regiao = None
+        self.por_ano_mes = None
+        self.por_data = None
+        self.por_dia_da_semana = None
+        self.histograma = Histograma()
+        self.quantis = EsbocoQuantis()
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0  # Soma dos quadrados das diferenças para a média
+        self._acumulada = None  # Série acumulada por data, estendida a cada bloco
+        _instancias.add(self)
+
+    def atualizar(self, bloco):
+        """Incorpora um bloco de vendas já limpo (agrupado fora da trava)."""
+        if bloco.empty:
+            return self
+        outro = AgregadosVendas()
+        outro.por_produto = _soma_por(bloco, 'produto')
+        outro.por_regiao = _soma_por(bloco, 'regiao')
+        outro.por_ano_mes = _soma_por(bloco, ['ano', 'mes'])
+        outro.por_data = _soma_por(bloco, 'data')
+        outro.por_dia_da_semana = _soma_por(bloco, 'dia_da_semana')
+
+        valores = bloco['valor'].to_numpy(dtype=float)
+        outro.histograma.atualizar(valores)
+        outro.quantis.atualizar(valores)
+        outro.n = len(valores)
+        outro.media = valores.mean()
+        outro.m2 = ((valores - outro.media) ** 2).sum()
+        return self.combinar(outro)
+
+    def combinar(self, outro):
+        """Incorpora outro agregado (fórmula de Chan para média e variância)."""
+        with self.trava:
+            self._estender_acumulada(outro.por_data)
+            self.por_produto = _acumular(self.por_produto, outro.por_produto)
+            self.por_regiao = _acumular(self.por_regiao, outro.por_regiao)
+            self.por_ano_mes = _acumular(self.por_ano_mes, outro.por_ano_mes)
+            self.por_data = _acumular(self.por_data, outro.por_data)
+            self.por_dia_da_semana = _acumular(self.por_dia_da_semana, outro.por_dia_da_semana)
+            self.histograma.combinar(outro.histograma)
+            self.quantis.combinar(outro.quantis)
+
+            n = self.n + outro.n
+            if n:
+                delta = outro.media - self.media
+                self.media += delta * outro.n / n
+                self.m2 += outro.m2 + delta ** 2 * self.n * outro.n / n
+            self.n = n
+        return self
+
+    def _estender_acumulada(self, novas_datas):
+        """Mantém a série acumulada: se as datas novas vêm depois da última, só estende."""
+        if self._acumulada is None or novas_datas is None or novas_datas.empty:
+            return  # nada a estender (ex.: bloco só com datas inválidas)
+        novas_datas = novas_datas.sort_index()
+        if len(self._acumulada) and novas_datas.index[0] <= self._acumulada.index[-1]:
+            self._acumulada = None  # chegou venda antiga: recalcula na próxima consulta
+            return
+        ultimo = self._acumulada.iloc[-1] if len(self._acumulada) else 0.0
+        self._acumulada = pd.concat([self._acumulada, novas_datas.cumsum() + ultimo])
+
+    def serie_diaria(self):
+        """Soma das vendas por data, ordenada pela data."""
+        with self.trava:
+            por_data = self.por_data
+        return por_data.sort_index().rename_axis('data').rename('valor')
+
+    def serie_acumulada(self):
+        """Vendas acumuladas por data (mantida incrementalmente entre atualizações)."""
+        with self.trava:
+            if self._acumulada is None:
+                self._acumulada = self.serie_diaria().cumsum()
+            return self._acumulada
+
+    def desvio(self):
+        """Desvio padrão amostral (ddof=1, igual ao pandas)."""
+        with self.trava:
+            if self.n < 2:
+                return float('nan')
+            return (self.m2 / (self.n - 1)) ** 0.5
+
+    def quantil(self, q):
+        """Quantil com interpolação linear, a no máximo PRECISAO_QUANTIS (relativo) do exato."""
+        with self.trava:
+            return self.quantis.quantil(q)
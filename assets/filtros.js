@@ -0,0 +1,107 @@
+// Modo cliente (DASH_MODO_CLIENTE): dados pequenos vão uma única vez para um
+// dcc.Store e o filtro e a montagem dos traços acontecem aqui, no navegador.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    linguagens: {
+        // aula2.py: dados.tracos[linguagem] já tem o traço de cada linguagem,
+        // montado no servidor com o mesmo código do callback normal. Como em
+        // figuras_leves.tracos_por_serie, acima de dados.limite_webgl pontos
+        // no total os traços passam para scattergl.
+        montar_grafico: function (linguagens_selecionadas, dados) {
+            var tracos = [];
+            (linguagens_selecionadas || []).forEach(function (linguagem) {
+                tracos = tracos.concat(dados.tracos[linguagem] || []);
+            });
+            var pontos = tracos.reduce(function (soma, traco) { return soma + traco.x.length; }, 0);
+            if (pontos > dados.limite_webgl) {
+                tracos = tracos.map(function (traco) { return Object.assign({}, traco, {type: 'scattergl'}); });
+            }
+            return {data: tracos, layout: dados.layout};
+        }
+    },
+
+    cubo: {
+        // lalala.py: visual02 e visual03 a partir do cubo (Categorias, Mes, Loja).
+        // Segue os mesmos filtros do servidor e o groupby(['Mes', 'Loja'],
+        // observed=True): grupos ordenados pelos códigos de Mes e Loja.
+        visual02_03: function (mes, categoria, ligado, cubo, config) {
+            var linhas = cubo.linhas;
+
+            var todas_categorias = categoria === null || categoria === undefined || categoria === 'todas_categorias';
+            var codigo_categoria = cubo.categorias.indexOf(categoria);
+            var todos_meses = !mes || mes.length === 0 || mes.indexOf('ano_completo') >= 0;
+            var meses_selecionados = {};
+            (mes || []).forEach(function (m) { meses_selecionados[m] = true; });
+
+            function agrupar(usar_mes) {
+                var somas = {};
+                for (var i = 0; i < linhas.total.length; i++) {
+                    // código -1: linha sem categoria, só entra em "todas as categorias"
+                    if (!todas_categorias && (codigo_categoria < 0 || linhas.categoria[i] !== codigo_categoria)) continue;
+                    if (usar_mes && !todos_meses && !meses_selecionados[cubo.meses[linhas.mes[i]]]) continue;
+                    var chave = linhas.mes[i] * cubo.lojas.length + linhas.loja[i];
+                    somas[chave] = (somas[chave] || 0) + linhas.total[i];
+                }
+                return Object.keys(somas).map(Number).sort(function (a, b) { return a - b; }).map(function (chave) {
+                    return {
+                        mes: cubo.meses[Math.floor(chave / cubo.lojas.length)],
+                        loja: cubo.lojas[chave % cubo.lojas.length],
+                        total: somas[chave]
+                    };
+                });
+            }
+
+            function layout_com_tema(layout, indice) {
+                var tema = config.temas[indice][ligado ? 0 : 1];
+                return Object.assign({}, layout, {template: config.templates[tema]});
+            }
+
+            // visual02: uma bolha por loja, com o tamanho normalizado entre o menor e o maior total
+            var grupos2 = agrupar(false);
+            var fig2 = {data: [], layout: layout_com_tema(cubo.visual02.layout, 1)};
+            if (grupos2.length) {
+                var totais = grupos2.map(function (g) { return g.total; });
+                var maximo = Math.max.apply(null, totais);
+                var minimo = Math.min.apply(null, totais);
+                if (maximo === minimo) {
+                    fig2 = {};  // o servidor também não monta essa figura (tamanhos NaN)
+                } else {
+                    var lojas = [];
+                    grupos2.forEach(function (g) { if (lojas.indexOf(g.loja) < 0) lojas.push(g.loja); });
+                    var base = cubo.visual02.traco;
+                    fig2.data = lojas.map(function (loja) {
+                        var da_loja = grupos2.filter(function (g) { return g.loja === loja; });
+                        var cor = cubo.cores[loja] || 'black';
+                        return Object.assign({}, base, {
+                            x: da_loja.map(function (g) { return g.mes; }),
+                            y: da_loja.map(function (g) { return g.total; }),
+                            name: String(loja),
+                            marker: Object.assign({}, base.marker, {
+                                color: cor,
+                                size: da_loja.map(function (g) { return (g.total - minimo) / (maximo - minimo) * 50; }),
+                                line: Object.assign({}, base.marker.line, {color: cor})
+                            })
+                        });
+                    });
+                }
+            }
+
+            // visual03: radar com o total de cada (mês, loja)
+            var grupos3 = agrupar(true);
+            var fig3 = {};  // sem dados o servidor também não monta a figura
+            if (grupos3.length) {
+                var r = grupos3.map(function (g) { return g.total; });
+                var layout3 = layout_com_tema(cubo.visual03.layout, 2);
+                var polar = layout3.polar;
+                layout3.polar = Object.assign({}, polar, {
+                    radialaxis: Object.assign({}, polar.radialaxis, {range: [0, Math.max.apply(null, r) + 1000]})
+                });
+                fig3 = {
+                    data: [Object.assign({}, cubo.visual03.traco, {r: r, theta: grupos3.map(function (g) { return g.loja; })})],
+                    layout: layout3
+                };
+            }
+
+            return [fig2, fig3];
+        }
+    }
+});
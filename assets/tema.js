@@ -0,0 +1,21 @@
+// Callbacks executados no navegador (clientside) pelos apps Dash do projeto.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    tema: {
+        // Troca o template das figuras já exibidas quando o switch de tema muda.
+        // config.temas[i] = [tema com o switch ligado, tema com o switch desligado]
+        // da i-ésima figura; config.templates tem o template de cada tema.
+        trocar_template: function (ligado) {
+            var figuras = Array.prototype.slice.call(arguments, 1, arguments.length - 1);
+            var config = arguments[arguments.length - 1];
+
+            return figuras.map(function (figura, i) {
+                if (!figura || !figura.layout) {
+                    return window.dash_clientside.no_update;
+                }
+                var tema = config.temas[i][ligado ? 0 : 1];
+                var layout = Object.assign({}, figura.layout, {template: config.templates[tema]});
+                return Object.assign({}, figura, {layout: layout});
+            });
+        }
+    }
+});
@@ -1,68 +1,421 @@
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import matplotlib.pyplot as plt
 import io
+import os
 import base64
+import threading
+import weakref
+
+from agregados import AgregadosVendas
+import figuras_leves
+from figuras_leves import Esqueleto, com, vazio
+from planejador import Grafico, PlanejadorDeGraficos
+from reducao import intervalo_zoom, reduzir
+from instrumentacao import etapa, instrumentar_callback, registrar_rota
+from carregador import DIMENSOES_VENDAS, carregar_vendas, contar_linhas_completas, ler_vendas_em_blocos, limpar_vendas
 
 # Inicializando o app Dash
 app = dash.Dash(__name__)
+registrar_rota(app.server)  # /metrics, com DASH_METRICAS=1 (ver instrumentacao.py)
+
+def _ler_cabecalho(caminho):
+    """Retorna os nomes das colunas do CSV."""
+    with open(caminho, encoding='utf-8') as arquivo:
+        return arquivo.readline().strip().split(',')
+
+# Figuras de linha: montadas pelo plotly (funções *_plotly) ou, no caminho
+# rápido, a partir de um esqueleto validado uma única vez, trocando só os dados
+# (ver figuras_leves.py). Sem dados, o plotly monta a figura.
+def figura_mensal_plotly(df_mes, ano_filtrado):
+    return px.line(df_mes, x='mes', y='valor', color='ano', title=f'Vendas Mensais - {ano_filtrado}', markers=True, line_shape='spline')
+
+def figura_mensal(df_mes, ano_filtrado):
+    if not figuras_leves.ATIVO or vazio(df_mes['valor']):
+        return figura_mensal_plotly(df_mes, ano_filtrado)
+    return {
+        'data': [com(esqueleto_mensal.traco(ano_filtrado), x=df_mes['mes'].to_numpy(), y=df_mes['valor'].to_numpy())],
+        'layout': esqueleto_mensal.layout(ano_filtrado)
+    }
+
+def figura_diaria_plotly(df_dia):
+    return px.line(df_dia, x='data', y='valor', title='Vendas Diárias', markers=True)
+
+def figura_diaria(df_dia):
+    if not figuras_leves.ATIVO or vazio(df_dia['valor']):
+        return figura_diaria_plotly(df_dia)
+    return {
+        'data': [com(esqueleto_diario.traco(_usa_webgl(df_dia)), x=df_dia['data'].to_numpy(), y=df_dia['valor'].to_numpy())],
+        'layout': esqueleto_diario.layout(_usa_webgl(df_dia))
+    }
+
+def figura_acumulada_plotly(df_acumulado, maximo_historico, minimo_historico):
+    # Criação do gráfico
+    fig = px.line(
+        df_acumulado, 
+        x='data', 
+        y=['valor', 'media_movel_7', 'max_valor', 'min_valor'], 
+        title='Vendas Acumuladas ao Longo do Tempo com Insights Estatísticos',
+        labels={'valor': 'Vendas Acumuladas', 'media_movel_7': 'Média Móvel (7 dias)', 'max_valor': 'Máximo Acumulado', 'min_valor': 'Mínimo Acumulado'},
+        markers=True
+    )
+
+    # Adicionando o crescimento percentual ao gráfico como uma linha de anotações
+    fig.add_trace(
+        go.Scatter(
+            x=df_acumulado['data'],
+            y=df_acumulado['crescimento_percentual'],
+            mode='lines+markers',
+            name='Crescimento Percentual',
+            line=dict(color='orange', width=2, dash='dot'),
+            yaxis='y2'
+        )
+    )
+    
+    # Estilização do gráfico
+    fig.update_layout(
+        title_font=dict(size=20, family='Poppins', color='#2980B9'),
+        plot_bgcolor="#34495E",  # Fundo escuro para o gráfico
+        paper_bgcolor="#2C3E50",  # Fundo do papel
+        font=dict(color='#ECF0F1', family='Roboto'),
+        xaxis=dict(
+            title='Data',
+            tickformat='%Y-%m-%d',
+            showgrid=True,
+            gridcolor='#7f8c8d',
+            tickangle=45
+        ),
+        yaxis=dict(
+            title='Vendas Acumuladas',
+            showgrid=True,
+            gridcolor='#7f8c8d',
+        ),
+        yaxis2=dict(
+            title='Crescimento Percentual (%)',
+            overlaying='y',
+            side='right',
+            showgrid=False,
+            tickformat='.1f'
+        ),
+        legend=dict(
+            title="Métricas",
+            orientation="h",
+            yanchor="bottom",
+            y=1.1,
+            xanchor="center",
+            x=0.5
+        ),
+        hovermode="x unified",
+        autosize=True,
+        margin=dict(t=50, b=50, l=40, r=40),
+        shapes=[
+            dict(
+                type="line",
+                x0=df_acumulado['data'].min(),
+                x1=df_acumulado['data'].max(),
+                y0=maximo_historico,
+                y1=maximo_historico,
+                line=dict(color="red", width=2, dash='dash'),
+                name="Máximo Histórico"
+            ),
+            dict(
+                type="line",
+                x0=df_acumulado['data'].min(),
+                x1=df_acumulado['data'].max(),
+                y0=minimo_historico,
+                y1=minimo_historico,
+                line=dict(color="green", width=2, dash='dash'),
+                name="Mínimo Histórico"
+            )
+        ]
+    )
+
+    return fig
+
+def figura_acumulada(df_acumulado, maximo_historico, minimo_historico):
+    if not figuras_leves.ATIVO or vazio(df_acumulado['valor']):
+        return figura_acumulada_plotly(df_acumulado, maximo_historico, minimo_historico)
+    webgl = _usa_webgl(df_acumulado, tracos=4)
+    layout = esqueleto_acumulado.layout(webgl)
+    datas = df_acumulado['data'].to_numpy()
+    # Os quatro traços do px.line e o do crescimento percentual, na ordem do esqueleto
+    colunas = ['valor', 'media_movel_7', 'max_valor', 'min_valor', 'crescimento_percentual']
+    tracos = [
+        com(traco, x=datas, y=df_acumulado[nome].to_numpy())
+        for traco, nome in zip(esqueleto_acumulado(webgl)['data'], colunas)
+    ]
+    x0, x1 = df_acumulado['data'].min(), df_acumulado['data'].max()
+    linha_maximo, linha_minimo = layout['shapes']
+    return {
+        'data': tracos,
+        'layout': com(layout, shapes=[
+            com(linha_maximo, x0=x0, x1=x1, y0=maximo_historico, y1=maximo_historico),
+            com(linha_minimo, x0=x0, x1=x1, y0=minimo_historico, y1=minimo_historico)
+        ])
+    }
+
+def _usa_webgl(df, tracos=1):
+    # O px troca Scatter por Scattergl acima de 1000 pontos (somando os traços do formato largo)
+    return len(df) * tracos > 1000
+
+def _amostra_serie(webgl, colunas, tracos=1):
+    # Série de exemplo com pontos suficientes para o px escolher o mesmo tipo de traço
+    n = 1000 // tracos + 1 if webgl else 2
+    amostra = pd.DataFrame({'data': pd.date_range('2024-01-01', periods=n)})
+    for nome in colunas:
+        amostra[nome] = np.arange(1.0, n + 1)
+    return amostra
+
+esqueleto_mensal = Esqueleto(lambda ano: figura_mensal_plotly(
+    pd.DataFrame({'ano': [ano, ano], 'mes': [1, 2], 'valor': [1.0, 2.0]}), ano
+))
+esqueleto_diario = Esqueleto(lambda webgl: figura_diaria_plotly(_amostra_serie(webgl, ['valor'])))
+esqueleto_acumulado = Esqueleto(lambda webgl: figura_acumulada_plotly(
+    _amostra_serie(webgl, ['valor', 'media_movel_7', 'max_valor', 'min_valor', 'crescimento_percentual'], tracos=4),
+    2.0, 1.0
+))
+
+def _fatia_datas(datas, inicio=None, fim=None):
+    """Posições (a, b) das datas ordenadas com inicio <= data <= fim (busca binária)."""
+    a = datas.searchsorted(pd.Timestamp(inicio), 'left') if inicio is not None else 0
+    b = datas.searchsorted(pd.Timestamp(fim), 'right') if fim is not None else len(datas)
+    return int(a), int(max(a, b))
+
 
-# Carregando o dataset de vendas
-df = pd.read_csv('vendas.csv')
+# Analisadores existentes: no processo filho (fork do modo 'processo') as travas
+# dos intermediários são recriadas, pois uma thread do pai podia estar segurando
+_analisadores = weakref.WeakSet()
+
+def _recriar_travas_memo():
+    for analisador in list(_analisadores):
+        analisador._trava_memo = threading.Lock()
+        analisador._travas_memo = {}
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_recriar_travas_memo)
 
 # Classe para estrutura de análise de dados
 class AnalisadorDeVendas:
-    def __init__(self, dados):
-        """Inicializa a classe com o dataframe de vendas."""
+    def __init__(self, dados, limpo=False):
+        """Inicializa a classe com o dataframe de vendas (limpo=True pula a limpeza)."""
         self.dados = dados
-        self.limpar_dados()
+        self.blocos_novos = []  # Linhas recebidas por append() depois da carga
+        self.caminho = None  # CSV de origem (modo streaming ou acompanhamento do arquivo)
+        self.tamanho_bloco = None
+        self.posicao_arquivo = None  # Byte do CSV até onde as linhas já foram lidas
+        self.linhas_arquivo = 0  # Quantidade de linhas do CSV já incorporadas
+        self.colunas_arquivo = None
+        self.versao = 0  # Incrementada a cada atualização dos dados
+        self._memo = {}  # Intermediários compartilhados entre gráficos (por versão)
+        self._versao_memo = 0
+        self._trava_memo = threading.Lock()  # Protege _memo e _travas_memo
+        self._travas_memo = {}  # Uma trava por nome de intermediário
+        _analisadores.add(self)
+        self._trava_arquivo = threading.RLock()  # append() e acompanhar_arquivo(), chamados pelo callback de leitura
+        self.agregados = AgregadosVendas()
+        if dados is not None:
+            if not limpo:
+                self.limpar_dados()
+            self.agregados.atualizar(self.dados)
+
+    @classmethod
+    def de_csv_em_blocos(cls, caminho, tamanho_bloco=100_000):
+        """Cria o analisador em modo streaming: lê o CSV em blocos e guarda só os agregados.
+
+        O pico de memória fica limitado ao tamanho do bloco; os métodos de
+        análise respondem a partir dos agregados.
+        """
+        analise = cls(None)
+        analise.caminho = caminho
+        analise.tamanho_bloco = tamanho_bloco
+        # Só as linhas completas neste momento; o que vier depois entra por acompanhar_arquivo()
+        analise.posicao_arquivo, analise.linhas_arquivo = contar_linhas_completas(caminho)
+        analise.colunas_arquivo = _ler_cabecalho(caminho)
+        for bloco in ler_vendas_em_blocos(caminho, tamanho_bloco, nrows=analise.linhas_arquivo):
+            analise.agregados.atualizar(bloco)
+        return analise
 
     def limpar_dados(self):
         """Limpeza e preparação dos dados para análise."""
-        self.dados['data'] = pd.to_datetime(self.dados['data'], errors='coerce')  # Converte para datetime
-        self.dados['valor'] = self.dados['valor'].replace({',': '.'}, regex=True).astype(float)  # Corrige valores monetários
-        self.dados.dropna(subset=['produto', 'valor'], inplace=True)  # Remove dados ausentes em colunas importantes
-        self.dados['mes'] = self.dados['data'].dt.month  # Adiciona coluna para o mês
-        self.dados['ano'] = self.dados['data'].dt.year  # Adiciona coluna para o ano
-        self.dados['dia'] = self.dados['data'].dt.day  # Adiciona coluna para o dia
-        self.dados['dia_da_semana'] = self.dados['data'].dt.weekday  # Adiciona coluna para o dia da semana (0=segunda, 6=domingo)
+        limpar_vendas(self.dados)
+
+    def append(self, linhas):
+        """Incorpora novas vendas limpando só as linhas novas e atualizando os agregados.
+
+        `linhas` pode ser um dataframe ou uma lista de dicionários/listas com as
+        colunas produto, regiao, valor e data. O custo é proporcional às
+        linhas novas, não ao histórico.
+        """
+        if not isinstance(linhas, pd.DataFrame):
+            linhas = pd.DataFrame(list(linhas), columns=['produto', 'regiao', 'valor', 'data'])
+        bloco = limpar_vendas(linhas.copy())
+        if bloco.empty:
+            return 0
+        with self._trava_arquivo:
+            self.agregados.atualizar(bloco)
+            self.blocos_novos.append(bloco)
+            self.versao += 1
+        return len(bloco)
+
+    def acompanhar_arquivo(self, caminho=None):
+        """Lê as linhas acrescentadas ao CSV desde a última leitura (como um `tail -f`).
+
+        Na primeira chamada de um analisador criado a partir de um dataframe,
+        apenas marca o fim atual do arquivo. Retorna a quantidade de linhas novas.
+        """
+        with self._trava_arquivo:
+            return self._ler_linhas_novas(caminho)
+
+    def _ler_linhas_novas(self, caminho):
+        caminho = caminho or self.caminho
+        if self.posicao_arquivo is None or caminho != self.caminho:
+            self.caminho = caminho
+            self.posicao_arquivo, self.linhas_arquivo = contar_linhas_completas(caminho)
+            self.colunas_arquivo = _ler_cabecalho(caminho)
+            return 0
+
+        with open(caminho, 'rb') as arquivo:
+            arquivo.seek(self.posicao_arquivo)
+            conteudo = arquivo.read()
+        # Considera apenas linhas completas; o resto fica para a próxima leitura
+        fim = conteudo.rfind(b'\n') + 1
+        if not fim:
+            return 0
+
+        tipos = {coluna: 'category' for coluna in DIMENSOES_VENDAS}
+        novas = pd.read_csv(io.BytesIO(conteudo[:fim]), header=None, names=self.colunas_arquivo, dtype=tipos)
+        if self.dados is None:
+            # No modo streaming as linhas já estão no arquivo: basta atualizar os agregados
+            bloco = limpar_vendas(novas.copy())
+            self.agregados.atualizar(bloco)
+            self.versao += 1
+            incorporadas = len(bloco)
+        else:
+            incorporadas = self.append(novas)
+        # A posição só avança depois que as linhas foram incorporadas: se algo
+        # falhar antes, elas são lidas de novo na próxima chamada
+        self.posicao_arquivo += fim
+        self.linhas_arquivo += len(novas)
+        return incorporadas
+
+    def _blocos_de_linhas(self):
+        """Percorre todas as linhas de vendas: dados carregados (ou o CSV em blocos) e as novas."""
+        if self.dados is None:
+            if self.caminho is not None:
+                yield from ler_vendas_em_blocos(self.caminho, self.tamanho_bloco, nrows=self.linhas_arquivo)
+        else:
+            yield self.dados
+        yield from self.blocos_novos
+
+    def _intermediario(self, nome, calcular):
+        """Calcula um resultado intermediário uma única vez por versão dos dados.
+
+        Gráficos montados em paralelo que pedem o mesmo intermediário esperam
+        quem já está calculando (trava por nome) em vez de calcular de novo.
+        """
+        memo = self._memo_atual()
+        if nome not in memo:
+            with self._trava_memo:
+                trava = self._travas_memo.setdefault(nome, threading.Lock())
+            with trava:
+                memo = self._memo_atual()
+                if nome not in memo:
+                    with etapa(f'intermediario.{nome}'):
+                        memo[nome] = calcular()
+        return memo[nome]
+
+    def _memo_atual(self):
+        """Dicionário de intermediários da versão atual (novo quando a versão muda)."""
+        with self._trava_memo:
+            if self._versao_memo != self.versao:
+                self._memo = {}
+                self._versao_memo = self.versao
+            return self._memo
+
+    def _serie_diaria(self):
+        """Série diária ordenada pela data (memorizada por versão dos dados)."""
+        return self._intermediario('serie_diaria', self.agregados.serie_diaria)
+
+    def produtos(self):
+        """Lista de produtos presentes nos dados."""
+        with self.agregados.trava:
+            return self.agregados.por_produto.index.tolist()
+
+    def regioes(self):
+        """Lista de regiões presentes nos dados."""
+        with self.agregados.trava:
+            return self.agregados.por_regiao.index.tolist()
+
+    def anos(self):
+        """Lista de anos presentes nos dados."""
+        with self.agregados.trava:
+            return self.agregados.por_ano_mes.index.get_level_values('ano').unique().tolist()
+
+    def periodo(self):
+        """Primeira e última data das vendas."""
+        with self.agregados.trava:
+            return self.agregados.por_data.index.min(), self.agregados.por_data.index.max()
+
+    def _vendas_por(self, coluna, filtrados):
+        """Soma das vendas por produto/região, apenas para os valores filtrados."""
+        with self.agregados.trava:
+            soma = getattr(self.agregados, 'por_' + coluna)
+        soma = soma[soma.index.isin(list(filtrados))]
+        return soma.rename_axis(coluna).reset_index(name='valor')
 
     def analise_vendas_por_produto(self, produtos_filtrados):
         """Retorna gráfico de vendas totais por produto."""
-        df_produto = self.dados[self.dados['produto'].isin(produtos_filtrados)]
-        df_produto = df_produto.groupby('produto')['valor'].sum().reset_index().sort_values(by='valor', ascending=False)
+        df_produto = self._vendas_por('produto', produtos_filtrados).sort_values(by='valor', ascending=False)
         fig = px.bar(df_produto, x='produto', y='valor', title='Vendas por Produto', color='valor')
         return fig
 
     def analise_vendas_por_regiao(self, regioes_filtradas):
         """Retorna gráfico de vendas totais por região."""
-        df_regiao = self.dados[self.dados['regiao'].isin(regioes_filtradas)]
-        df_regiao = df_regiao.groupby('regiao')['valor'].sum().reset_index().sort_values(by='valor', ascending=False)
+        df_regiao = self._vendas_por('regiao', regioes_filtradas).sort_values(by='valor', ascending=False)
         fig = px.pie(df_regiao, names='regiao', values='valor', title='Vendas por Região', color='valor')
         return fig
 
     def analise_vendas_mensais(self, ano_filtrado):
         """Retorna gráfico de vendas por mês (com linha de tendência)."""
-        df_mes = self.dados[self.dados['ano'] == ano_filtrado]
-        df_mes = df_mes.groupby(['ano', 'mes'])['valor'].sum().reset_index()
-        fig = px.line(df_mes, x='mes', y='valor', color='ano', title=f'Vendas Mensais - {ano_filtrado}', markers=True, line_shape='spline')
-        return fig
+        df_mes = self._intermediario('mensal', self._soma_mensal)
+        # Índice ordenado por (ano, mês): o ano é localizado por busca binária
+        anos = df_mes.index.get_level_values('ano')
+        if ano_filtrado is None:
+            inicio = fim = 0
+        else:
+            inicio, fim = anos.searchsorted(ano_filtrado, 'left'), anos.searchsorted(ano_filtrado, 'right')
+        df_mes = df_mes.iloc[inicio:fim].reset_index(name='valor')
+        return figura_mensal(df_mes, ano_filtrado)
 
-    def analise_vendas_diarias(self, data_inicio, data_fim):
-        """Retorna gráfico de vendas diárias ao longo do tempo.""" 
-        df_dia = self.dados[(self.dados['data'] >= data_inicio) & (self.dados['data'] <= data_fim)]
-        df_dia = df_dia.groupby('data')['valor'].sum().reset_index()
-        fig = px.line(df_dia, x='data', y='valor', title='Vendas Diárias', markers=True)
-        return fig
+    def _soma_mensal(self):
+        with self.agregados.trava:
+            por_ano_mes = self.agregados.por_ano_mes
+        return por_ano_mes.sort_index()
+
+    def analise_vendas_diarias(self, data_inicio, data_fim, max_pontos=None):
+        """Retorna gráfico de vendas diárias ao longo do tempo.
+
+        O intervalo é localizado por busca binária nas datas ordenadas da série,
+        sem varrer as datas fora dele. A série é reduzida (LTTB) a cerca de
+        `max_pontos` pontos, por padrão a largura do gráfico em pixels; ver reducao.py.
+        """ 
+        df_dia = self._serie_diaria()
+        inicio, fim = _fatia_datas(df_dia.index, data_inicio, data_fim)
+        df_dia = df_dia.iloc[inicio:fim].reset_index()
+        df_dia = reduzir(df_dia, 'data', 'valor', max_pontos)
+        return figura_diaria(df_dia)
 
     def analise_vendas_por_dia_da_semana(self):
         """Retorna gráfico de vendas por dia da semana (analisa o impacto do dia)."""
-        df_dia_semana = self.dados.groupby('dia_da_semana')['valor'].sum().reset_index()
+        with self.agregados.trava:
+            por_dia_da_semana = self.agregados.por_dia_da_semana
+        df_dia_semana = por_dia_da_semana.sort_index().rename_axis('dia_da_semana').reset_index(name='valor')
         df_dia_semana['dia_da_semana'] = df_dia_semana['dia_da_semana'].map({
             0: 'Segunda', 1: 'Terça', 2: 'Quarta', 3: 'Quinta', 4: 'Sexta', 5: 'Sábado', 6: 'Domingo'
         })
@@ -71,29 +424,54 @@ class AnalisadorDeVendas:
 
     def analise_outliers(self):
         """Identifica outliers com base em um intervalo interquartil."""        
-        q1 = self.dados['valor'].quantile(0.25)
-        q3 = self.dados['valor'].quantile(0.75)
+        q1, q3 = self._intermediario('quartis', self._quartis)
         iqr = q3 - q1
         lim_inferior = q1 - 1.5 * iqr
         lim_superior = q3 + 1.5 * iqr
-        outliers = self.dados[(self.dados['valor'] < lim_inferior) | (self.dados['valor'] > lim_superior)]
+        # Percorre as linhas (no modo streaming, relendo o CSV em blocos) e guarda só as fora dos limites
+        with etapa('outliers.varredura') as medicao:
+            partes, linhas = [], 0
+            for bloco in self._blocos_de_linhas():
+                linhas += len(bloco)
+                partes.append(bloco[(bloco['valor'] < lim_inferior) | (bloco['valor'] > lim_superior)])
+            outliers = pd.concat(partes or [pd.DataFrame(columns=['data', 'valor'])], ignore_index=True)
+            medicao.linhas = linhas
         fig = px.scatter(outliers, x='data', y='valor', title='Outliers de Vendas')
         return fig
 
+    def _quartis(self):
+        """Q1 e Q3 exatos das linhas em memória; no modo streaming, do esboço (erro relativo de até 1%)."""
+        if self.dados is None:
+            return self.agregados.quantil(0.25), self.agregados.quantil(0.75)
+        valores = pd.concat([bloco['valor'] for bloco in self._blocos_de_linhas()], ignore_index=True)
+        return valores.quantile(0.25), valores.quantile(0.75)
+
     def distribucao_vendas(self):
         """Retorna gráfico de distribuição de vendas utilizando o Plotly"""
-        fig = px.histogram(self.dados, x='valor', nbins=30, title="Distribuição de Vendas", color='valor')
-        return fig
+        # Um único traço de barras com as caixas do histograma dos agregados,
+        # juntadas em até 30 (o custo não depende da quantidade de valores distintos)
+        with self.agregados.trava:
+            inicio, contagens, largura = self.agregados.histograma.caixas(30)
+        return go.Figure(
+            data=[go.Bar(x=inicio + largura / 2, y=contagens, width=largura, name='valor')],
+            layout=go.Layout(title='Distribuição de Vendas', xaxis_title='valor', yaxis_title='count', bargap=0)
+        )
 
     def analise_media_desvio(self):
-        """Cálculos de média e desvio padrão das vendas.""" 
-        media = self.dados['valor'].mean()
-        desvio = self.dados['valor'].std()
-        return media, desvio
-
-    def vendas_acumuladas(self):
-        """Calcula vendas acumuladas ao longo do tempo, com insights estatísticos.""" 
-        df_acumulado = self.dados.groupby('data')['valor'].sum().cumsum().reset_index()
+        """Cálculos de média e desvio padrão das vendas (Welford, atualizado a cada bloco).""" 
+        with self.agregados.trava:
+            return self.agregados.media, self.agregados.desvio()
+
+    def figura_media_desvio(self):
+        """Retorna gráfico de barras com a média e o desvio padrão das vendas."""
+        media, desvio = self.analise_media_desvio()
+        return go.Figure(data=[
+            go.Bar(x=['Média', 'Desvio Padrão'], y=[media, desvio], marker_color=['blue', 'red'])
+        ], layout=go.Layout(title=f'Média e Desvio Padrão: Média={media:.2f}, Desvio={desvio:.2f}'))
+
+    def _estatisticas_acumuladas(self):
+        """Série acumulada com as estatísticas móveis, calculada sobre o histórico completo."""
+        df_acumulado = self.agregados.serie_acumulada().reset_index()
         
         # Cálculos adicionais para enriquecer a análise
         df_acumulado['media_movel_7'] = df_acumulado['valor'].rolling(window=7).mean()  # Média móvel de 7 dias
@@ -101,144 +479,176 @@ class AnalisadorDeVendas:
         df_acumulado['crescimento_percentual'] = df_acumulado['valor'].pct_change() * 100  # Crescimento percentual
         df_acumulado['max_valor'] = df_acumulado['valor'].expanding().max()  # Valor máximo acumulado até o momento
         df_acumulado['min_valor'] = df_acumulado['valor'].expanding().min()  # Valor mínimo acumulado até o momento
+        return df_acumulado
 
-        # Criação do gráfico
-        fig = px.line(
-            df_acumulado, 
-            x='data', 
-            y=['valor', 'media_movel_7', 'max_valor', 'min_valor'], 
-            title='Vendas Acumuladas ao Longo do Tempo com Insights Estatísticos',
-            labels={'valor': 'Vendas Acumuladas', 'media_movel_7': 'Média Móvel (7 dias)', 'max_valor': 'Máximo Acumulado', 'min_valor': 'Mínimo Acumulado'},
-            markers=True
-        )
+    def vendas_acumuladas(self, intervalo=None, max_pontos=None):
+        """Calcula vendas acumuladas ao longo do tempo, com insights estatísticos.
 
-        # Adicionando o crescimento percentual ao gráfico como uma linha de anotações
-        fig.add_trace(
-            go.Scatter(
-                x=df_acumulado['data'],
-                y=df_acumulado['crescimento_percentual'],
-                mode='lines+markers',
-                name='Crescimento Percentual',
-                line=dict(color='orange', width=2, dash='dot'),
-                yaxis='y2'
-            )
-        )
-        
-        # Estilização do gráfico
-        fig.update_layout(
-            title_font=dict(size=20, family='Poppins', color='#2980B9'),
-            plot_bgcolor="#34495E",  # Fundo escuro para o gráfico
-            paper_bgcolor="#2C3E50",  # Fundo do papel
-            font=dict(color='#ECF0F1', family='Roboto'),
-            xaxis=dict(
-                title='Data',
-                tickformat='%Y-%m-%d',
-                showgrid=True,
-                gridcolor='#7f8c8d',
-                tickangle=45
+        `intervalo` (início, fim) limita o gráfico à janela de zoom; a série é
+        reduzida a cerca de `max_pontos` pontos preservando os picos do
+        crescimento percentual.
+        """ 
+        df_acumulado = self._intermediario('acumulado', self._estatisticas_acumuladas)
+        maximo_historico = df_acumulado['max_valor'].max()
+        minimo_historico = df_acumulado['min_valor'].min()
+        if intervalo is not None:
+            # A série acumulada tem as mesmas datas da série diária, então usa o mesmo índice
+            inicio, fim = _fatia_datas(self._serie_diaria().index, *intervalo)
+            df_acumulado = df_acumulado.iloc[inicio:fim]
+        df_acumulado = reduzir(df_acumulado, 'data', 'valor', max_pontos, extras=('crescimento_percentual',))
+
+        return figura_acumulada(df_acumulado, maximo_historico, minimo_historico)
+
+# Instanciando o objeto de análise de vendas. Com DASH_MODO_STREAMING=1 o CSV é
+# lido em blocos e só os agregados ficam em memória; caso contrário os dados
+# vêm já limpos do cache colunar mapeado em memória (ver cache_colunar.py)
+if os.environ.get('DASH_MODO_STREAMING') == '1':
+    analise = AnalisadorDeVendas.de_csv_em_blocos('vendas.csv')
+else:
+    analise = AnalisadorDeVendas(carregar_vendas('vendas.csv'), limpo=True)
+    analise.acompanhar_arquivo('vendas.csv')  # marca o fim atual; as linhas novas chegam pelo callback abaixo
+
+def versao_dados():
+    """Versão dos dados carregados neste processo (usada pelo /pronto do servir.py)."""
+    return analise.versao
+
+# De quanto em quanto tempo (segundos) o navegador pede a leitura das linhas
+# acrescentadas ao vendas.csv (0 desliga)
+INTERVALO_ARQUIVO = float(os.environ.get('DASH_INTERVALO_ARQUIVO', '5'))
+
+def _periodo_com_zoom(filtros):
+    """Período do gráfico diário: o do seletor de datas, restrito à janela de zoom."""
+    inicio, fim = filtros['data_inicio'], filtros['data_fim']
+    if filtros['zoom_diario'] is not None:
+        inicio = max(inicio, filtros['zoom_diario'][0])
+        fim = min(fim, filtros['zoom_diario'][1])
+    return inicio, fim
+
+# Plano de execução do callback: cada gráfico declara de quais filtros depende.
+# Os que não dependem de nenhum são montados uma vez por versão dos dados.
+# As figuras são montadas em paralelo (DASH_MODO_FIGURAS=thread|processo|sequencial)
+# e um erro em uma delas deixa vazio apenas o gráfico correspondente.
+planejador = PlanejadorDeGraficos([
+    Grafico('produto', lambda f: analise.analise_vendas_por_produto(f['produtos']), ('produtos',)),
+    Grafico('regiao', lambda f: analise.analise_vendas_por_regiao(f['regioes']), ('regioes',)),
+    Grafico('mensal', lambda f: analise.analise_vendas_mensais(f['ano']), ('ano',)),
+    Grafico('diario', lambda f: analise.analise_vendas_diarias(*_periodo_com_zoom(f)), ('data_inicio', 'data_fim', 'zoom_diario')),
+    Grafico('dia_da_semana', lambda f: analise.analise_vendas_por_dia_da_semana(), ()),
+    Grafico('outliers', lambda f: analise.analise_outliers(), ()),
+    Grafico('distribuicao', lambda f: analise.distribucao_vendas(), ()),
+    Grafico('media_desvio', lambda f: analise.figura_media_desvio(), ()),
+    Grafico('acumulado', lambda f: analise.vendas_acumuladas(f['zoom_acumulado']), ('zoom_acumulado',)),
+], versao=lambda: analise.versao, nome='aula04_B', figura_vazia=go.Figure)
+
+# Layout do app Dash: uma função, para que cada carga da página parta dos dados
+# atuais; as opções dos filtros são mantidas pelo callback atualizar_opcoes
+def layout():
+    data_inicial, data_final = analise.periodo()
+    return html.Div([
+        html.H1("Dashboard de Análise de Vendas", style={'textAlign': 'center'}),
+
+        # Leitura periódica das linhas novas do CSV; a quantidade de linhas lidas
+        # fica no Store e dispara a atualização dos filtros e dos gráficos
+        dcc.Interval(id='intervalo-arquivo', interval=int(INTERVALO_ARQUIVO * 1000), disabled=not INTERVALO_ARQUIVO),
+        dcc.Store(id='linhas-lidas', data=analise.linhas_arquivo),
+
+        # Filtros de Seleção
+        html.Div([
+            html.Label('Selecione os Produtos:'),
+            dcc.Dropdown(
+                id='produto-dropdown',
+                multi=True,
+                value=analise.produtos(),
+                style={'width': '48%'}
             ),
-            yaxis=dict(
-                title='Vendas Acumuladas',
-                showgrid=True,
-                gridcolor='#7f8c8d',
+            html.Label('Selecione as Regiões:'),
+            dcc.Dropdown(
+                id='regiao-dropdown',
+                multi=True,
+                value=analise.regioes(),
+                style={'width': '48%'}
             ),
-            yaxis2=dict(
-                title='Crescimento Percentual (%)',
-                overlaying='y',
-                side='right',
-                showgrid=False,
-                tickformat='.1f'
+            html.Label('Selecione o Ano:'),
+            dcc.Dropdown(
+                id='ano-dropdown',
+                value=min(analise.anos()),
+                style={'width': '48%'}
             ),
-            legend=dict(
-                title="Métricas",
-                orientation="h",
-                yanchor="bottom",
-                y=1.1,
-                xanchor="center",
-                x=0.5
+            html.Label('Selecione o Período:'),
+            dcc.DatePickerRange(
+                id='date-picker-range',
+                start_date=data_inicial.date(),
+                end_date=data_final.date(),
+                display_format='YYYY-MM-DD',
+                style={'width': '48%'}
             ),
-            hovermode="x unified",
-            autosize=True,
-            margin=dict(t=50, b=50, l=40, r=40),
-            shapes=[
-                dict(
-                    type="line",
-                    x0=df_acumulado['data'].min(),
-                    x1=df_acumulado['data'].max(),
-                    y0=df_acumulado['max_valor'].max(),
-                    y1=df_acumulado['max_valor'].max(),
-                    line=dict(color="red", width=2, dash='dash'),
-                    name="Máximo Histórico"
-                ),
-                dict(
-                    type="line",
-                    x0=df_acumulado['data'].min(),
-                    x1=df_acumulado['data'].max(),
-                    y0=df_acumulado['min_valor'].min(),
-                    y1=df_acumulado['min_valor'].min(),
-                    line=dict(color="green", width=2, dash='dash'),
-                    name="Mínimo Histórico"
-                )
-            ]
-        )
+        ], style={'padding': '20px'}),
 
-        return fig
-
-# Instanciando o objeto de análise de vendas
-analise = AnalisadorDeVendas(df)
-
-# Layout do app Dash
-app.layout = html.Div([
-    html.H1("Dashboard de Análise de Vendas", style={'textAlign': 'center'}),
-
-    # Filtros de Seleção
-    html.Div([
-        html.Label('Selecione os Produtos:'),
-        dcc.Dropdown(
-            id='produto-dropdown',
-            options=[{'label': produto, 'value': produto} for produto in df['produto'].unique()],
-            multi=True,
-            value=df['produto'].unique().tolist(),
-            style={'width': '48%'}
-        ),
-        html.Label('Selecione as Regiões:'),
-        dcc.Dropdown(
-            id='regiao-dropdown',
-            options=[{'label': regiao, 'value': regiao} for regiao in df['regiao'].unique()],
-            multi=True,
-            value=df['regiao'].unique().tolist(),
-            style={'width': '48%'}
-        ),
-        html.Label('Selecione o Ano:'),
-        dcc.Dropdown(
-            id='ano-dropdown',
-            options=[{'label': str(ano), 'value': ano} for ano in df['ano'].unique()],
-            value=df['ano'].min(),
-            style={'width': '48%'}
-        ),
-        html.Label('Selecione o Período:'),
-        dcc.DatePickerRange(
-            id='date-picker-range',
-            start_date=df['data'].min().date(),
-            end_date=df['data'].max().date(),
-            display_format='YYYY-MM-DD',
-            style={'width': '48%'}
-        ),
-    ], style={'padding': '20px'}),
-
-    # Gráficos
-    html.Div([
-        dcc.Graph(id='grafico-produto'),
-        dcc.Graph(id='grafico-regiao'),
-        dcc.Graph(id='grafico-mensal'),
-        dcc.Graph(id='grafico-diario'),
-        dcc.Graph(id='grafico-dia-da-semana'),
-        dcc.Graph(id='grafico-outliers'),
-        dcc.Graph(id='grafico-distribuicao'),
-        dcc.Graph(id='grafico-media-desvio'),
-        dcc.Graph(id='grafico-acumulado'),
+        # Gráficos
+        html.Div([
+            dcc.Graph(id='grafico-produto'),
+            dcc.Graph(id='grafico-regiao'),
+            dcc.Graph(id='grafico-mensal'),
+            dcc.Graph(id='grafico-diario'),
+            dcc.Graph(id='grafico-dia-da-semana'),
+            dcc.Graph(id='grafico-outliers'),
+            dcc.Graph(id='grafico-distribuicao'),
+            dcc.Graph(id='grafico-media-desvio'),
+            dcc.Graph(id='grafico-acumulado'),
+        ])
     ])
-])
+
+app.layout = layout
+
+# Lê as linhas acrescentadas ao CSV (a trava do analisador deixa uma leitura por
+# vez, mesmo com vários navegadores abertos). Devolve a quantidade de linhas
+# lidas, igual em todos os workers, e não muda o Store se nada chegou.
+@app.callback(
+    Output('linhas-lidas', 'data'),
+    Input('intervalo-arquivo', 'n_intervals'),
+    State('linhas-lidas', 'data'),
+    prevent_initial_call=True
+)
+@instrumentar_callback('acompanhar_arquivo')
+def acompanhar_arquivo(n_intervals, linhas_exibidas):
+    try:
+        analise.acompanhar_arquivo()
+    except Exception as e:
+        print(f"Erro ao ler as linhas novas do CSV: {str(e)}")
+    if analise.linhas_arquivo == linhas_exibidas:
+        return dash.no_update
+    return analise.linhas_arquivo
+
+# Opções dos filtros e limites do seletor de datas, a partir dos dados atuais
+@app.callback(
+    Output('produto-dropdown', 'options'),
+    Output('regiao-dropdown', 'options'),
+    Output('ano-dropdown', 'options'),
+    Output('date-picker-range', 'min_date_allowed'),
+    Output('date-picker-range', 'max_date_allowed'),
+    Input('linhas-lidas', 'data')
+)
+@instrumentar_callback('atualizar_opcoes')
+def atualizar_opcoes(linhas_lidas):
+    data_inicial, data_final = analise.periodo()
+    return (
+        [{'label': produto, 'value': produto} for produto in analise.produtos()],
+        [{'label': regiao, 'value': regiao} for regiao in analise.regioes()],
+        [{'label': str(ano), 'value': ano} for ano in analise.anos()],
+        data_inicial.date(),
+        data_final.date()
+    )
+
+def _graficos_com_zoom():
+    """Nomes dos gráficos a refazer quando o callback foi disparado apenas por zoom."""
+    try:
+        gatilhos = {gatilho['prop_id'] for gatilho in dash.callback_context.triggered}
+    except Exception:
+        return None  # Chamada fora de um callback do Dash
+    zoom = {'grafico-diario.relayoutData': 'diario', 'grafico-acumulado.relayoutData': 'acumulado'}
+    if gatilhos and gatilhos.issubset(zoom):
+        return {zoom[gatilho] for gatilho in gatilhos}
+    return None
 
 # Callbacks para atualizar os gráficos conforme filtros
 @app.callback(
@@ -255,29 +665,36 @@ app.layout = html.Div([
     Input('regiao-dropdown', 'value'),
     Input('ano-dropdown', 'value'),
     Input('date-picker-range', 'start_date'),
-    Input('date-picker-range', 'end_date')
+    Input('date-picker-range', 'end_date'),
+    # Zoom nos gráficos de série temporal: a série é consultada de novo, com
+    # mais resolução, apenas na janela visível
+    Input('grafico-diario', 'relayoutData'),
+    Input('grafico-acumulado', 'relayoutData'),
+    # Linhas novas no CSV: todos os gráficos são refeitos
+    Input('linhas-lidas', 'data')
 )
-def update_graphs(produtos, regioes, ano, start_date, end_date):
+@instrumentar_callback('update_graphs')
+def update_graphs(produtos, regioes, ano, start_date, end_date, relayout_diario=None, relayout_acumulado=None, linhas_lidas=None):
     try:
         # Convertendo as datas para o formato correto
         start_date = pd.to_datetime(start_date)
         end_date = pd.to_datetime(end_date)
 
-        # Atualizando os gráficos com base nos filtros selecionados
-        fig_produto = analise.analise_vendas_por_produto(produtos)
-        fig_regiao = analise.analise_vendas_por_regiao(regioes)
-        fig_mensal = analise.analise_vendas_mensais(ano)
-        fig_diario = analise.analise_vendas_diarias(start_date, end_date)
-        fig_dia_semana = analise.analise_vendas_por_dia_da_semana()
-        fig_outliers = analise.analise_outliers()
-        fig_distribuicao = analise.distribucao_vendas()
-        media, desvio = analise.analise_media_desvio()
-        fig_media_desvio = go.Figure(data=[
-            go.Bar(x=['Média', 'Desvio Padrão'], y=[media, desvio], marker_color=['blue', 'red'])
-        ], layout=go.Layout(title=f'Média e Desvio Padrão: Média={media:.2f}, Desvio={desvio:.2f}'))
-        fig_acumulado = analise.vendas_acumuladas()
+        # Se o callback veio só de um zoom, apenas o gráfico com zoom é refeito
+        apenas = _graficos_com_zoom()
 
-        return fig_produto, fig_regiao, fig_mensal, fig_diario, fig_dia_semana, fig_outliers, fig_distribuicao, fig_media_desvio, fig_acumulado
+        # Atualizando os gráficos com base nos filtros selecionados
+        figuras = planejador.executar(
+            apenas=apenas,
+            produtos=produtos,
+            regioes=regioes,
+            ano=ano,
+            data_inicio=start_date,
+            data_fim=end_date,
+            zoom_diario=intervalo_zoom(relayout_diario),
+            zoom_acumulado=intervalo_zoom(relayout_acumulado)
+        )
+        return tuple(dash.no_update if figura is None else figura for figura in figuras)
     
     except Exception as e:
         # Caso ocorra algum erro, logar a mensagem de erro e retornar gráficos vazios
@@ -286,4 +703,6 @@ def update_graphs(produtos, regioes, ano, start_date, end_date):
 
 # Rodando o app
 if __name__ == '__main__':
-    app.run_server(debug=True)
+    # DASH_DEBUG=1 liga o modo de desenvolvimento (reloader e ferramentas de debug);
+    # em produção use: python servir.py aula04_B
+    app.run(debug=os.environ.get('DASH_DEBUG') == '1')
@@ -1,87 +1,118 @@
-import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
-import plotly.graph_objs as go
-
-dados_conceitos ={ # dicionarios com AS INFORMAÇÕES DA CAIXA DROPDOWN
-    'java' :   {'variaves':8,'condicionais':10 , 'loops' : 4 , 'poo':3 ,'funções':4},
-    'python' : {'variaves':9,'condicionais':7 , 'loops' : 8 , 'poo':4 ,'funções':5},
-    'sql' :    {'variaves':7,'condicionais':10 , 'loops' : 9 , 'poo':8 ,'funções':4},
-    'golang' : {'variaves':10,'condicionais':5, 'loops' : 8 , 'poo':4 ,'funções':3},
-    'javascript' : {'variaves':9,'condicionais':7, 'loops' : 5 , 'poo':6 ,'funções':8}
-}
-
-cores_map=dict(
-    java='red',
-    python='green',
-    sql='yellow',
-    golang='blue',
-    javascript='pink'
-)
-
-
-
-app = dash.Dash(__name__)
-
-app.layout = html.Div([
-    html.H4(
-        'Sebrae Maranhao', 
-        style={'textAlign':'center'}
-    ),
-
-    html.Div(
-        dcc.Dropdown(
-            id='dropdown_linguagens',
-            options=[
-                {'label':'Java','value':'java'},
-                {'label':'Python','value':'python'},
-                {'label':'SQL','value':'sql'},
-                {'label':'GoLang','value':'golang'},
-                {'label':'JavaScript','value':'javascript'}
-            ],
-            value=['java'],
-            multi=True,
-            style={'width' : '50%', 'margin' : '0 auto'}
-        )
-    ),
-
-    dcc.Graph(id='grafico_linguagem')
-], style={'width' : '80%',
-         'margin': '0 auto'}
-
-)
-
-@app.callback( # uma funcao que vai ser chamada atraves de um evento
-    Output('grafico_linguagem', 'figure'),
-    [Input('dropdown_linguagens','value')]
-    
-) 
-
-def scarter_linguagens(linguagens_selecionadas):
-    scarter_trace=[]
-
-    for linguagem in linguagens_selecionadas:
-        dados_linguagem= dados_conceitos[linguagem]
-        for conceito, conhecimento in dados_linguagem.items():
-            scarter_trace.append(
-                go.Scatter(
-                    x=[conceito],
-                    y=[conhecimento],
-                    mode='markers',
-                    name=linguagem.title(),
-                    marker={'size':15 , 'color':cores_map[linguagem]},
-                    showlegend=False
-                    
-                )
-                
-            )
-    scartter_layout =go.Layout(
-        title="Meus conhecimentos em Linguagens",
-        xaxis=dict(title ='Conceitos', showgrid=False),
-        yaxis=dict(title ='Niveis de conhecmento', showgrid=False)
-    )
-
-    return {'data': scarter_trace,'layout':scartter_layout}
-
-if __name__  == '__main__':
-    app.run_server(debug=True)
+import os
+
+import dash
+from dash import dcc, html
+from dash.dependencies import ClientsideFunction, Input, Output, State
+import plotly.graph_objs as go
+
+from figuras_leves import LIMITE_WEBGL, tracos_por_serie
+from instrumentacao import instrumentar_callback, registrar_rota
+
+dados_conceitos ={ # dicionarios com AS INFORMAÇÕES DA CAIXA DROPDOWN
+    'java' :   {'variaves':8,'condicionais':10 , 'loops' : 4 , 'poo':3 ,'funções':4},
+    'python' : {'variaves':9,'condicionais':7 , 'loops' : 8 , 'poo':4 ,'funções':5},
+    'sql' :    {'variaves':7,'condicionais':10 , 'loops' : 9 , 'poo':8 ,'funções':4},
+    'golang' : {'variaves':10,'condicionais':5, 'loops' : 8 , 'poo':4 ,'funções':3},
+    'javascript' : {'variaves':9,'condicionais':7, 'loops' : 5 , 'poo':6 ,'funções':8}
+}
+
+cores_map=dict(
+    java='red',
+    python='green',
+    sql='yellow',
+    golang='blue',
+    javascript='pink'
+)
+
+
+
+# Com DASH_MODO_CLIENTE=1 (padrão) os traços de cada linguagem vão uma única
+# vez para o Store 'dados_linguagens' e o gráfico é montado no navegador
+# (assets/filtros.js); com 0 volta o callback normal no servidor
+MODO_CLIENTE = os.environ.get('DASH_MODO_CLIENTE', '1') == '1'
+
+def versao_dados():
+    """Versão dos dados (usada pelo /pronto do servir.py): os conceitos são fixos."""
+    return 0
+
+app = dash.Dash(__name__)
+registrar_rota(app.server)  # /metrics, com DASH_METRICAS=1 (ver instrumentacao.py)
+
+app.layout = html.Div([
+    html.H4(
+        'Sebrae Maranhao', 
+        style={'textAlign':'center'}
+    ),
+
+    html.Div(
+        dcc.Dropdown(
+            id='dropdown_linguagens',
+            options=[
+                {'label':'Java','value':'java'},
+                {'label':'Python','value':'python'},
+                {'label':'SQL','value':'sql'},
+                {'label':'GoLang','value':'golang'},
+                {'label':'JavaScript','value':'javascript'}
+            ],
+            value=['java'],
+            multi=True,
+            style={'width' : '50%', 'margin' : '0 auto'}
+        )
+    ),
+
+    dcc.Graph(id='grafico_linguagem'),
+    dcc.Store(id='dados_linguagens')
+], style={'width' : '80%',
+         'margin': '0 auto'}
+
+)
+
+@instrumentar_callback('scarter_linguagens')
+def scarter_linguagens(linguagens_selecionadas):
+    # um traço por linguagem, com todos os conceitos dela (ver figuras_leves.py)
+    scarter_trace = tracos_por_serie(
+        dados_conceitos,
+        linguagens_selecionadas,
+        cores=cores_map,
+        marker={'size':15},
+        showlegend=False
+    )
+    scartter_layout =go.Layout(
+        title="Meus conhecimentos em Linguagens",
+        xaxis=dict(title ='Conceitos', showgrid=False),
+        yaxis=dict(title ='Niveis de conhecmento', showgrid=False)
+    )
+
+    return {'data': scarter_trace,'layout':scartter_layout}
+
+
+def dados_linguagens():
+    # traços de cada linguagem e o layout, montados pelo próprio callback acima
+    return {
+        'tracos': {
+            linguagem: scarter_linguagens([linguagem])['data']
+            for linguagem in dados_conceitos
+        },
+        'layout': scarter_linguagens([])['layout'].to_plotly_json(),
+        'limite_webgl': LIMITE_WEBGL
+    }
+
+
+if MODO_CLIENTE:
+    app.layout['dados_linguagens'].data = dados_linguagens()
+    app.clientside_callback(
+        ClientsideFunction(namespace='linguagens', function_name='montar_grafico'),
+        Output('grafico_linguagem', 'figure'),
+        [Input('dropdown_linguagens','value')],
+        [State('dados_linguagens', 'data')]
+    )
+else:
+    app.callback( # uma funcao que vai ser chamada atraves de um evento
+        Output('grafico_linguagem', 'figure'),
+        [Input('dropdown_linguagens','value')]
+    )(scarter_linguagens)
+
+if __name__  == '__main__':
+    # DASH_DEBUG=1 liga o modo de desenvolvimento (reloader e ferramentas de debug);
+    # em produção use: python servir.py aula2
+    app.run(debug=os.environ.get('DASH_DEBUG') == '1')
@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # não existe no Windows; lá o pico de memória fica de fora (None)
+    resource = None
+
+from gera import gerar_blocos, salvar_blocos
+
+PASTA_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+# Versão do formato do arquivo de resultados (mudar quando os campos mudarem)
+VERSAO_RESULTADOS = 1
+
+# Painéis medidos: esquema do gera.py e arquivo que o módulo lê na pasta atual
+ALVOS = {
+    'lalala': ('comp', 'dataset_comp.csv'),
+    'aula04_B': ('vendas', 'vendas.csv'),
+}
+
+
+# -------------------- DADOS --------------------
+def preparar_dataset(pasta_dados, alvo, linhas, seed):
+    """Gera (uma única vez) o CSV do alvo com `linhas` linhas e retorna a pasta dele.
+
+    Cada tamanho fica na sua própria pasta, para que o cache colunar criado ao
+    lado do CSV seja reaproveitado entre execuções.
+    """
+    esquema, arquivo = ALVOS[alvo]
+    pasta = os.path.join(pasta_dados, f'{esquema}-{linhas}-s{seed}')
+    caminho = os.path.join(pasta, arquivo)
+    if not os.path.exists(caminho):
+        os.makedirs(pasta, exist_ok=True)
+        temporario = caminho + '.tmp'
+        salvar_blocos(gerar_blocos(linhas, seed=seed, esquema=esquema), temporario)
+        os.replace(temporario, caminho)
+    return pasta
+
+
+# -------------------- CENÁRIOS --------------------
+def _cenarios_lalala(modulo):
+    """Combinações de filtros representativas para os callbacks do lalala.py."""
+    clientes = [item['value'] for item in modulo.lista_clientes[:-1]]
+    meses = [item['value'] for item in modulo.lista_meses[:-1]]
+    categorias = [item['value'] for item in modulo.lista_categorias[:-1]]
+
+    def invalidar():
+        modulo.cache_figuras.invalidar()
+
+    cenarios = []
+    for nome, cliente, mes, categoria in [
+        ('sem_filtro', None, None, None),
+        ('tudo_selecionado', 'todos_clientes', ['ano_completo'], 'todas_categorias'),
+        ('um_cliente', clientes[0], ['ano_completo'], 'todas_categorias'),
+        ('tres_meses_uma_categoria', None, meses[:3], categorias[0]),
+        ('filtro_combinado', clientes[-1], meses[:1], categorias[-1]),
+    ]:
+        cenarios.append((f'visual01/{nome}', modulo.visual01, (cliente, mes, categoria, True)))
+        cenarios.append((f'visual02_03/{nome}', modulo.visual02_03, (mes, categoria, True)))
+    return cenarios, invalidar
+
+
+def _cenarios_aula04_B(modulo):
+    """Combinações de filtros para update_graphs e cada análise do AnalisadorDeVendas."""
+    analise = modulo.analise
+    produtos, regioes, anos = analise.produtos(), analise.regioes(), analise.anos()
+    inicio, fim = analise.periodo()
+    semana = (fim - np.timedelta64(7, 'D'), fim)
+
+    def invalidar():
+        # A versão dos dados limpa os intermediários do analisador e as figuras fixas do planejador
+        analise.versao += 1
+
+    cenarios = [
+        ('update_graphs/tudo', modulo.update_graphs, (produtos, regioes, anos[0], inicio, fim)),
+        ('update_graphs/um_produto_uma_semana', modulo.update_graphs, (produtos[:1], regioes[:2], anos[-1], *semana)),
+        ('update_graphs/zoom_diario', modulo.update_graphs,
+         (produtos, regioes, anos[0], inicio, fim, {'xaxis.range[0]': str(semana[0]), 'xaxis.range[1]': str(semana[1])})),
+        ('analise_vendas_por_produto', analise.analise_vendas_por_produto, (produtos,)),
+        ('analise_vendas_por_regiao', analise.analise_vendas_por_regiao, (regioes,)),
+        ('analise_vendas_mensais', analise.analise_vendas_mensais, (anos[-1],)),
+        ('analise_vendas_diarias/periodo', analise.analise_vendas_diarias, (inicio, fim)),
+        ('analise_vendas_diarias/semana', analise.analise_vendas_diarias, semana),
+        ('analise_vendas_por_dia_da_semana', analise.analise_vendas_por_dia_da_semana, ()),
+        ('analise_outliers', analise.analise_outliers, ()),
+        ('distribucao_vendas', analise.distribucao_vendas, ()),
+        ('figura_media_desvio', analise.figura_media_desvio, ()),
+        ('vendas_acumuladas', analise.vendas_acumuladas, ()),
+    ]
+    return cenarios, invalidar
+
+
+CENARIOS = {
+    'lalala': _cenarios_lalala,
+    'aula04_B': _cenarios_aula04_B,
+}
+
+
+# -------------------- MEDIÇÃO --------------------
+def tamanho_payload(saida):
+    """Bytes do JSON que o Dash enviaria ao navegador para a saída do callback."""
+    import dash
+    from plotly.utils import PlotlyJSONEncoder
+
+    if isinstance(saida, tuple):
+        saida = [None if item is dash.no_update else item for item in saida]
+    return len(json.dumps(saida, cls=PlotlyJSONEncoder).encode('utf-8'))
+
+
+def medir(funcao, argumentos, repeticoes, invalidar=None):
+    """Executa a função `repeticoes` vezes; retorna as latências (ms) e a última saída."""
+    latencias = []
+    saida = None
+    for _ in range(repeticoes):
+        if invalidar is not None:
+            invalidar()
+        inicio = time.perf_counter()
+        saida = funcao(*argumentos)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return latencias, saida
+
+
+def executar_alvo(alvo, repeticoes):
+    """Importa o painel na pasta atual e mede cada cenário (roda em um processo próprio).
+
+    Cada cenário é medido "frio" (caches e intermediários invalidados antes de
+    cada chamada) e "quente" (chamadas repetidas com os mesmos filtros).
+    """
+    sys.path.insert(0, PASTA_PROJETO)
+    inicio = time.perf_counter()
+    modulo = __import__(alvo)
+    carga_s = time.perf_counter() - inicio
+
+    cenarios, invalidar = CENARIOS[alvo](modulo)
+    resultados = []
+    for nome, funcao, argumentos in cenarios:
+        for cache, invalidar_antes in [('frio', invalidar), ('quente', None)]:
+            if cache == 'quente':
+                funcao(*argumentos)  # aquecimento
+            latencias, saida = medir(funcao, argumentos, repeticoes, invalidar_antes)
+            resultados.append({
+                'cenario': nome,
+                'cache': cache,
+                'repeticoes': repeticoes,
+                'p50_ms': float(np.percentile(latencias, 50)),
+                'p95_ms': float(np.percentile(latencias, 95)),
+                'media_ms': float(np.mean(latencias)),
+                'payload_bytes': tamanho_payload(saida),
+            })
+
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    pico_rss_mb = None
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        pico_rss_mb = pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+    for resultado in resultados:
+        resultado['carga_s'] = carga_s
+        resultado['pico_rss_mb'] = pico_rss_mb
+    return resultados
+
+
+def rodar_em_processo(alvo, pasta, repeticoes, streaming):
+    """Roda `executar_alvo` em um processo novo, para o pico de memória ser só dele."""
+    ambiente = dict(os.environ)
+    if streaming:
+        ambiente['DASH_MODO_STREAMING'] = '1'
+    processo = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--executar', alvo, '--repeticoes', str(repeticoes)],
+        cwd=pasta, env=ambiente, capture_output=True, text=True
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao medir {alvo} em {pasta}:\n{processo.stderr}")
+    # A última linha da saída é o JSON; as anteriores são prints dos próprios painéis
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def commit_atual():
+    """Hash curto do commit do projeto (None fora de um repositório git)."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PASTA_PROJETO,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(base, atual, limite=1.2):
+    """Imprime os cenários cujo p50 ficou mais de `limite` vezes mais lento que na base."""
+    chave = lambda r: (r['alvo'], r['linhas'], r['cenario'], r['cache'])
+    anteriores = {chave(r): r for r in base['resultados']}
+    regressoes = 0
+    for resultado in atual['resultados']:
+        anterior = anteriores.get(chave(resultado))
+        if anterior is None or not anterior['p50_ms']:
+            continue
+        razao = resultado['p50_ms'] / anterior['p50_ms']
+        if razao > limite:
+            regressoes += 1
+            print(f"REGRESSÃO {'/'.join(map(str, chave(resultado)))}: "
+                  f"{anterior['p50_ms']:.2f} ms -> {resultado['p50_ms']:.2f} ms ({razao:.2f}x)")
+    print(f"{regressoes} regressão(ões) acima de {limite:.2f}x em relação a {base.get('commit')}")
+    return regressoes
+
+
+# -------------------- LINHA DE COMANDO --------------------
+def _megabytes(valor):
+    return '       -' if valor is None else f'{valor:8.1f} MB'
+
+
+def tamanhos(texto):
+    """Lista de tamanhos da linha de comando: "1e3,1e4" -> [1000, 10000]."""
+    return [int(float(valor)) for valor in texto.split(',')]
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description='Mede a latência, a memória e o tamanho das figuras dos painéis.')
+    parser.add_argument('--alvos', default=','.join(ALVOS), help='painéis medidos, separados por vírgula')
+    parser.add_argument('--tamanhos', type=tamanhos, default=tamanhos('1e3,1e4,1e5'),
+                        help='quantidades de linhas, separadas por vírgula (ex.: 1e3,1e4,1e5,1e6,1e7,1e8)')
+    parser.add_argument('--repeticoes', type=int, default=10, help='chamadas por cenário')
+    parser.add_argument('--seed', type=int, default=42, help='semente dos datasets gerados')
+    parser.add_argument('--dados', default=os.path.join(PASTA_PROJETO, 'benchmark_dados'),
+                        help='pasta dos datasets gerados (reaproveitados entre execuções)')
+    parser.add_argument('--streaming-acima', type=int, default=10_000_000,
+                        help='a partir deste tamanho o aula04_B roda em modo streaming')
+    parser.add_argument('--saida', default='resultados_benchmark.json', help='arquivo JSON de resultados')
+    parser.add_argument('--comparar', metavar='BASE.json', help='resultados de outro commit para comparar o p50')
+    parser.add_argument('--executar', help=argparse.SUPPRESS)  # uso interno: mede um alvo na pasta atual
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    argumentos = _argumentos()
+
+    if argumentos.executar:
+        print(json.dumps(executar_alvo(argumentos.executar, argumentos.repeticoes)))
+        sys.exit(0)
+
+    relatorio = {
+        'versao': VERSAO_RESULTADOS,
+        'commit': commit_atual(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'maquina': platform.platform(),
+        'processadores': os.cpu_count(),
+        'repeticoes': argumentos.repeticoes,
+        'resultados': [],
+    }
+    for alvo in argumentos.alvos.split(','):
+        for linhas in argumentos.tamanhos:
+            pasta = preparar_dataset(argumentos.dados, alvo, linhas, argumentos.seed)
+            streaming = alvo == 'aula04_B' and linhas >= argumentos.streaming_acima
+            print(f"{alvo} com {linhas} linhas{' (streaming)' if streaming else ''}...")
+            for resultado in rodar_em_processo(alvo, pasta, argumentos.repeticoes, streaming):
+                resultado.update(alvo=alvo, linhas=linhas, streaming=streaming)
+                relatorio['resultados'].append(resultado)
+                print(f"  {resultado['cenario']:<45} {resultado['cache']:<6} "
+                      f"p50={resultado['p50_ms']:9.2f} ms  p95={resultado['p95_ms']:9.2f} ms  "
+                      f"payload={resultado['payload_bytes']:>9} B  pico={_megabytes(resultado['pico_rss_mb'])}")
+
+    with open(argumentos.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {argumentos.saida}")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding='utf-8') as arquivo:
+            comparar(json.load(arquivo), relatorio)
@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import platform
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+import parser as linguagem
+from benchmark import commit_atual, comparar, medir, tamanhos
+
+# Versão do formato do arquivo de resultados (mudar quando os campos mudarem)
+VERSAO_RESULTADOS = 1
+
+
+# -------------------- PROGRAMAS --------------------
+def programa_linear(tamanho):
+    """Código corrido: `tamanho` comandos sem laço, com definir, mostrar e se de uma linha."""
+    linhas = ['definir total como 0']
+    for indice in range(tamanho - 1):
+        variavel = f'v{indice % 100}'
+        if indice % 10 == 9:
+            linhas.append('mostrar "total: " + total')
+        elif indice % 10 == 4:
+            anterior = f'v{(indice - 1) % 100}'  # definida na linha de cima
+            linhas.append(f'se {anterior} > 50 então definir total como total - 1')
+        else:
+            linhas.append(f'definir {variavel} como {indice} * 2 + 1')
+    return '\n'.join(linhas)
+
+
+def programa_aninhado(tamanho, profundidade=50):
+    """Blocos se aninhados `profundidade` níveis, repetidos, e três enquanto um dentro do outro."""
+    linhas = ['definir n como 1', 'definir total como 0']
+    for _ in range(max(1, tamanho // (2 * profundidade))):
+        linhas += ['se n == 1 então'] * profundidade
+        linhas.append('definir total como total + 1')
+        linhas += ['fim'] * profundidade
+
+    internas = max(1, tamanho // 100)
+    linhas += [
+        'definir a como 0',
+        'enquanto a < 10 faça',
+        '    definir b como 0',
+        '    enquanto b < 10 faça',
+        '        definir c como 0',
+        f'        enquanto c < {internas} faça',
+        '            definir c como c + 1',
+        '        fim',
+        '        definir b como b + 1',
+        '    fim',
+        '    definir a como a + 1',
+        'fim',
+    ]
+    return '\n'.join(linhas)
+
+
+def programa_laco(tamanho):
+    """Laço apertado de `tamanho` voltas (soma e contador)."""
+    return '\n'.join([
+        'definir i como 0',
+        'definir soma como 0',
+        f'enquanto i < {tamanho} faça',
+        '    definir soma como soma + i',
+        '    se i % 1000 == 0 então definir marcos como i',
+        '    definir i como i + 1',
+        'fim',
+        'mostrar "soma: " + soma',
+    ])
+
+
+def programa_variaveis(tamanho):
+    """`tamanho` variáveis diferentes, definidas e depois somadas."""
+    linhas = [f'definir v{indice} como {indice}' for indice in range(tamanho)]
+    linhas.append('definir total como 0')
+    linhas += [f'definir total como total + v{indice}' for indice in range(tamanho)]
+    linhas.append('mostrar total')
+    return '\n'.join(linhas)
+
+
+PROGRAMAS = {
+    'linear': programa_linear,
+    'aninhado': programa_aninhado,
+    'laco': programa_laco,
+    'variaveis': programa_variaveis,
+}
+
+
+# -------------------- MEDIÇÃO --------------------
+def _descartar(texto):
+    pass
+
+
+def rodar(codigo, perfil=None):
+    """Compila (ou pega do cache) e executa, jogando fora a saída do mostrar."""
+    programa = linguagem.compilar(codigo, perfil=perfil is not None)
+    return linguagem.executar(programa, limite=10 ** 12, saida=_descartar, perfil=perfil)
+
+
+def medir_programa(nome, tamanho, repeticoes):
+    """Mede o programa "frio" (compilando a cada vez) e "quente" (programa já no cache).
+
+    Numa execução à parte, com o Perfil, conta os comandos executados e o tempo
+    de cada tipo; noutra mede o pico de memória (tracemalloc) de compilar e
+    executar. Essas duas não entram nas latências.
+    """
+    codigo = PROGRAMAS[nome](tamanho)
+
+    perfil = linguagem.Perfil()
+    linguagem.limpar_cache()
+    rodar(codigo, perfil)
+
+    tracemalloc.start()
+    linguagem.limpar_cache()
+    rodar(codigo)
+    pico_memoria_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+
+    resultados = []
+    for cache, invalidar in [('frio', linguagem.limpar_cache), ('quente', None)]:
+        if cache == 'quente':
+            rodar(codigo)  # aquecimento
+        latencias, _ = medir(rodar, (codigo,), repeticoes, invalidar)
+        p50_ms = float(np.percentile(latencias, 50))
+        resultados.append({
+            'alvo': 'parser',
+            'cenario': nome,
+            'linhas': tamanho,
+            'cache': cache,
+            'repeticoes': repeticoes,
+            'p50_ms': p50_ms,
+            'p95_ms': float(np.percentile(latencias, 95)),
+            'media_ms': float(np.mean(latencias)),
+            'comandos': perfil.total_execucoes(),
+            'comandos_por_s': perfil.total_execucoes() / (p50_ms / 1000) if p50_ms else None,
+            'pico_memoria_mb': pico_memoria_mb,
+            'perfil': perfil.resumo(),
+        })
+    return resultados
+
+
+# -------------------- LINHA DE COMANDO --------------------
+def _argumentos():
+    parser = argparse.ArgumentParser(description='Mede a velocidade e a memória do interpretador do parser.py.')
+    parser.add_argument('--programas', default=','.join(PROGRAMAS), help='programas medidos, separados por vírgula')
+    parser.add_argument('--tamanhos', type=tamanhos, default=tamanhos('1e3,1e4,1e5'),
+                        help='tamanho de cada programa (comandos, voltas ou variáveis), separados por vírgula')
+    parser.add_argument('--repeticoes', type=int, default=5, help='execuções por programa')
+    parser.add_argument('--saida', default='resultados_parser.json', help='arquivo JSON de resultados')
+    parser.add_argument('--comparar', metavar='BASE.json', help='resultados de outro commit para comparar o p50')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    argumentos = _argumentos()
+
+    relatorio = {
+        'versao': VERSAO_RESULTADOS,
+        'commit': commit_atual(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'maquina': platform.platform(),
+        'processadores': os.cpu_count(),
+        'repeticoes': argumentos.repeticoes,
+        'resultados': [],
+    }
+    for nome in argumentos.programas.split(','):
+        for tamanho in argumentos.tamanhos:
+            print(f"{nome} com tamanho {tamanho}...")
+            for resultado in medir_programa(nome, tamanho, argumentos.repeticoes):
+                relatorio['resultados'].append(resultado)
+                print(f"  {resultado['cache']:<6} p50={resultado['p50_ms']:10.2f} ms  p95={resultado['p95_ms']:10.2f} ms  "
+                      f"{resultado['comandos_por_s'] or 0:>12,.0f} comandos/s  memória={resultado['pico_memoria_mb']:7.1f} MB")
+            tipos = ', '.join(f"{tipo} {dados['us_por_execucao']:.2f} µs"
+                              for tipo, dados in relatorio['resultados'][-1]['perfil'].items())
+            print(f"  por comando: {tipos}")
+
+    with open(argumentos.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {argumentos.saida}")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding='utf-8') as arquivo:
+            comparar(json.load(arquivo), relatorio)
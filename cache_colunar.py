@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# Versão do formato do cache. Mudar este número força a reconstrução dos
+# caches existentes (por exemplo, quando a limpeza dos dados muda).
+VERSAO_CACHE = 3
+
+# Quantas vezes a leitura é tentada enquanto outro processo troca a pasta do cache
+TENTATIVAS_LEITURA = 5
+
+
+def pasta_cache(caminho_csv):
+    """Retorna a pasta do cache colunar, ao lado do CSV."""
+    return caminho_csv + '.cache'
+
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """Calcula o SHA-1 do arquivo lendo em blocos."""
+    sha1 = hashlib.sha1()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha1.update(bloco)
+    return sha1.hexdigest()
+
+
+def _ler_meta(pasta):
+    try:
+        with open(os.path.join(pasta, 'meta.json'), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+def cache_valido(caminho_csv):
+    """Indica se o cache corresponde ao CSV atual (mesmo mtime/tamanho ou mesmo hash)."""
+    pasta = pasta_cache(caminho_csv)
+    meta = _ler_meta(pasta)
+    if meta is None or meta.get('versao') != VERSAO_CACHE:
+        return False
+
+    info = os.stat(caminho_csv)
+    origem = meta['origem']
+    if origem['mtime_ns'] == info.st_mtime_ns and origem['tamanho'] == info.st_size:
+        return True
+
+    # O mtime mudou (ex.: arquivo copiado ou tocado): confere o conteúdo
+    if origem['tamanho'] != info.st_size or origem['sha1'] != hash_arquivo(caminho_csv):
+        return False
+    origem['mtime_ns'] = info.st_mtime_ns
+    try:
+        _gravar_meta(pasta, meta)
+    except OSError:
+        pass  # só evita refazer o hash da próxima vez; o cache continua valendo
+    return True
+
+
+def _gravar_meta(pasta, meta):
+    # Nome temporário único: vários workers podem atualizar o meta ao mesmo tempo
+    descritor, temporario = tempfile.mkstemp(prefix='meta.', suffix='.tmp', dir=pasta)
+    try:
+        with open(descritor, 'w', encoding='utf-8') as arquivo:
+            json.dump(meta, arquivo, ensure_ascii=False)
+        os.replace(temporario, os.path.join(pasta, 'meta.json'))
+    finally:
+        if os.path.exists(temporario):  # só sobra se a gravação falhou
+            os.remove(temporario)
+
+
+def salvar_cache(df, caminho_csv):
+    """Grava o dataframe já limpo como um arquivo .npy por coluna ao lado do CSV."""
+    info = os.stat(caminho_csv)
+    pasta = pasta_cache(caminho_csv)
+    temporaria = tempfile.mkdtemp(prefix='.tmp-', dir=os.path.dirname(os.path.abspath(pasta)))
+    try:
+        _gravar_colunas(df, temporaria, info, caminho_csv)
+
+        # Troca a pasta antiga pela nova; outro processo pode ter acabado de gravar.
+        # Entre os dois replace a pasta não existe: ler_cache trata como falta
+        antiga = pasta + '.old'
+        shutil.rmtree(antiga, ignore_errors=True)
+        if os.path.exists(pasta):
+            os.replace(pasta, antiga)
+        os.replace(temporaria, pasta)
+        shutil.rmtree(antiga, ignore_errors=True)
+    finally:
+        # Só sobra a temporária se algo falhou antes da troca (disco cheio, etc.)
+        shutil.rmtree(temporaria, ignore_errors=True)
+
+
+def _gravar_colunas(df, temporaria, info, caminho_csv):
+    colunas = []
+    for posicao, nome in enumerate(df.columns):
+        serie = df[nome]
+        arquivo = f'{posicao:03d}.npy'
+        coluna = {'nome': nome, 'arquivo': arquivo}
+
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            coluna['tipo'] = 'categoria'
+            coluna['categorias'] = serie.cat.categories.tolist()
+            valores = serie.cat.codes.to_numpy()
+        elif pd.api.types.is_datetime64_dtype(serie.dtype) or pd.api.types.is_numeric_dtype(serie.dtype):
+            coluna['tipo'] = 'valor'
+            valores = serie.to_numpy()
+        else:
+            # Textos livres são guardados como categoria para caber em .npy
+            coluna['tipo'] = 'texto'
+            codigos, categorias = pd.factorize(serie)
+            coluna['categorias'] = categorias.tolist()
+            valores = codigos
+
+        np.save(os.path.join(temporaria, arquivo), valores, allow_pickle=False)
+        colunas.append(coluna)
+
+    np.save(os.path.join(temporaria, 'indice.npy'), df.index.to_numpy(), allow_pickle=False)
+    _gravar_meta(temporaria, {
+        'versao': VERSAO_CACHE,
+        'origem': {
+            'mtime_ns': info.st_mtime_ns,
+            'tamanho': info.st_size,
+            'sha1': hash_arquivo(caminho_csv),
+        },
+        'linhas': len(df),
+        'colunas': colunas,
+    })
+
+
+def ler_cache(caminho_csv):
+    """Lê o cache mapeando os arquivos .npy em memória (páginas compartilhadas pelo SO).
+
+    Retorna None se o cache não existe ou foi trocado durante a leitura (meta.json
+    ou algum .npy sumiu, ou o meta.json mudou no meio).
+    """
+    pasta = pasta_cache(caminho_csv)
+    meta = _ler_meta(pasta)
+    if meta is None:
+        return None
+
+    dados = {}
+    try:
+        for coluna in meta['colunas']:
+            valores = np.load(os.path.join(pasta, coluna['arquivo']), mmap_mode='r')
+            if coluna['tipo'] == 'categoria':
+                dados[coluna['nome']] = pd.Categorical.from_codes(valores, coluna['categorias'])
+            elif coluna['tipo'] == 'texto':
+                categorias = np.array(coluna['categorias'] + [None], dtype=object)
+                dados[coluna['nome']] = categorias[valores]  # código -1 vira None
+            else:
+                dados[coluna['nome']] = valores
+
+        indice = np.load(os.path.join(pasta, 'indice.npy'), mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+
+    # Os arquivos abertos podem ser de uma gravação mais nova que o meta lido
+    if _ler_meta(pasta) != meta:
+        return None
+    return pd.DataFrame(dados, index=pd.Index(indice), copy=False)
+
+
+def carregar_com_cache(caminho_csv, preparar):
+    """Carrega o dataframe limpo a partir do cache colunar, reconstruindo se o CSV mudou.
+
+    `preparar(caminho_csv)` lê e limpa o CSV; só é chamada quando o cache não
+    existe ou está desatualizado. Definir DASH_CACHE_COLUNAR=0 desativa o cache.
+    """
+    if os.environ.get('DASH_CACHE_COLUNAR', '1') == '0':
+        return preparar(caminho_csv)
+
+    df = None
+    if not cache_valido(caminho_csv):
+        df = preparar(caminho_csv)
+        try:
+            salvar_cache(df, caminho_csv)
+        except OSError as erro:
+            print(f"Não foi possível gravar o cache colunar de {caminho_csv}: {erro}")
+            return df
+
+    # Outro processo pode estar trocando a pasta do cache agora: tenta de novo
+    for tentativa in range(TENTATIVAS_LEITURA):
+        lido = ler_cache(caminho_csv)
+        if lido is not None:
+            return lido
+        time.sleep(0.05 * (tentativa + 1))
+
+    print(f"Cache colunar de {caminho_csv} indisponível, lendo o CSV")
+    return df if df is not None else preparar(caminho_csv)
+
+
+# Etapa de build: python cache_colunar.py [vendas.csv] [dataset_comp.csv]
+if __name__ == '__main__':
+    from carregador import preparar_dataset_comp, preparar_vendas
+
+    preparadores = {
+        'vendas.csv': preparar_vendas,
+        'dataset_comp.csv': preparar_dataset_comp,
+    }
+    for caminho in sys.argv[1:] or list(preparadores):
+        if not os.path.exists(caminho):
+            print(f"Arquivo {caminho} não encontrado, ignorando.")
+            continue
+        preparar = preparadores.get(os.path.basename(caminho), preparar_vendas)
+        salvar_cache(preparar(caminho), caminho)
+        print(f"Cache colunar de {caminho} gerado em {pasta_cache(caminho)}")
@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from figuras_leves import para_json
+
+
+# Valores dos filtros que significam "sem filtro" e que devem gerar a mesma chave
+VALORES_TODOS = {'todas_categorias', 'ano_completo'}
+
+
+def normalizar_filtro(valor):
+    """Normaliza o valor de um filtro para uso como parte da chave do cache."""
+    if isinstance(valor, (list, tuple, set)):
+        # lista vazia ou com a opção "ano completo" equivale a não filtrar
+        if not valor or VALORES_TODOS.intersection(valor):
+            return None
+        return tuple(sorted(valor))
+    if valor is None or valor in VALORES_TODOS:
+        return None
+    return valor
+
+
+def chave_filtros(nome, *filtros):
+    """Monta a chave do cache a partir do nome do gráfico e dos filtros."""
+    return (nome,) + tuple(normalizar_filtro(filtro) for filtro in filtros)
+
+
+def _converter(figura):
+    # go.Figure ou dict montado a partir de um esqueleto (ver figuras_leves.py),
+    # convertido uma vez para o dicionário que o Dash envia (arrays viram listas)
+    if figura is None:
+        return {}
+    return json.loads(para_json(figura))
+
+
+def _copiar(figura):
+    # Cópia rasa da figura, dos traços e do layout: quem recebe pode trocar ou
+    # acrescentar chaves sem afetar o cache (os valores internos são compartilhados)
+    copia = dict(figura)
+    if 'data' in copia:
+        copia['data'] = [dict(traco) for traco in copia['data']]
+    if 'layout' in copia:
+        copia['layout'] = dict(copia['layout'])
+    return copia
+
+
+class CacheFiguras:
+    """Cache LRU com tempo de expiração para figuras já convertidas em dicionários."""
+
+    def __init__(self, max_itens=256, ttl=600):
+        self.max_itens = max_itens  # Quantidade máxima de entradas guardadas
+        self.ttl = ttl  # Tempo de vida de cada entrada em segundos (None = sem expiração)
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0  # Entradas descartadas por falta de espaço
+        self.expiracoes = 0  # Entradas descartadas por tempo de vida vencido
+        self.invalidacoes = 0
+
+    def obter(self, chave):
+        """Retorna o conteúdo guardado para a chave ou None se não existir/estiver vencido."""
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return None
+            criado_em, conteudo = item
+            if self.ttl is not None and time.monotonic() - criado_em > self.ttl:
+                del self._itens[chave]
+                self.expiracoes += 1
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return conteudo
+
+    def guardar(self, chave, conteudo):
+        """Guarda o conteúdo da chave, descartando as entradas menos usadas se precisar."""
+        with self._trava:
+            self._itens[chave] = (time.monotonic(), conteudo)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.remocoes += 1
+
+    def obter_figura(self, chave, construir):
+        """Retorna a figura da chave, construindo e convertendo apenas na primeira vez.
+
+        `construir` pode devolver uma figura ou uma tupla de figuras; o retorno
+        mantém o mesmo formato, com cada figura como dicionário pronto para o Dash.
+        Cada chamada recebe uma cópia rasa (ver _copiar): os acertos não passam
+        de novo pelo JSON.
+        Uma figura None (falha na montagem) vira uma figura vazia e o resultado
+        não é guardado, para ser montado de novo na próxima chamada.
+        """
+        conteudo = self.obter(chave)
+        if conteudo is None:
+            figuras = construir()
+            if isinstance(figuras, tuple):
+                conteudo = tuple(_converter(figura) for figura in figuras)
+                falhou = any(figura is None for figura in figuras)
+            else:
+                conteudo = _converter(figuras)
+                falhou = figuras is None
+            if not falhou:
+                self.guardar(chave, conteudo)
+
+        if isinstance(conteudo, tuple):
+            return tuple(_copiar(figura) for figura in conteudo)
+        return _copiar(conteudo)
+
+    def invalidar(self):
+        """Remove todas as entradas (usado quando o dataset é recarregado)."""
+        with self._trava:
+            self._itens.clear()
+            self.invalidacoes += 1
+
+    def estatisticas(self):
+        """Retorna os contadores do cache."""
+        with self._trava:
+            return {
+                'itens': len(self._itens),
+                'max_itens': self.max_itens,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'remocoes': self.remocoes,
+                'expiracoes': self.expiracoes,
+                'invalidacoes': self.invalidacoes,
+            }
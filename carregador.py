@@ -0,0 +1,148 @@
+import json
+import os
+
+import pandas as pd
+
+from cache_colunar import carregar_com_cache
+
+
+# Colunas de dimensão de cada dataset. Elas são guardadas como categóricas
+# (códigos inteiros + tabela de rótulos), o que reduz a memória de cada processo
+# e faz os filtros com == e isin compararem inteiros em vez de strings.
+DIMENSOES_COMP = ['Cliente', 'Categorias', 'Mes', 'Loja', 'Produto']
+DIMENSOES_VENDAS = ['produto', 'regiao']
+
+
+def categorizar(df, colunas):
+    """Converte as colunas informadas para o tipo categórico (no próprio dataframe)."""
+    for coluna in colunas:
+        if coluna in df.columns and not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+
+def tabela_codigos(df, colunas=None):
+    """Retorna, para cada coluna categórica, o dicionário código -> rótulo."""
+    if colunas is None:
+        colunas = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    return {
+        coluna: dict(enumerate(df[coluna].cat.categories))
+        for coluna in colunas
+    }
+
+
+def preparar_dataset_comp(caminho='dataset_comp.csv'):
+    """Lê o CSV do painel Ebony Store e deriva a coluna Mes."""
+    tipos = {coluna: 'category' for coluna in DIMENSOES_COMP if coluna != 'Mes'}
+    df = pd.read_csv(caminho, dtype=tipos)
+    df['dt_Venda'] = pd.to_datetime(df['dt_Venda'])
+    df['Mes'] = df['dt_Venda'].dt.strftime('%b').str.upper()
+    return categorizar(df, DIMENSOES_COMP)
+
+
+def limpar_vendas(dados):
+    """Limpeza e preparação dos dados de vendas (altera o próprio dataframe)."""
+    dados['data'] = pd.to_datetime(dados['data'], errors='coerce')  # Converte para datetime
+    dados['valor'] = dados['valor'].replace({',': '.'}, regex=True).astype(float)  # Corrige valores monetários
+    dados.dropna(subset=['produto', 'valor'], inplace=True)  # Remove dados ausentes em colunas importantes
+    dados['mes'] = dados['data'].dt.month  # Adiciona coluna para o mês
+    dados['ano'] = dados['data'].dt.year  # Adiciona coluna para o ano
+    dados['dia'] = dados['data'].dt.day  # Adiciona coluna para o dia
+    dados['dia_da_semana'] = dados['data'].dt.weekday  # Adiciona coluna para o dia da semana (0=segunda, 6=domingo)
+    return dados
+
+
+def preparar_vendas(caminho='vendas.csv'):
+    """Lê o CSV de vendas (produto e região categóricos) e aplica a limpeza."""
+    tipos = {coluna: 'category' for coluna in DIMENSOES_VENDAS}
+    return limpar_vendas(pd.read_csv(caminho, dtype=tipos))
+
+
+def ler_vendas_em_blocos(caminho='vendas.csv', tamanho_bloco=100_000, nrows=None):
+    """Lê o CSV de vendas em blocos, devolvendo cada bloco já limpo."""
+    tipos = {coluna: 'category' for coluna in DIMENSOES_VENDAS}
+    for bloco in pd.read_csv(caminho, dtype=tipos, chunksize=tamanho_bloco, nrows=nrows):
+        yield limpar_vendas(bloco)
+
+
+def contar_linhas_completas(caminho, tamanho_bloco=1 << 20):
+    """Retorna (byte após a última quebra de linha, linhas de dados completas) do CSV."""
+    posicao = 0
+    quebras = 0
+    lidos = 0
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            ultima = bloco.rfind(b'\n')
+            if ultima >= 0:
+                quebras += bloco.count(b'\n')
+                posicao = lidos + ultima + 1
+            lidos += len(bloco)
+    return posicao, max(quebras - 1, 0)  # desconta o cabeçalho
+
+
+def carregar_dataset_comp(caminho='dataset_comp.csv'):
+    """Carrega o dataset do painel Ebony Store já tipado, usando o cache colunar."""
+    return carregar_com_cache(caminho, preparar_dataset_comp)
+
+
+def carregar_vendas(caminho='vendas.csv'):
+    """Carrega o dataset de vendas já limpo, usando o cache colunar."""
+    return carregar_com_cache(caminho, preparar_vendas)
+
+
+def particoes_no_intervalo(diretorio, inicio=None, fim=None):
+    """Lê o manifest.json da pasta particionada e retorna as partições que cruzam o intervalo."""
+    with open(os.path.join(diretorio, 'manifest.json'), encoding='utf-8') as arquivo:
+        manifesto = json.load(arquivo)
+    inicio = pd.Timestamp(inicio) if inicio is not None else None
+    fim = pd.Timestamp(fim) if fim is not None else None
+
+    selecionadas = []
+    for particao in manifesto['particoes']:
+        if inicio is not None and pd.Timestamp(particao['data_max']) < inicio:
+            continue
+        if fim is not None and pd.Timestamp(particao['data_min']) > fim:
+            continue
+        selecionadas.append(particao)
+    return manifesto, selecionadas
+
+
+def carregar_particoes(diretorio, inicio=None, fim=None):
+    """Carrega de uma pasta gerada por `gera.py --particionado` só as partições do intervalo.
+
+    As partições fora do intervalo são descartadas pelo manifesto, sem abrir
+    os arquivos; o resultado passa pela mesma preparação do CSV único.
+    """
+    manifesto, particoes = particoes_no_intervalo(diretorio, inicio, fim)
+    esquema = manifesto['esquema']
+    dimensoes = DIMENSOES_VENDAS if esquema == 'vendas' else [c for c in DIMENSOES_COMP if c != 'Mes']
+
+    partes = []
+    for particao in particoes:
+        caminho = os.path.join(diretorio, particao['arquivo'])
+        if manifesto['formato'] == 'parquet':
+            partes.append(pd.read_parquet(caminho))
+        else:
+            partes.append(pd.read_csv(caminho))
+    if partes:
+        df = pd.concat(partes, ignore_index=True)
+    else:
+        colunas = ['produto', 'regiao', 'valor', 'data'] if esquema == 'vendas' else dimensoes + ['dt_Venda', 'Total Vendas']
+        df = pd.DataFrame(columns=colunas)
+    categorizar(df, dimensoes)
+
+    coluna_data = manifesto['coluna_data']
+    if inicio is not None or fim is not None:
+        datas = pd.to_datetime(df[coluna_data])
+        dentro = pd.Series(True, index=df.index)
+        if inicio is not None:
+            dentro &= datas >= pd.Timestamp(inicio)
+        if fim is not None:
+            dentro &= datas <= pd.Timestamp(fim)
+        df = df[dentro].reset_index(drop=True)
+
+    if esquema == 'vendas':
+        return limpar_vendas(df)
+    df['dt_Venda'] = pd.to_datetime(df['dt_Venda'])
+    df['Mes'] = df['dt_Venda'].dt.strftime('%b').str.upper()
+    return categorizar(df, ['Mes'])
@@ -0,0 +1,105 @@
+import os
+import threading
+
+import numpy as np
+import plotly.graph_objs as go
+import plotly.io as pio
+
+try:
+    import orjson  # noqa: F401
+    MOTOR_JSON = 'orjson'  # serializa arrays NumPy direto, sem passar por listas Python
+except ImportError:
+    MOTOR_JSON = 'json'
+
+# Acima desse número de pontos os traços passam para WebGL (mesmo limite do plotly.express)
+LIMITE_WEBGL = 1000
+
+# Com DASH_FIGURAS_LEVES=0 os gráficos voltam a ser montados só pelo plotly
+# (px/go com validação), útil para comparar o resultado dos dois caminhos
+ATIVO = os.environ.get('DASH_FIGURAS_LEVES', '1') != '0'
+
+
+def para_json(figura):
+    """Serializa uma figura (go.Figure ou dict) em JSON compacto, sem validar de novo."""
+    return pio.to_json(figura, validate=False, engine=MOTOR_JSON)
+
+
+def coluna(serie):
+    """Valores de uma coluna como array NumPy (categóricas viram objetos, como no plotly)."""
+    if hasattr(serie, 'cat'):
+        return serie.astype(object).to_numpy()
+    return serie.to_numpy()
+
+
+class Esqueleto:
+    """Figura montada e validada pelo plotly uma única vez; depois só os dados mudam.
+
+    `construir(*chave)` monta a figura de referência (com o mesmo código do
+    caminho normal e dados de exemplo). O dict resultante, já com o template
+    resolvido, é guardado por chave (ex.: o tema) e reaproveitado: quem usa o
+    esqueleto copia só os pedaços que mudam e compartilha o resto.
+    """
+
+    def __init__(self, construir):
+        self._construir = construir
+        self._figuras = {}
+        self._trava = threading.Lock()
+
+    def __call__(self, *chave):
+        figura = self._figuras.get(chave)
+        if figura is None:
+            with self._trava:
+                figura = self._figuras.get(chave)
+                if figura is None:
+                    figura = self._construir(*chave).to_plotly_json()
+                    self._figuras[chave] = figura
+        return figura
+
+    def traco(self, *chave, indice=0):
+        """Primeiro traço (ou o do índice) da figura de referência."""
+        return self(*chave)['data'][indice]
+
+    def layout(self, *chave):
+        return self(*chave)['layout']
+
+
+def com(base, **alteracoes):
+    """Cópia rasa de um dict do esqueleto com algumas chaves trocadas."""
+    copia = dict(base)
+    copia.update(alteracoes)
+    return copia
+
+
+def vazio(*colunas):
+    """True se alguma das colunas está vazia (os esqueletos voltam ao plotly nesses casos)."""
+    return any(len(np.asarray(valores)) == 0 for valores in colunas)
+
+
+def tracos_por_serie(dados, series, cores=None, limite_webgl=LIMITE_WEBGL, **propriedades):
+    """Um traço de pontos por série, com todos os valores dela em arrays.
+
+    `dados[serie]` é um dict {categoria: valor} (como o dados_conceitos do
+    aula2.py). O traço base é validado pelo plotly uma vez e copiado para cada
+    série; acima de `limite_webgl` pontos no total o tipo vira Scattergl.
+    `propriedades` vão para o traço base (ex.: marker, showlegend).
+    """
+    series = list(series or [])
+    pontos = sum(len(dados[serie]) for serie in series)
+    tipo = go.Scattergl if pontos > limite_webgl else go.Scatter
+    base = tipo(mode='markers', **propriedades).to_plotly_json()
+    marcador = base.get('marker', {})
+    cores = cores or {}
+
+    tracos = []
+    for serie in series:
+        valores = dados[serie]
+        traco = com(
+            base,
+            x=list(valores),
+            y=np.fromiter(valores.values(), dtype=float, count=len(valores)),
+            name=str(serie).title()
+        )
+        if serie in cores:
+            traco['marker'] = com(marcador, color=cores[serie])
+        tracos.append(traco)
+    return tracos
@@ -1,29 +1,287 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-import random
-from datetime import datetime, timedelta
+
+# Valores de cada dimensão dos datasets fictícios
+PRODUTOS = ['Produto A', 'Produto B', 'Produto C', 'Produto D']
+REGIOES = ['Norte', 'Sul', 'Leste', 'Oeste']
+CLIENTES = ['Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor']
+CATEGORIAS = ['Roupas', 'Calçados', 'Acessórios', 'Bolsas']
+LOJAS = ['Rio de Janeiro', 'Salvador', 'Santos', 'São Paulo', 'Três Rios']
+PRODUTOS_COMP = ['Camiseta', 'Calça', 'Tênis', 'Sandália', 'Relógio', 'Óculos', 'Mochila', 'Carteira']
+
+# Esquemas disponíveis: 'vendas' (vendas.csv, usado em aula04_B.py) e
+# 'comp' (dataset_comp.csv, usado em lalala.py). Para cada coluna de dimensão,
+# a lista de valores padrão e o prefixo usado quando a cardinalidade é maior.
+ESQUEMAS = {
+    'vendas': {
+        'produto': (PRODUTOS, 'Produto'),
+        'regiao': (REGIOES, 'Região'),
+    },
+    'comp': {
+        'Cliente': (CLIENTES, 'Cliente'),
+        'Categorias': (CATEGORIAS, 'Categoria'),
+        'Loja': (LOJAS, 'Loja'),
+        'Produto': (PRODUTOS_COMP, 'Produto'),
+    },
+}
+
+# Colunas de data e de valor de cada esquema (usadas na partição e no manifesto)
+COLUNAS_DATA_VALOR = {
+    'vendas': ('data', 'valor'),
+    'comp': ('dt_Venda', 'Total Vendas'),
+}
+
+# Data de referência ("hoje") das vendas quando há semente e nenhuma data foi
+# informada: com a hora atual, duas execuções com a mesma semente dariam datas diferentes
+DATA_REFERENCIA = '2024-12-31'
+
+
+def data_referencia(hoje=None, seed=None):
+    """Data a partir da qual as vendas são sorteadas para trás: a informada, a fixa (com semente) ou agora."""
+    if hoje is not None:
+        return pd.Timestamp(hoje)
+    if seed is not None:
+        return pd.Timestamp(DATA_REFERENCIA)
+    return pd.Timestamp.today()
+
+
+def valores_dimensao(padrao, prefixo, cardinalidade=None):
+    """Lista de valores de uma dimensão com a cardinalidade pedida."""
+    if cardinalidade is None or cardinalidade == len(padrao):
+        return list(padrao)
+    if cardinalidade < len(padrao):
+        return list(padrao[:cardinalidade])
+    return list(padrao) + [f'{prefixo} {i}' for i in range(len(padrao) + 1, cardinalidade + 1)]
+
+
+def pesos_zipf(quantidade, assimetria=0.0):
+    """Probabilidade de cada valor: uniforme com assimetria 0, concentrada nos primeiros (Zipf) acima disso."""
+    pesos = 1.0 / np.arange(1, quantidade + 1) ** assimetria
+    return pesos / pesos.sum()
+
+
+def gerar_bloco(rng, num_linhas, esquema='vendas', cardinalidades=None, assimetria=0.0, hoje=None):
+    """Gera um bloco de vendas fictícias com operações vetorizadas do NumPy."""
+    cardinalidades = cardinalidades or {}
+    hoje = pd.Timestamp.today() if hoje is None else pd.Timestamp(hoje)
+    dias = rng.integers(0, 366, num_linhas)  # até um ano para trás
+
+    dados = {}
+    for coluna, (padrao, prefixo) in ESQUEMAS[esquema].items():
+        valores = valores_dimensao(padrao, prefixo, cardinalidades.get(coluna))
+        if assimetria:
+            codigos = rng.choice(len(valores), size=num_linhas, p=pesos_zipf(len(valores), assimetria))
+        else:
+            codigos = rng.integers(0, len(valores), num_linhas)
+        dados[coluna] = pd.Categorical.from_codes(codigos, valores)
+
+    if esquema == 'vendas':
+        dados['valor'] = rng.uniform(50, 500, num_linhas).round(2)
+        dados['data'] = hoje - pd.to_timedelta(dias, unit='D')
+        return pd.DataFrame(dados, columns=['produto', 'regiao', 'valor', 'data'])
+
+    dados['dt_Venda'] = hoje.normalize() - pd.to_timedelta(dias, unit='D')
+    dados['Total Vendas'] = rng.uniform(10, 1000, num_linhas).round(2)
+    return pd.DataFrame(dados, columns=['Cliente', 'Categorias', 'dt_Venda', 'Loja', 'Produto', 'Total Vendas'])
+
+
+def gerar_blocos(num_linhas, tamanho_bloco=1_000_000, seed=None, rng=None, **opcoes):
+    """Gera os dados em blocos de até `tamanho_bloco` linhas (memória limitada ao bloco)."""
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    opcoes['hoje'] = data_referencia(opcoes.get('hoje'), seed)  # mesma referência em todos os blocos
+    for inicio in range(0, num_linhas, tamanho_bloco):
+        yield gerar_bloco(rng, min(tamanho_bloco, num_linhas - inicio), **opcoes)
+
 
 # Função para gerar dados de vendas fictícios
-def gerar_dados_vendas(num_linhas):
-    produtos = ['Produto A', 'Produto B', 'Produto C', 'Produto D']
-    regioes = ['Norte', 'Sul', 'Leste', 'Oeste']
-    dados = []
+def gerar_dados_vendas(num_linhas, seed=None, **opcoes):
+    """Gera `num_linhas` vendas fictícias em um único dataframe."""
+    blocos = list(gerar_blocos(num_linhas, seed=seed, **opcoes))
+    if not blocos:
+        return gerar_bloco(np.random.default_rng(seed), 0, **opcoes)
+    return pd.concat(blocos, ignore_index=True)
+
+
+def salvar_blocos(blocos, caminho, formato='csv'):
+    """Grava os blocos em sequência no arquivo (CSV ou Parquet), sem juntá-los em memória."""
+    total = 0
+    if formato == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("O formato parquet precisa do pacote pyarrow (pip install pyarrow)")
+        escritor = None
+        try:
+            for bloco in blocos:
+                tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(caminho, tabela.schema)
+                escritor.write_table(tabela)
+                total += len(bloco)
+        finally:
+            if escritor is not None:
+                escritor.close()
+        return total
+
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        for bloco in blocos:
+            bloco.to_csv(arquivo, index=False, header=(total == 0))
+            total += len(bloco)
+    return total
+
+
+def _gravar_particoes(bloco, diretorio, nome_arquivo, esquema, formato):
+    """Grava o bloco separado por ano/mês (pastas ano=AAAA/mes=MM) e retorna as estatísticas de cada arquivo."""
+    coluna_data, coluna_valor = COLUNAS_DATA_VALOR[esquema]
+    datas = bloco[coluna_data]
+    particoes = []
+    for (ano, mes), parte in bloco.groupby([datas.dt.year, datas.dt.month], sort=True):
+        relativo = os.path.join(f'ano={ano:04d}', f'mes={mes:02d}', f'{nome_arquivo}.{formato}')
+        caminho = os.path.join(diretorio, relativo)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        if formato == 'parquet':
+            parte.to_parquet(caminho, index=False)
+        else:
+            parte.to_csv(caminho, index=False)
+        particoes.append({
+            'arquivo': relativo,
+            'ano': int(ano),
+            'mes': int(mes),
+            'linhas': len(parte),
+            'data_min': str(parte[coluna_data].min()),
+            'data_max': str(parte[coluna_data].max()),
+            'valor_min': float(parte[coluna_valor].min()),
+            'valor_max': float(parte[coluna_valor].max()),
+        })
+    return particoes
+
+
+def _gerar_shard(tarefa):
+    """Gera um shard com seu próprio fluxo aleatório (executado em um processo do pool)."""
+    shard, semente, num_linhas, diretorio, esquema, formato, tamanho_bloco, opcoes = tarefa
+    rng = np.random.default_rng(semente)
+    particoes = []
+    blocos = gerar_blocos(num_linhas, tamanho_bloco=tamanho_bloco, rng=rng, esquema=esquema, **opcoes)
+    for numero, bloco in enumerate(blocos):
+        nome_arquivo = f'parte-{shard:05d}-{numero:05d}'
+        for particao in _gravar_particoes(bloco, diretorio, nome_arquivo, esquema, formato):
+            particao['shard'] = shard
+            particoes.append(particao)
+    return particoes
+
+
+def gerar_particionado(num_linhas, diretorio, shards=None, processos=None, seed=None,
+                       esquema='vendas', formato='csv', tamanho_bloco=1_000_000, **opcoes):
+    """Gera o dataset em paralelo, dividido em shards, gravando partições por ano/mês.
+
+    Cada shard usa um fluxo aleatório independente derivado da semente
+    (SeedSequence.spawn) e todos usam a mesma data de referência (fixa quando
+    há semente, ver data_referencia), então o resultado é reprodutível para a
+    mesma semente e quantidade de shards, qualquer que seja o número de processos.
+    Ao final grava `manifest.json` com as linhas e as faixas de data/valor de
+    cada arquivo e de cada shard, para que os leitores possam escolher só as
+    partições necessárias.
+    """
+    shards = shards or os.cpu_count() or 1
+    opcoes['hoje'] = str(data_referencia(opcoes.get('hoje'), seed))  # mesma referência em todos os shards
+    sementes = np.random.SeedSequence(seed).spawn(shards)
+    base, resto = divmod(num_linhas, shards)
+
+    tarefas = [
+        (shard, sementes[shard], base + (shard < resto), diretorio, esquema, formato, tamanho_bloco, opcoes)
+        for shard in range(shards)
+    ]
+    os.makedirs(diretorio, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        resultados = list(pool.map(_gerar_shard, tarefas))
+
+    particoes = [particao for resultado in resultados for particao in resultado]
+    resumo_shards = []
+    for shard, resultado in enumerate(resultados):
+        resumo_shards.append({
+            'shard': shard,
+            'linhas': sum(p['linhas'] for p in resultado),
+            'data_min': min((p['data_min'] for p in resultado), default=None),
+            'data_max': max((p['data_max'] for p in resultado), default=None),
+            'valor_min': min((p['valor_min'] for p in resultado), default=None),
+            'valor_max': max((p['valor_max'] for p in resultado), default=None),
+        })
+
+    manifesto = {
+        'esquema': esquema,
+        'formato': formato,
+        'seed': seed,
+        'linhas': sum(p['linhas'] for p in particoes),
+        'coluna_data': COLUNAS_DATA_VALOR[esquema][0],
+        'coluna_valor': COLUNAS_DATA_VALOR[esquema][1],
+        'shards': resumo_shards,
+        'particoes': sorted(particoes, key=lambda p: (p['ano'], p['mes'], p['arquivo'])),
+    }
+    with open(os.path.join(diretorio, 'manifest.json'), 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+    return manifesto
 
-    for _ in range(num_linhas):
-        produto = random.choice(produtos)
-        regiao = random.choice(regioes)
-        valor = round(random.uniform(50, 500), 2)
-        data = datetime.today() - timedelta(days=random.randint(0, 365))
-        dados.append([produto, regiao, valor, data])
 
-    return dados
+def _argumentos():
+    parser = argparse.ArgumentParser(description='Gera datasets de vendas fictícias.')
+    parser.add_argument('--linhas', type=int, default=100, help='quantidade de linhas (padrão: 100)')
+    parser.add_argument('--esquema', choices=list(ESQUEMAS), default='vendas')
+    parser.add_argument('--saida', help='arquivo de saída (padrão: vendas.csv ou dataset_comp.csv)')
+    parser.add_argument('--formato', choices=['csv', 'parquet'], default=None)
+    parser.add_argument('--seed', type=int, default=None, help='semente do gerador (reprodutível)')
+    parser.add_argument('--hoje', default=None,
+                        help=f'data de referência das vendas (padrão: agora; com --seed, {DATA_REFERENCIA})')
+    parser.add_argument('--bloco', type=int, default=1_000_000, help='linhas por bloco gravado')
+    parser.add_argument('--assimetria', type=float, default=0.0, help='expoente Zipf das dimensões (0 = uniforme)')
+    parser.add_argument('--cardinalidade', action='append', default=[], metavar='COLUNA=N',
+                        help='quantidade de valores distintos de uma dimensão (ex.: produto=1000)')
+    parser.add_argument('--particionado', metavar='PASTA',
+                        help='gera em paralelo, particionado por ano/mês, dentro da pasta')
+    parser.add_argument('--shards', type=int, default=None, help='quantidade de shards (padrão: núcleos)')
+    parser.add_argument('--processos', type=int, default=None, help='processos do pool (padrão: núcleos)')
+    return parser.parse_args()
 
-# Gerar 100 linhas de dados fictícios
-dados_vendas = gerar_dados_vendas(100)
 
-# Criando o dataframe
-df_vendas = pd.DataFrame(dados_vendas, columns=['produto', 'regiao', 'valor', 'data'])
+if __name__ == '__main__':
+    args = _argumentos()
+    saida = args.saida or ('vendas.csv' if args.esquema == 'vendas' else 'dataset_comp.csv')
+    formato = args.formato or ('parquet' if os.path.splitext(saida)[1] == '.parquet' else 'csv')
+    cardinalidades = {
+        coluna: int(valor)
+        for coluna, valor in (item.split('=', 1) for item in args.cardinalidade)
+    }
 
-# Salvando o arquivo CSV
-df_vendas.to_csv('vendas.csv', index=False)
+    if args.particionado:
+        manifesto = gerar_particionado(
+            args.linhas,
+            args.particionado,
+            shards=args.shards,
+            processos=args.processos,
+            seed=args.seed,
+            esquema=args.esquema,
+            formato=args.formato or 'csv',
+            tamanho_bloco=args.bloco,
+            cardinalidades=cardinalidades,
+            assimetria=args.assimetria,
+            hoje=args.hoje
+        )
+        print(f"{manifesto['linhas']} linhas geradas em {len(manifesto['particoes'])} arquivos em {args.particionado}")
+    else:
+        blocos = gerar_blocos(
+            args.linhas,
+            tamanho_bloco=args.bloco,
+            seed=args.seed,
+            esquema=args.esquema,
+            cardinalidades=cardinalidades,
+            assimetria=args.assimetria,
+            hoje=args.hoje
+        )
+        salvar_blocos(blocos, saida, formato)
 
-print("Arquivo vendas.csv gerado com sucesso!")
+        print(f"Arquivo {saida} gerado com sucesso!")
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+
+class IndiceBitmap:
+    """Índice com um bitmap (array booleano por linha) para cada valor de uma coluna.
+
+    Os bitmaps são montados uma única vez, na carga dos dados. Um filtro vira
+    uma consulta ao dicionário (ou um OR entre bitmaps, para vários valores) e
+    o caso "todos" é representado por None, sem alocar nenhuma máscara.
+    """
+
+    def __init__(self, coluna):
+        if isinstance(coluna.dtype, pd.CategoricalDtype):
+            codigos = coluna.cat.codes.to_numpy()
+            valores = coluna.cat.categories
+        else:
+            codigos, valores = pd.factorize(coluna)
+
+        self.tamanho = len(coluna)
+        self._bitmaps = {}
+        for codigo, valor in enumerate(valores):
+            bitmap = codigos == codigo
+            if not bitmap.any():
+                continue  # categoria sem nenhuma linha
+            bitmap.flags.writeable = False  # compartilhado entre chamadas
+            self._bitmaps[valor] = bitmap
+
+        self._vazio = np.zeros(self.tamanho, dtype=bool)
+        self._vazio.flags.writeable = False
+
+    def valores(self):
+        """Retorna os valores indexados."""
+        return list(self._bitmaps)
+
+    def bitmap(self, valor):
+        """Retorna o bitmap das linhas com o valor informado."""
+        return self._bitmaps.get(valor, self._vazio)
+
+    def filtrar(self, valores):
+        """Retorna o bitmap das linhas com qualquer um dos valores, ou None para "todos".
+
+        `valores` pode ser um valor único ou uma lista; None, ou uma lista que
+        cobre todos os valores indexados, significa que não há filtro.
+        """
+        if valores is None:
+            return None
+        if not isinstance(valores, (list, tuple, set)):
+            return self.bitmap(valores)
+
+        selecionados = set(valores)
+        if selecionados.issuperset(self._bitmaps):
+            return None
+        bitmaps = [self._bitmaps[v] for v in selecionados if v in self._bitmaps]
+        if not bitmaps:
+            return self._vazio
+        if len(bitmaps) == 1:
+            return bitmaps[0]
+        return np.logical_or.reduce(bitmaps)
+
+
+def combinar(*bitmaps):
+    """Faz o AND dos bitmaps informados, ignorando os filtros "todos" (None)."""
+    ativos = [bitmap for bitmap in bitmaps if bitmap is not None]
+    if not ativos:
+        return None
+    if len(ativos) == 1:
+        return ativos[0]
+    return np.logical_and.reduce(ativos)
+
+
+def aplicar(df, bitmap):
+    """Aplica o bitmap ao dataframe (None devolve o próprio dataframe)."""
+    if bitmap is None:
+        return df
+    return df[bitmap]
@@ -0,0 +1,237 @@
+import contextvars
+import cProfile
+import functools
+import os
+import random
+import threading
+import time
+
+from flask import g, has_request_context
+
+# Com DASH_METRICAS=1 os callbacks registram a duração de cada etapa, as linhas
+# processadas e o tamanho da resposta. Desligado (padrão), o decorador devolve
+# a própria função e `etapa()` devolve um objeto nulo compartilhado.
+# As métricas são de cada processo: com vários workers (servir.py) cada série
+# leva o rótulo worker=<pid> e o Prometheus soma os workers na consulta.
+ATIVO = os.environ.get('DASH_METRICAS') == '1'
+
+# Fração das chamadas perfiladas com cProfile (0 = nenhuma) e pasta dos .prof
+AMOSTRA_PERFIL = float(os.environ.get('DASH_PERFIL_AMOSTRA', '0'))
+PASTA_PERFIL = os.environ.get('DASH_PERFIL_PASTA', 'perfis')
+
+# Limites dos histogramas (segundos e bytes)
+LIMITES_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_BYTES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Callback em execução (contextvars: segue a chamada nas threads de paralelo.py)
+_callback_atual = contextvars.ContextVar('callback_atual', default='-')
+
+_trava = threading.Lock()
+_duracoes = {}  # (callback, etapa) -> Histograma
+_linhas = {}  # (callback, etapa) -> total de linhas processadas
+_payloads = {}  # callback -> Histograma
+
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus (contagens por limite, soma e total)."""
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.contagens[i] += 1
+        self.soma += valor
+        self.total += 1
+
+
+def _observar(tabela, chave, limites, valor):
+    with _trava:
+        histograma = tabela.get(chave)
+        if histograma is None:
+            histograma = tabela[chave] = Histograma(limites)
+        histograma.observar(valor)
+
+
+class _Etapa:
+    """Mede uma etapa do callback atual; `linhas` pode ser preenchido dentro do bloco."""
+
+    __slots__ = ('nome', 'linhas', '_inicio')
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.linhas = None
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *erro):
+        chave = (_callback_atual.get(), self.nome)
+        _observar(_duracoes, chave, LIMITES_SEGUNDOS, time.perf_counter() - self._inicio)
+        if self.linhas is not None:
+            with _trava:
+                _linhas[chave] = _linhas.get(chave, 0) + int(self.linhas)
+        return False
+
+
+class _EtapaNula:
+    """Usada com a instrumentação desligada: não mede nada e ignora `linhas`."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        return False
+
+    def __setattr__(self, nome, valor):
+        pass
+
+
+_ETAPA_NULA = _EtapaNula()
+
+
+def etapa(nome):
+    """Context manager que mede uma etapa (filtro, agrupamento, figura...) do callback atual."""
+    if not ATIVO:
+        return _ETAPA_NULA
+    return _Etapa(nome)
+
+
+def _marcar_resposta(nome):
+    # A serialização e o tamanho da resposta são medidos depois, no after_request
+    # registrado por registrar_rota, sobre o corpo que o Dash realmente enviou
+    if has_request_context():
+        g.callback_medido = nome
+        g.fim_callback = time.perf_counter()
+
+
+def _medir_resposta(resposta):
+    """after_request: tempo do fim do callback até a resposta pronta e bytes do corpo."""
+    nome = g.pop('callback_medido', None)
+    if nome is not None:
+        _observar(_duracoes, (nome, 'serializacao'), LIMITES_SEGUNDOS, time.perf_counter() - g.fim_callback)
+        if not resposta.is_streamed:
+            _observar(_payloads, nome, LIMITES_BYTES, len(resposta.get_data()))
+    return resposta
+
+
+def _perfilar(nome, funcao, args, kwargs):
+    """Executa a chamada sob o cProfile e grava o .prof (abrível com pstats/snakeviz)."""
+    perfil = cProfile.Profile()
+    try:
+        perfil.enable()
+    except ValueError:
+        return funcao(*args, **kwargs)  # outro perfilador já ativo nesta thread/processo
+    try:
+        return funcao(*args, **kwargs)
+    finally:
+        perfil.disable()
+        os.makedirs(PASTA_PERFIL, exist_ok=True)
+        arquivo = f'{nome}-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{threading.get_ident()}.prof'
+        perfil.dump_stats(os.path.join(PASTA_PERFIL, arquivo))
+
+
+def instrumentar_callback(nome):
+    """Decorador de callbacks: mede o total, a serialização da resposta e o tamanho dela.
+
+    Deve ficar abaixo do @app.callback, para que o Dash registre a função medida.
+    A serialização e o tamanho só são medidos dentro de uma requisição ao
+    servidor em que registrar_rota foi chamado. Com a instrumentação
+    desligada, devolve a própria função.
+    """
+    def decorador(funcao):
+        if not ATIVO:
+            return funcao
+
+        @functools.wraps(funcao)
+        def medido(*args, **kwargs):
+            token = _callback_atual.set(nome)
+            try:
+                with _Etapa('total'):
+                    if AMOSTRA_PERFIL and random.random() < AMOSTRA_PERFIL:
+                        saida = _perfilar(nome, funcao, args, kwargs)
+                    else:
+                        saida = funcao(*args, **kwargs)
+                _marcar_resposta(nome)
+                return saida
+            finally:
+                _callback_atual.reset(token)
+        return medido
+    return decorador
+
+
+# -------------------- PROMETHEUS --------------------
+def _rotulos(**rotulos):
+    texto = ','.join(
+        '{}="{}"'.format(chave, str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for chave, valor in rotulos.items()
+    )
+    return '{' + texto + '}'
+
+
+def _linhas_histograma(metrica, histograma, **rotulos):
+    linhas = []
+    for limite, contagem in zip(histograma.limites, histograma.contagens):
+        linhas.append(f'{metrica}_bucket{_rotulos(**rotulos, le=limite)} {contagem}')
+    linhas.append(f'{metrica}_bucket{_rotulos(**rotulos, le="+Inf")} {histograma.total}')
+    linhas.append(f'{metrica}_sum{_rotulos(**rotulos)} {histograma.soma}')
+    linhas.append(f'{metrica}_count{_rotulos(**rotulos)} {histograma.total}')
+    return linhas
+
+
+def metricas_prometheus():
+    """Texto das métricas no formato de exposição do Prometheus (deste processo)."""
+    worker = os.getpid()
+    with _trava:
+        linhas = [
+            '# HELP dash_callback_duracao_segundos Duração de cada etapa dos callbacks.',
+            '# TYPE dash_callback_duracao_segundos histogram',
+        ]
+        for (callback, nome), histograma in sorted(_duracoes.items()):
+            linhas += _linhas_histograma('dash_callback_duracao_segundos', histograma,
+                                         worker=worker, callback=callback, etapa=nome)
+
+        linhas += [
+            '# HELP dash_callback_linhas_total Linhas processadas em cada etapa dos callbacks.',
+            '# TYPE dash_callback_linhas_total counter',
+        ]
+        for (callback, nome), total in sorted(_linhas.items()):
+            linhas.append(f'dash_callback_linhas_total{_rotulos(worker=worker, callback=callback, etapa=nome)} {total}')
+
+        linhas += [
+            '# HELP dash_callback_resposta_bytes Tamanho do JSON da resposta dos callbacks.',
+            '# TYPE dash_callback_resposta_bytes histogram',
+        ]
+        for callback, histograma in sorted(_payloads.items()):
+            linhas += _linhas_histograma('dash_callback_resposta_bytes', histograma, worker=worker, callback=callback)
+    return '\n'.join(linhas) + '\n'
+
+
+def registrar_rota(server, caminho='/metrics'):
+    """Expõe as métricas no servidor Flask do app e mede as respostas dos callbacks.
+
+    Só tem efeito com a instrumentação ligada.
+    """
+    if not ATIVO:
+        return
+
+    def metricas():
+        return metricas_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+    server.add_url_rule(caminho, 'metricas_prometheus', metricas)
+    server.after_request(_medir_resposta)
+
+
+def zerar():
+    """Descarta as métricas acumuladas."""
+    with _trava:
+        _duracoes.clear()
+        _linhas.clear()
+        _payloads.clear()
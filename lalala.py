@@ -5,7 +5,21 @@ import dash
 import dash_bootstrap_components as dbc
 from dash_bootstrap_templates import ThemeSwitchAIO
 from dash.dependencies import Input, Output
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, ClientsideFunction
+import plotly.io as pio
+from collections import namedtuple
+from functools import partial
+import os
+import threading
+import time
+
+from cache_figuras import CacheFiguras, chave_filtros
+import figuras_leves
+from figuras_leves import Esqueleto, com, coluna, vazio
+from carregador import carregar_dataset_comp, tabela_codigos
+from indice_bitmap import IndiceBitmap, aplicar, combinar
+from instrumentacao import etapa, instrumentar_callback, registrar_rota
+from paralelo import executar_tarefas
 
 
 # Configurando cores para os temas
@@ -16,16 +30,83 @@ url_vapor_theme = dbc.themes.VAPOR
 
 
 # -------------------- DADOS --------------------
-# Importando dados
-df = pd.read_csv('dataset_comp.csv')
-df['dt_Venda'] = pd.to_datetime(df['dt_Venda'])
-df['Mes'] = df['dt_Venda'].dt.strftime('%b').str.upper()
+# Cubo pré-agregado: soma de vendas por combinação das dimensões usadas nos
+# filtros e gráficos. Os callbacks consultam o cubo em vez do df completo,
+# então o custo depende do número de grupos e não do número de linhas.
+dimensoes_cubo = ['Cliente', 'Categorias', 'Mes', 'Loja', 'Produto']
+arquivo_dados = 'dataset_comp.csv'
+
+# Tudo o que os callbacks leem do dataset. É trocado inteiro numa única
+# atribuição na recarga: cada callback pega `dados` uma vez e usa só essa cópia
+Dados = namedtuple('Dados', ['df', 'cubo', 'indices', 'versao', 'mtime_ns'])
+
+# Índices bitmap das dimensões filtráveis, montados uma vez sobre o cubo
+def criar_indices(cubo):
+    return {
+        dimensao: IndiceBitmap(cubo[dimensao])
+        for dimensao in ['Cliente', 'Categorias', 'Mes']
+    }
+
+def carregar_dados(versao=0):
+    # Importando dados (dimensões como categóricas, ver carregador.py)
+    mtime_ns = os.stat(arquivo_dados).st_mtime_ns
+    df = carregar_dataset_comp(arquivo_dados)
+
+    # dropna=False: linhas sem Cliente, Produto ou Categorias continuam nos totais
+    cubo = df.groupby(dimensoes_cubo, observed=True, dropna=False)['Total Vendas'].sum().reset_index()
+    return Dados(df, cubo, criar_indices(cubo), versao, mtime_ns)
+
+dados = carregar_dados()
+
+# Cache das figuras já montadas, indexado pelo estado dos filtros e pela versão
+# dos dados: uma figura que terminar de ser montada depois de uma recarga fica
+# guardada na versão antiga, que ninguém mais pede
+cache_figuras = CacheFiguras(max_itens=512, ttl=600)
+
+# De quanto em quanto tempo (segundos) os callbacks conferem se o CSV mudou
+INTERVALO_RECARGA = float(os.environ.get('DASH_INTERVALO_RECARGA', '30'))
+_trava_recarga = threading.Lock()
+_ultima_verificacao = time.monotonic()
+
+def recarregar_dados():
+    # Relê o dataset e troca os dados de uma vez; as figuras antigas deixam de
+    # ser encontradas (a versão faz parte da chave) e são descartadas
+    global dados
+    novos = carregar_dados(dados.versao + 1)
+    dados = novos
+    cache_figuras.invalidar()
+    if MODO_CLIENTE:
+        store_cubo.data = dados_cubo_cliente(novos.cubo)  # vale a partir da próxima carga da página
+    return novos
+
+def dados_atuais():
+    # Chamado no começo dos callbacks: se o CSV mudou desde a carga, recarrega
+    # (cada worker confere por conta própria, no máximo a cada INTERVALO_RECARGA)
+    global _ultima_verificacao
+    atuais = dados
+    if time.monotonic() - _ultima_verificacao < INTERVALO_RECARGA:
+        return atuais
+    with _trava_recarga:
+        if time.monotonic() - _ultima_verificacao < INTERVALO_RECARGA:
+            return dados
+        _ultima_verificacao = time.monotonic()
+        try:
+            mudou = os.stat(arquivo_dados).st_mtime_ns != dados.mtime_ns
+        except OSError:
+            mudou = False  # arquivo sendo trocado: confere de novo na próxima vez
+        if mudou:
+            return recarregar_dados()
+        return dados
+
+def versao_dados():
+    """Versão dos dados carregados neste processo (usada pelo /pronto do servir.py)."""
+    return dados.versao
 
 
 # ------------------- LISTAS --------------------
 # Criando lista de clientes
 lista_clientes = []
-for cliente in df['Cliente'].unique():
+for cliente in dados.df['Cliente'].unique():
     lista_clientes.append({
             'label': cliente, 
             'value': cliente
@@ -53,7 +134,7 @@ meses_br = dict(
 )
 
 lista_meses = []
-for mes in df['Mes'].unique(): 
+for mes in dados.df['Mes'].unique(): 
     mes_pt = meses_br.get(mes, mes)
 
     lista_meses.append({'label': mes_pt, 'value': mes})
@@ -65,7 +146,7 @@ lista_meses.append({
 
 # Criando lista de categorias
 lista_categorias = []
-for categoria in df['Categorias'].unique():
+for categoria in dados.df['Categorias'].unique():
     lista_categorias.append({
         'label': categoria,
         'value': categoria
@@ -79,6 +160,7 @@ lista_categorias.append({
 #Criando APP
 app = dash.Dash(__name__)
 server = app.server
+registrar_rota(server)  # /metrics, com DASH_METRICAS=1 (ver instrumentacao.py)
 
 
 # ------------------ LAYOUT ------------------
@@ -184,33 +266,58 @@ layout_linha02 = html.Div([
 
 
 # Carregando layout
+# Templates de cada tema e qual tema cada visual usa com o switch ligado e
+# desligado (o visual01 usa o darkly com o switch ligado; o visual02 e o
+# visual03, o vapor). Vão para o navegador uma única vez, junto com o layout.
+config_temas = {
+    'templates': {
+        tema: pio.templates[tema].to_plotly_json()
+        for tema in [dark_theme, vapor_theme]
+    },
+    'temas': [
+        [dark_theme, vapor_theme],   # visual01
+        [vapor_theme, dark_theme],   # visual02
+        [vapor_theme, dark_theme]    # visual03
+    ]
+}
+
+# Com DASH_MODO_CLIENTE=1 (padrão) o visual02 e o visual03 são montados no
+# navegador (assets/filtros.js) a partir de um cubo menor, por (Categorias,
+# Mes, Loja), enviado uma única vez neste Store (preenchido mais abaixo)
+MODO_CLIENTE = os.environ.get('DASH_MODO_CLIENTE', '1') == '1'
+store_cubo = dcc.Store(id='cubo_cliente')
+
 app.layout = html.Div([
     layout_titulo,
     layout_linha01,
-    layout_linha02
+    layout_linha02,
+    dcc.Store(id='config_temas', data=config_temas),
+    store_cubo
 ])
 
 
 # ------------------ FUNÇÕES DE APOIO ------------------
-def filtro_cliente(cliente_selecionado):
+# Os filtros devolvem o bitmap das linhas selecionadas no cubo, ou None
+# quando não há filtro (nesse caso nenhuma máscara é criada)
+def filtro_cliente(indices, cliente_selecionado):
     if cliente_selecionado is None:
-        return pd.Series(True, index=df.index)
-    return df['Cliente'] == cliente_selecionado
+        return None
+    return indices['Cliente'].filtrar(cliente_selecionado)
 
-def filtro_categoria(categoria_selecionada): 
+def filtro_categoria(indices, categoria_selecionada): 
     if categoria_selecionada is None:
-        return pd.Series(True, index=df.index)
+        return None
     elif categoria_selecionada == 'todas_categorias':
-        return pd.Series(True, index=df.index)
-    return df['Categorias'] == categoria_selecionada
+        return None
+    return indices['Categorias'].filtrar(categoria_selecionada)
 
-def filtro_mes(meses_selecionados): 
+def filtro_mes(indices, meses_selecionados): 
     if not meses_selecionados:
-        return pd.Series(True, index=df.index)
+        return None
     elif 'ano_completo' in meses_selecionados:
-        return pd.Series(True, index=df.index)
+        return None
     else:
-        return df['Mes'].isin(meses_selecionados)
+        return indices['Mes'].filtrar(meses_selecionados)
       
 
 
@@ -222,6 +329,7 @@ def filtro_mes(meses_selecionados):
         Input('radio_categorias', 'value')
     ]
 )
+@instrumentar_callback('atualizar_texto')
 def atualizar_texto(cliente_selecionado, categoria_selecionada):
     if cliente_selecionado and categoria_selecionada:  
         return f'TOP5 {categoria_selecionada} | Cliente: {cliente_selecionado}'
@@ -240,25 +348,46 @@ def atualizar_texto(cliente_selecionado, categoria_selecionada):
     [   
         Input('dropdown_cliente', 'value'),
         Input('radio_mes', 'value'),
-        Input('radio_categorias', 'value'),
-        Input(ThemeSwitchAIO.ids.switch('theme'), 'value')
-    ]
+        Input('radio_categorias', 'value')
+    ],
+    # O tema só é lido aqui; a troca de tema é feita no navegador (ver abaixo)
+    [State(ThemeSwitchAIO.ids.switch('theme'), 'value')]
 )
+@instrumentar_callback('visual01')
 def visual01(cliente, mes, categoria, toggle):
+    atuais = dados_atuais()
+    chave = chave_filtros('visual01', atuais.versao, cliente, mes, categoria, bool(toggle))
+    return cache_figuras.obter_figura(
+        chave, lambda: criar_visual01(cliente, mes, categoria, toggle, atuais)
+    )
+
+
+def criar_visual01(cliente, mes, categoria, toggle, atuais=None):
+    atuais = atuais or dados
 
     template = dark_theme if toggle else vapor_theme
 
-    nome_cliente = filtro_cliente(cliente)
-    nome_categoria = filtro_categoria(categoria)
-    nome_mes = filtro_mes(mes)
+    with etapa('visual01.filtro') as medicao:
+        nome_cliente = filtro_cliente(atuais.indices, cliente)
+        nome_categoria = filtro_categoria(atuais.indices, categoria)
+        nome_mes = filtro_mes(atuais.indices, mes)
 
-    cliente_mes_categoria = nome_cliente & nome_categoria & nome_mes
-    df_filtrado = df.loc[cliente_mes_categoria]
+        cliente_mes_categoria = combinar(nome_cliente, nome_categoria, nome_mes)
+        df_filtrado = aplicar(atuais.cubo, cliente_mes_categoria)
+        medicao.linhas = len(df_filtrado)
 
-    df_grupo = df_filtrado.groupby(['Produto', 'Categorias'])['Total Vendas'].sum().reset_index()
-    df_top5 = df_grupo.sort_values(by='Total Vendas', ascending=False).head(5)
+    with etapa('visual01.agrupamento'):
+        df_grupo = df_filtrado.groupby(['Produto', 'Categorias'], observed=True)['Total Vendas'].sum().reset_index()
+        df_top5 = df_grupo.sort_values(by='Total Vendas', ascending=False).head(5)
     
     # Criando o gráfico
+    with etapa('visual01.figura'):
+        fig = figura_visual01(df_top5, template)
+
+    return fig
+
+
+def figura_visual01_plotly(df_top5, template):
     fig = px.bar(
         df_top5,
         x='Produto',
@@ -286,60 +415,122 @@ def visual01(cliente, mes, categoria, toggle):
         paper_bgcolor = 'rgba(0,0,0,0)'
     )
 
-
     return fig
 
 
-@app.callback(
+def figura_visual01(df_top5, template):
+    # Caminho rápido: o esqueleto validado uma vez por tema, só com os dados trocados
+    if not figuras_leves.ATIVO or vazio(df_top5['Total Vendas']):
+        return figura_visual01_plotly(df_top5, template)
+
+    traco = esqueleto_visual01.traco(template)
+    layout = esqueleto_visual01.layout(template)
+    vendas = df_top5['Total Vendas'].to_numpy()
+    return {
+        'data': [com(
+            traco,
+            x=coluna(df_top5['Produto']),
+            y=vendas,
+            text=vendas,
+            marker=com(traco['marker'], color=vendas)
+        )],
+        'layout': com(layout, yaxis=com(layout['yaxis'], range=[vendas.min() * 0, vendas.max() * 1.2]))
+    }
+
+
+@instrumentar_callback('visual02_03')
+def visual02_03(mes, categoria, toggle):
+    atuais = dados_atuais()
+    chave = chave_filtros('visual02_03', atuais.versao, mes, categoria, bool(toggle))
+    return cache_figuras.obter_figura(
+        chave, lambda: criar_visual02_03(mes, categoria, toggle, atuais)
+    )
+
+
+# Troca de tema: o navegador só substitui o template das figuras já exibidas
+# (assets/tema.js). Os dados não mudam e o servidor não é chamado.
+app.clientside_callback(
+    ClientsideFunction(namespace='tema', function_name='trocar_template'),
     [
-        Output('visual02', 'figure'),
-        Output('visual03', 'figure')
+        Output('visual01', 'figure', allow_duplicate=True),
+        Output('visual02', 'figure', allow_duplicate=True),
+        Output('visual03', 'figure', allow_duplicate=True)
     ],
+    [Input(ThemeSwitchAIO.ids.switch('theme'), 'value')],
     [
-        Input('radio_mes', 'value'),
-        Input('radio_categorias', 'value'),
-        Input(ThemeSwitchAIO.ids.switch('theme'), 'value')
-    ]
+        State('visual01', 'figure'),
+        State('visual02', 'figure'),
+        State('visual03', 'figure'),
+        State('config_temas', 'data')
+    ],
+    prevent_initial_call=True
 )
-def visual02_03(mes, categoria, toggle):
+
+
+def criar_visual02_03(mes, categoria, toggle, atuais=None):
+    atuais = atuais or dados
+    # Os dois gráficos são independentes: são montados em paralelo (ver
+    # paralelo.py) e, se um falhar, o outro continua sendo exibido
+    fig2, fig3 = executar_tarefas([
+        partial(_montar_no_pool, 'visual02', atuais.versao, categoria, toggle),
+        partial(_montar_no_pool, 'visual03', atuais.versao, mes, categoria, toggle)
+    ], geracao=atuais.versao)
+    return fig2, fig3
+
+
+def _montar_no_pool(nome, versao, *filtros):
+    # Só o nome, a versão e os filtros atravessam o pickle no modo 'processo':
+    # os dados são os do próprio processo. O pool de processos é trocado a cada
+    # versão (geracao), então o filho nunca tem dados mais antigos que os pedidos;
+    # nas threads, uma recarga no meio da chamada só deixa os dados mais novos
+    atuais = dados
+    if atuais.versao < versao:
+        raise RuntimeError(f"dados da versão {atuais.versao} no processo, pedida a {versao}")
+    return _CONSTRUTORES_POOL[nome](*filtros, atuais)
+
+
+# definir as cores para cada loja
+cores_lojas = {
+    'Rio de Janeiro' : 'green',
+    'Salvador'       : 'yellow',
+    'Santos'         : 'purple',
+    'São Paulo'      : 'gray',
+    'Três Rios'      : 'blue',
+}
+
+# definir a ordem dos meses
+ordem_mes = [
+    'JAN', 'FEV', 'MAR', 'ABR', 'MAI', 'JUN', 
+    'JUL', 'AGO', 'SET', 'OUT', 'NOV', 'DEZ'
+]    
+
+
+def criar_visual02(categoria, toggle, atuais=None):
+    atuais = atuais or dados
 
     # definindo o tema que foi escolhido
     template = vapor_theme if toggle else dark_theme
 
-    # filtrando apenas por mes
-    nome_mes = filtro_mes(mes)
-    nome_categoria = filtro_categoria(categoria)
-
-    # combinando os filtros
-    mes_categoria = nome_mes & nome_categoria
-    
-    # filtrando o dataframe
-    df2 = df.loc[nome_categoria]
-    df3 = df.loc[mes_categoria]
+    # filtrando o cubo pré-agregado pela categoria
+    with etapa('visual02.filtro') as medicao:
+        nome_categoria = filtro_categoria(atuais.indices, categoria)
+        df2 = aplicar(atuais.cubo, nome_categoria)
+        medicao.linhas = len(df2)
 
     # gerando análise de dados
-    df_vendasMesLoja2 = df2.groupby(['Mes', 'Loja'])['Total Vendas'].sum().reset_index()
-    df_vendasMesLoja3 = df3.groupby(['Mes', 'Loja'])['Total Vendas'].sum().reset_index()
+    with etapa('visual02.agrupamento'):
+        df_vendasMesLoja2 = df2.groupby(['Mes', 'Loja'], observed=True)['Total Vendas'].sum().reset_index()
 
-    # normalizar o tamanho das bolhas
-    max_size = df_vendasMesLoja2['Total Vendas'].max()
-    min_size = df_vendasMesLoja2['Total Vendas'].min()
+    with etapa('visual02.figura'):
+        fig2 = figura_visual02(df_vendasMesLoja2, template)
 
-    # definir as cores para cada loja
-    cores_lojas = {
-        'Rio de Janeiro' : 'green',
-        'Salvador'       : 'yellow',
-        'Santos'         : 'purple',
-        'São Paulo'      : 'gray',
-        'Três Rios'      : 'blue',
-    }
+    return fig2
 
-    # definir a ordem dos meses
-    ordem_mes = [
-        'JAN', 'FEV', 'MAR', 'ABR', 'MAI', 'JUN', 
-        'JUL', 'AGO', 'SET', 'OUT', 'NOV', 'DEZ'
-    ]    
 
+def figura_visual02_plotly(df_vendasMesLoja2, template):
+    # normalizar o tamanho das bolhas
+    max_size = df_vendasMesLoja2['Total Vendas'].max()
+    min_size = df_vendasMesLoja2['Total Vendas'].min()
 
     # criar o gráfico visual02
     fig2 = go.Figure()
@@ -377,7 +568,68 @@ def visual02_03(mes, categoria, toggle):
         yaxis=dict(showgrid=False)  
     )
 
+    return fig2
+
 
+def figura_visual02(df_vendasMesLoja2, template):
+    if not figuras_leves.ATIVO or vazio(df_vendasMesLoja2['Total Vendas']):
+        return figura_visual02_plotly(df_vendasMesLoja2, template)
+
+    traco = esqueleto_visual02.traco(template)
+    vendas = df_vendasMesLoja2['Total Vendas'].to_numpy()
+    meses = coluna(df_vendasMesLoja2['Mes'])
+    lojas = coluna(df_vendasMesLoja2['Loja'])
+    max_size, min_size = vendas.max(), vendas.min()
+    if max_size == min_size:
+        return figura_visual02_plotly(df_vendasMesLoja2, template)  # bolhas sem escala: o plotly recusa o NaN
+
+    # uma bolha por loja, na ordem em que as lojas aparecem (como o unique() do pandas)
+    tracos = []
+    for loja in pd.unique(lojas):
+        da_loja = lojas == loja
+        cor = cores_lojas.get(loja, 'black')
+        tracos.append(com(
+            traco,
+            x=meses[da_loja],
+            y=vendas[da_loja],
+            name=str(loja),
+            marker=com(
+                traco['marker'],
+                color=cor,
+                size=(vendas[da_loja] - min_size) / (max_size - min_size) * 50,
+                line=com(traco['marker']['line'], color=cor)
+            )
+        ))
+    return {'data': tracos, 'layout': esqueleto_visual02.layout(template)}
+
+
+def criar_visual03(mes, categoria, toggle, atuais=None):
+    atuais = atuais or dados
+
+    # definindo o tema que foi escolhido
+    template = vapor_theme if toggle else dark_theme
+
+    # combinando os filtros de mes e categoria
+    with etapa('visual03.filtro') as medicao:
+        mes_categoria = combinar(filtro_mes(atuais.indices, mes), filtro_categoria(atuais.indices, categoria))
+        df3 = aplicar(atuais.cubo, mes_categoria)
+        medicao.linhas = len(df3)
+
+    # gerando análise de dados
+    with etapa('visual03.agrupamento'):
+        df_vendasMesLoja3 = df3.groupby(['Mes', 'Loja'], observed=True)['Total Vendas'].sum().reset_index()
+
+    with etapa('visual03.figura'):
+        fig3 = figura_visual03(df_vendasMesLoja3, template)
+
+    return fig3
+
+
+# Gráficos montados no pool por criar_visual02_03, pelo nome
+_CONSTRUTORES_POOL = {'visual02': criar_visual02, 'visual03': criar_visual03}
+
+
+def figura_visual03_plotly(df_vendasMesLoja3, template):
     # criando visual03
     fig3 = go.Figure(data=go.Scatterpolar(
         r = df_vendasMesLoja3['Total Vendas'],
@@ -409,12 +661,105 @@ def visual02_03(mes, categoria, toggle):
         margin=dict(l=40, r=40, t=80, b=40)
     )
 
-    return fig2, fig3
+    return fig3
+
 
+def figura_visual03(df_vendasMesLoja3, template):
+    if not figuras_leves.ATIVO or vazio(df_vendasMesLoja3['Total Vendas']):
+        return figura_visual03_plotly(df_vendasMesLoja3, template)
 
+    layout = esqueleto_visual03.layout(template)
+    radialaxis = layout['polar']['radialaxis']
+    vendas = df_vendasMesLoja3['Total Vendas'].to_numpy()
+    return {
+        'data': [com(esqueleto_visual03.traco(template), r=vendas, theta=coluna(df_vendasMesLoja3['Loja']))],
+        'layout': com(layout, polar=com(
+            layout['polar'], radialaxis=com(radialaxis, range=[0, vendas.max() + 1000])
+        ))
+    }
 
 
+# Figuras de referência de cada visual (uma por tema), montadas e validadas pelo
+# plotly uma única vez com dados de exemplo; ver figuras_leves.py
+_amostra = pd.DataFrame({
+    'Produto': ['Produto', 'Produto'], 'Mes': ['JAN', 'FEV'], 'Loja': ['Loja', 'Loja'], 'Total Vendas': [1.0, 2.0]
+})
+esqueleto_visual01 = Esqueleto(lambda template: figura_visual01_plotly(_amostra, template))
+esqueleto_visual02 = Esqueleto(lambda template: figura_visual02_plotly(_amostra, template))
+esqueleto_visual03 = Esqueleto(lambda template: figura_visual03_plotly(_amostra, template))
+
+
+# -------------------- MODO CLIENTE --------------------
+def dados_cubo_cliente(cubo):
+    # Cubo por (Categorias, Mes, Loja) com os códigos das categóricas, mais os
+    # traços e layouts de referência (sem o template, que vem de config_temas)
+    # Linhas sem categoria (código -1) entram só em "todas as categorias"; sem
+    # Mes ou Loja ficam de fora, como no groupby(['Mes', 'Loja']) do servidor
+    cubo_cliente = cubo.groupby(['Categorias', 'Mes', 'Loja'], observed=True, dropna=False)['Total Vendas'].sum().reset_index()
+    cubo_cliente = cubo_cliente.dropna(subset=['Mes', 'Loja'])
+    codigos = tabela_codigos(cubo_cliente, ['Categorias', 'Mes', 'Loja'])
+
+    def sem(base, *chaves):
+        return {chave: valor for chave, valor in base.items() if chave not in chaves}
+
+    # os dados de exemplo dos esqueletos são trocados no navegador; não vão no Store
+    traco02 = esqueleto_visual02.traco(dark_theme)
+    traco02 = com(sem(traco02, 'x', 'y'), marker=sem(traco02['marker'], 'size'))
+
+    return {
+        # código -> rótulo (os códigos são posições consecutivas a partir de 0)
+        'categorias': list(codigos['Categorias'].values()),
+        'meses': list(codigos['Mes'].values()),
+        'lojas': list(codigos['Loja'].values()),
+        'linhas': {
+            'categoria': cubo_cliente['Categorias'].cat.codes.tolist(),
+            'mes': cubo_cliente['Mes'].cat.codes.tolist(),
+            'loja': cubo_cliente['Loja'].cat.codes.tolist(),
+            'total': cubo_cliente['Total Vendas'].tolist()
+        },
+        'cores': cores_lojas,
+        'visual02': {
+            'traco': traco02,
+            'layout': sem(esqueleto_visual02.layout(dark_theme), 'template')
+        },
+        'visual03': {
+            'traco': sem(esqueleto_visual03.traco(dark_theme), 'r', 'theta'),
+            'layout': sem(esqueleto_visual03.layout(dark_theme), 'template')
+        }
+    }
+
+
+saidas_visual02_03 = [
+    Output('visual02', 'figure'),
+    Output('visual03', 'figure')
+]
+entradas_visual02_03 = [
+    Input('radio_mes', 'value'),
+    Input('radio_categorias', 'value')
+]
+
+if MODO_CLIENTE:
+    store_cubo.data = dados_cubo_cliente(dados.cubo)
+    app.clientside_callback(
+        ClientsideFunction(namespace='cubo', function_name='visual02_03'),
+        saidas_visual02_03,
+        entradas_visual02_03,
+        [
+            State(ThemeSwitchAIO.ids.switch('theme'), 'value'),
+            State('cubo_cliente', 'data'),
+            State('config_temas', 'data')
+        ]
+    )
+else:
+    app.callback(
+        saidas_visual02_03,
+        entradas_visual02_03,
+        [State(ThemeSwitchAIO.ids.switch('theme'), 'value')]
+    )(visual02_03)
+
 
 # Subindo servidor
 if __name__ == '__main__':
-    app.run_server(debug=True)
\ No newline at end of file
+    # DASH_DEBUG=1 liga o modo de desenvolvimento (reloader e ferramentas de debug);
+    # em produção use: python servir.py lalala
+    app.run(debug=os.environ.get('DASH_DEBUG') == '1')
@@ -0,0 +1,220 @@
+import argparse
+import io
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource
+except ImportError:  # não existe no Windows; lá só valem o tempo e o limite de instruções
+    resource = None
+
+from parser import LIMITE_INSTRUCOES, ErroExecucao, compilar, executar
+
+
+# Tempo máximo de cada programa, em segundos (o limite de instruções continua valendo)
+TIMEOUT_PADRAO = float(os.environ.get('LOTE_TIMEOUT', '5'))
+
+# Memória máxima (espaço de endereçamento, MB) de cada processo; 0 desliga.
+# Passando disso o programa recebe MemoryError em vez de derrubar a máquina
+LIMITE_MEMORIA_MB = int(os.environ.get('LOTE_LIMITE_MEMORIA_MB', '2048'))
+
+
+class TempoEsgotado(ErroExecucao):
+    """O programa passou do tempo máximo."""
+
+
+class EntradaInvalida(Exception):
+    """Linha do JSONL que não é um registro {"id", "codigo"} válido."""
+
+
+def _tempo_esgotado(sinal, quadro):
+    raise TempoEsgotado("tempo esgotado")
+
+
+def _iniciar_processo():
+    # As tarefas rodam na thread principal do processo filho, então o alarme
+    # interrompe o programa no meio (não existe SIGALRM no Windows)
+    if hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, _tempo_esgotado)
+    if resource is not None and LIMITE_MEMORIA_MB:
+        _, maximo = resource.getrlimit(resource.RLIMIT_AS)
+        limite = LIMITE_MEMORIA_MB << 20
+        if maximo != resource.RLIM_INFINITY:
+            limite = min(limite, maximo)
+        resource.setrlimit(resource.RLIMIT_AS, (limite, maximo))
+
+
+def ler_programas(entrada):
+    """(id, código ou caminho) de cada programa de uma pasta ou de um arquivo JSONL.
+
+    No JSONL cada linha é {"id": ..., "codigo": "..."}; sem "id" vale o número
+    da linha. Uma linha inválida não interrompe a leitura: vira um programa
+    {'erro': mensagem}, que sai no resultado como EntradaInvalida. Na pasta
+    cada arquivo é um programa e o id é o nome dele.
+    """
+    if os.path.isdir(entrada):
+        for nome in sorted(os.listdir(entrada)):
+            caminho = os.path.join(entrada, nome)
+            if os.path.isfile(caminho):
+                yield nome, {'caminho': caminho}
+        return
+
+    with open(entrada, encoding='utf-8') as arquivo:
+        for numero, linha in enumerate(arquivo, 1):
+            if not linha.strip():
+                continue
+            try:
+                registro = json.loads(linha)
+            except ValueError as erro:
+                yield numero, {'erro': f"linha {numero}: JSON inválido ({erro})"}
+                continue
+            if not isinstance(registro, dict):
+                yield numero, {'erro': f"linha {numero}: o registro não é um objeto"}
+            elif 'codigo' not in registro:
+                yield registro.get('id', numero), {'erro': f"linha {numero}: falta \"codigo\""}
+            else:
+                yield registro.get('id', numero), {'codigo': registro['codigo']}
+
+
+def executar_programa(tarefa):
+    """Roda um programa e devolve o resultado como dict (nunca levanta exceção)."""
+    identificador, programa, limite, timeout = tarefa
+    saida = io.StringIO()
+    resultado = {'id': identificador, 'ok': False, 'saida': '', 'variaveis': None, 'erro': None}
+    inicio = time.perf_counter()
+
+    alarme = timeout and hasattr(signal, 'setitimer')
+    try:
+        if 'erro' in programa:
+            raise EntradaInvalida(programa['erro'])
+        if 'caminho' in programa:
+            with open(programa['caminho'], encoding='utf-8') as arquivo:
+                codigo = arquivo.read()
+        else:
+            codigo = programa['codigo']
+
+        if alarme:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            resultado['variaveis'] = executar(compilar(codigo), limite=limite, saida=saida)
+        finally:
+            if alarme:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        resultado['ok'] = True
+    except Exception as erro:
+        # Variáveis como estavam quando o programa parou (None se nem começou)
+        resultado['variaveis'] = getattr(erro, 'variaveis', None)
+        resultado['erro'] = {'tipo': type(erro).__name__, 'mensagem': str(erro)}
+
+    resultado['saida'] = saida.getvalue()
+    resultado['duracao_ms'] = (time.perf_counter() - inicio) * 1000
+    return resultado
+
+
+def _executar_bloco(bloco):
+    return [executar_programa(tarefa) for tarefa in bloco]
+
+
+def _novo_pool(processos):
+    return ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo)
+
+
+def _processo_encerrado(tarefa, erro):
+    return {
+        'id': tarefa[0], 'ok': False, 'saida': '', 'variaveis': None,
+        'erro': {'tipo': 'ProcessoEncerrado', 'mensagem': f"o processo terminou durante o programa: {erro}"},
+        'duracao_ms': None,
+    }
+
+
+def _isolados(bloco):
+    # Um programa por vez num processo só: o que derrubar o processo recebe o
+    # erro e os outros rodam normalmente num processo novo
+    resultados = []
+    pool = _novo_pool(1)
+    try:
+        for tarefa in bloco:
+            try:
+                resultados.append(pool.submit(executar_programa, tarefa).result())
+            except BrokenProcessPool as erro:
+                resultados.append(_processo_encerrado(tarefa, erro))
+                pool.shutdown()
+                pool = _novo_pool(1)
+    finally:
+        pool.shutdown()
+    return resultados
+
+
+def _pronto(futuro):
+    return futuro.done() and futuro.exception() is None
+
+
+def executar_lote(programas, processos=None, timeout=TIMEOUT_PADRAO, limite=LIMITE_INSTRUCOES, tamanho_bloco=None):
+    """Roda os programas ((id, programa) de ler_programas) em paralelo.
+
+    Devolve os resultados na ordem da entrada, conforme ficam prontos. Os
+    programas vão para os processos em blocos de `tamanho_bloco` (por padrão,
+    calculado pela quantidade) para não pagar a comunicação a cada programa.
+    Se um programa derruba o processo (ex.: morto por falta de memória), o
+    bloco dele roda de novo um programa por vez e só ele sai com erro.
+    """
+    tarefas = [(identificador, programa, limite, timeout) for identificador, programa in programas]
+    processos = processos or os.cpu_count() or 1
+    if tamanho_bloco is None:
+        tamanho_bloco = max(1, min(64, len(tarefas) // (processos * 4)))
+
+    blocos = [tarefas[i:i + tamanho_bloco] for i in range(0, len(tarefas), tamanho_bloco)]
+    pool = _novo_pool(processos)
+    try:
+        futuros = [pool.submit(_executar_bloco, bloco) for bloco in blocos]
+        for i, bloco in enumerate(blocos):
+            try:
+                resultados = futuros[i].result()
+            except BrokenProcessPool:
+                # O pool inteiro para quando um processo morre: este bloco é
+                # isolado e os seguintes que não terminaram vão para um pool novo
+                pool.shutdown()
+                resultados = _isolados(bloco)
+                pool = _novo_pool(processos)
+                for j in range(i + 1, len(blocos)):
+                    if not _pronto(futuros[j]):
+                        futuros[j] = pool.submit(_executar_bloco, blocos[j])
+            yield from resultados
+    finally:
+        pool.shutdown()
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description='Executa vários programas da nossa linguagem em paralelo.')
+    parser.add_argument('entrada', help='pasta com um programa por arquivo ou arquivo JSONL ({"id", "codigo"})')
+    parser.add_argument('--saida', default='-', help='arquivo JSONL de resultados (padrão: saída padrão)')
+    parser.add_argument('--processos', type=int, default=None, help='processos em paralelo (padrão: núcleos)')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT_PADRAO, help='segundos por programa (0 desliga)')
+    parser.add_argument('--limite', type=int, default=LIMITE_INSTRUCOES, help='máximo de instruções por programa')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    argumentos = _argumentos()
+    destino = sys.stdout if argumentos.saida == '-' else open(argumentos.saida, 'w', encoding='utf-8')
+
+    inicio = time.perf_counter()
+    total = erros = 0
+    try:
+        for resultado in executar_lote(ler_programas(argumentos.entrada), argumentos.processos,
+                                       argumentos.timeout, argumentos.limite):
+            destino.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+            total += 1
+            erros += not resultado['ok']
+    finally:
+        if destino is not sys.stdout:
+            destino.close()
+
+    duracao = time.perf_counter() - inicio
+    print(f"{total} programas ({erros} com erro) em {duracao:.1f}s: {total / max(duracao, 1e-9):.0f} programas/s",
+          file=sys.stderr)
@@ -0,0 +1,136 @@
+import contextvars
+import os
+import threading
+import traceback
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+# Modo padrão de montagem das figuras: 'sequencial', 'thread' ou 'processo'.
+# O modo 'processo' depende do início por fork (padrão no Linux), pois as
+# tarefas usam os dados já carregados no processo principal.
+MODO_PADRAO = os.environ.get('DASH_MODO_FIGURAS', 'thread')
+WORKERS_PADRAO = int(os.environ.get('DASH_WORKERS_FIGURAS', '0')) or None
+
+_pools = {}
+_usos = {}  # pool -> chamadas de executar_tarefas usando o pool neste momento
+_aposentados = set()  # pools substituídos, encerrados quando a última chamada terminar
+_trava = threading.Lock()
+
+
+def _pool_atual(modo, max_workers, geracao):
+    # Chamada com _trava: devolve o pool da chave, trocando o de outra geração
+    chave = (modo, max_workers, os.getpid())
+    pool, geracao_pool = _pools.get(chave, (None, None))
+    if pool is not None and modo == 'processo' and geracao_pool != geracao:
+        _aposentar(chave, pool)
+        pool = None
+    if pool is None:
+        if modo == 'processo':
+            pool = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='figuras')
+        _pools[chave] = (pool, geracao)
+    return pool
+
+
+def _aposentar(chave, pool):
+    # Chamada com _trava: tira o pool de uso; se alguma chamada ainda está
+    # submetendo ou esperando tarefas nele, o encerramento fica para ela
+    if _pools.get(chave, (None,))[0] is pool:
+        del _pools[chave]
+    if _usos.get(pool):
+        _aposentados.add(pool)
+    else:
+        pool.shutdown(wait=False)
+
+
+def obter_pool(modo, max_workers=None, geracao=None):
+    """Retorna o pool do modo informado, criado uma única vez por processo.
+
+    Processos filhos enxergam os dados do momento em que foram criados; passar
+    uma `geracao` diferente (ex.: a versão dos dados) troca o pool de processos.
+    Quem for submeter tarefas deve usar `usar_pool`, que só deixa o pool antigo
+    ser encerrado depois que as tarefas em andamento terminam.
+    """
+    with _trava:
+        return _pool_atual(modo, max_workers, geracao)
+
+
+@contextmanager
+def usar_pool(modo, max_workers=None, geracao=None):
+    """Como obter_pool, mas o pool não é encerrado enquanto o bloco estiver rodando."""
+    with _trava:
+        pool = _pool_atual(modo, max_workers, geracao)
+        _usos[pool] = _usos.get(pool, 0) + 1
+    try:
+        yield pool
+    finally:
+        with _trava:
+            _usos[pool] -= 1
+            if not _usos[pool]:
+                del _usos[pool]
+                if pool in _aposentados:
+                    _aposentados.discard(pool)
+                    pool.shutdown(wait=False)
+
+
+def _descartar_quebrado(modo, max_workers, pool):
+    # Um processo do pool morreu (ex.: falta de memória): o pool não aceita mais
+    # tarefas, então a próxima chamada cria outro
+    with _trava:
+        _aposentar((modo, max_workers, os.getpid()), pool)
+
+
+def _executar_isolado(tarefa, indice, em_erro):
+    try:
+        return tarefa()
+    except Exception as erro:
+        return em_erro(indice, erro)
+
+
+def _erro_padrao(indice, erro):
+    print(f"Erro na tarefa {indice}: {erro}")
+    traceback.print_exc()
+    return None
+
+
+def executar_tarefas(tarefas, modo=None, max_workers=None, em_erro=_erro_padrao, geracao=None):
+    """Executa as tarefas (funções sem argumentos) e devolve os resultados na mesma ordem.
+
+    Uma exceção em uma tarefa não afeta as outras: o lugar dela recebe o
+    retorno de `em_erro(indice, erro)`. No modo 'processo' as tarefas precisam
+    poder ser serializadas com pickle (ex.: functools.partial de funções de módulo).
+    """
+    modo = modo or MODO_PADRAO
+    max_workers = max_workers or WORKERS_PADRAO
+    tarefas = list(tarefas)
+
+    if modo == 'sequencial' or len(tarefas) < 2:
+        return [_executar_isolado(tarefa, i, em_erro) for i, tarefa in enumerate(tarefas)]
+
+    with usar_pool(modo, max_workers, geracao) as pool:
+        futuros = []
+        for indice, tarefa in enumerate(tarefas):
+            try:
+                if modo == 'processo':
+                    futuros.append(pool.submit(tarefa))
+                else:
+                    # Cada thread roda a tarefa no contexto de quem chamou (ex.: o callback medido em instrumentacao.py)
+                    futuros.append(pool.submit(contextvars.copy_context().run, tarefa))
+            except Exception as erro:
+                futuros.append(erro)
+
+        resultados = []
+        quebrado = False
+        for indice, futuro in enumerate(futuros):
+            try:
+                if isinstance(futuro, Exception):
+                    raise futuro
+                resultados.append(futuro.result())
+            except Exception as erro:
+                quebrado = quebrado or isinstance(erro, BrokenExecutor)
+                resultados.append(em_erro(indice, erro))
+        if quebrado:
+            _descartar_quebrado(modo, max_workers, pool)
+    return resultados
@@ -1,53 +1,765 @@
-def interpretador(codigo):
-    # Quebra o código em linhas
-    linhas = codigo.split("\n")
-    
-    # Um dicionário para armazenar as variáveis
-    variaveis = {}
-    
-    for linha in linhas:
-        linha = linha.strip()  # Remove espaços em branco desnecessários
-        
-        # Se for uma linha de "definir"
-        if linha.startswith("definir"):
-            partes = linha[8:].strip().split(" como ")  # Pega o nome da variável e o valor
-            nome = partes[0].strip()
-            valor = partes[1].strip().strip('"')  # Remove aspas se houver
-            variaveis[nome] = valor  # Armazena a variável
-            
-        # Se for uma linha de "mostrar"
-        elif linha.startswith("mostrar"):
-            conteudo = linha[8:].strip().strip('"')
-            print(conteudo)  # Exibe o conteúdo
-
-        # Se for uma estrutura condicional "se"
-        elif linha.startswith("se"):
-            condicao = linha[3:].split(" então ")[0].strip()
-            comando = linha.split(" então ")[1].strip()
-            
-            # Aqui podemos apenas checar se a condição é "verdadeira" ou "falsa"
-            if condicao == "verdadeiro":
-                interpretador(comando)  # Executa o comando dentro da condição
-        
-        # Se for um laço "enquanto"
-        elif linha.startswith("enquanto"):
-            condicao = linha[8:].split(" faça ")[0].strip()
-            comando = linha.split(" faça ")[1].strip()
-            
-            # Verifica a condição do laço (por enquanto, consideramos "verdadeiro" ou "falso")
-            while condicao == "verdadeiro":
-                interpretador(comando)  # Executa o comando dentro do laço
-                break  # Evitar loops infinitos para esse exemplo
+import argparse
+import hashlib
+import operator
+import os
+import re
+import sys
+import threading
+import time
+
+# Linguagem:
+#   definir NOME como EXPRESSAO
+#   mostrar EXPRESSAO
+#   se CONDICAO então COMANDO             (ou em bloco: se ... então / senão / fim)
+#   enquanto CONDICAO faça COMANDO        (ou em bloco: enquanto ... faça / fim)
+# Expressões: "textos", números, verdadeiro/falso, variáveis, + - * / %,
+# == != < <= > >=, e, ou, não e parênteses. "+" com um texto concatena.
+
+# Limite de instruções por execução (laços infinitos viram erro, não travam o processo)
+LIMITE_INSTRUCOES = int(os.environ.get('PARSER_LIMITE_INSTRUCOES', '10000000'))
+
+# Tamanho máximo de um texto (caracteres) e de um inteiro (bits): poucas
+# instruções num laço bastam para dobrar um valor até acabar a memória.
+# 14000 bits ficam abaixo do limite de 4300 dígitos do Python para virar texto
+LIMITE_TEXTO = int(os.environ.get('PARSER_LIMITE_TEXTO', '10000000'))
+LIMITE_BITS = int(os.environ.get('PARSER_LIMITE_BITS', '14000'))
+
+# Programas já compilados, pelo hash do código (os mais antigos saem primeiro).
+# A trava protege a remoção e a inclusão; a compilação fica fora dela
+LIMITE_CACHE = 256
+_programas = {}
+_trava_programas = threading.Lock()
+
+
+class ErroSintaxe(Exception):
+    """Código que não pode ser compilado."""
+
+
+class ErroExecucao(Exception):
+    """Erro durante a execução (variável não definida, operação inválida...).
+
+    Vindo de executar ou executar_fluxo, `variaveis` tem as variáveis como
+    estavam no momento do erro.
+    """
+
+    variaveis = None
+
+
+class LimiteExcedido(ErroExecucao):
+    """A execução passou do limite de instruções."""
+
+
+# -------------------- VALORES --------------------
+def texto(valor):
+    """Como um valor aparece no mostrar e nas concatenações."""
+    if valor is True:
+        return 'verdadeiro'
+    if valor is False:
+        return 'falso'
+    return str(valor)
+
+
+def _texto_grande():
+    # OverflowError é um ArithmeticError: a VM mostra a linha e _dobrar deixa
+    # a conta para a execução
+    raise OverflowError(f"texto com mais de {LIMITE_TEXTO} caracteres")
+
+
+def _inteiro(valor):
+    # Soma e subtração crescem no máximo um bit: basta conferir o resultado
+    if type(valor) is int and valor.bit_length() > LIMITE_BITS:
+        raise OverflowError(f"inteiro com mais de {LIMITE_BITS} bits")
+    return valor
+
+
+def somar(a, b):
+    if type(a) is str or type(b) is str:
+        a, b = texto(a), texto(b)
+        if len(a) + len(b) > LIMITE_TEXTO:
+            _texto_grande()
+        return a + b
+    return _inteiro(a + b)
+
+
+def subtrair(a, b):
+    return _inteiro(a - b)
+
+
+def multiplicar(a, b):
+    """a * b, conferindo antes o tamanho da repetição de texto e do inteiro resultante."""
+    if type(a) is int and type(b) is int:
+        if a.bit_length() + b.bit_length() > LIMITE_BITS:
+            raise OverflowError(f"inteiro com mais de {LIMITE_BITS} bits")
+    elif type(a) is str and isinstance(b, int):
+        if len(a) * b > LIMITE_TEXTO:
+            _texto_grande()
+    elif type(b) is str and isinstance(a, int):
+        if len(b) * a > LIMITE_TEXTO:
+            _texto_grande()
+    return a * b
+
+
+OPERADORES = {
+    '+': somar,
+    '-': subtrair,
+    '*': multiplicar,
+    '/': operator.truediv,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# Precedência dos operadores binários (maior = liga mais forte)
+PRECEDENCIA = {
+    'ou': 1,
+    'e': 2,
+    '==': 3, '!=': 3, '<': 3, '<=': 3, '>': 3, '>=': 3,
+    '+': 4, '-': 4,
+    '*': 5, '/': 5, '%': 5,
+}
+
+CONSTANTES = {'verdadeiro': True, 'falso': False}
+TIPOS_COMANDO = ('definir', 'mostrar', 'se', 'enquanto')
+PALAVRAS = {'definir', 'como', 'mostrar', 'se', 'então', 'senão', 'enquanto', 'faça', 'fim', 'e', 'ou', 'não'}
+
+
+# -------------------- TOKENS --------------------
+_TOKEN = re.compile(r'''
+    \s*(?:
+        (?P<texto>"[^"]*")
+      | (?P<numero>\d+(?:\.\d+)?)
+      | (?P<nome>[^\W\d]\w*)
+      | (?P<operador>==|!=|<=|>=|[-+*/%<>()])
+    )''', re.VERBOSE)
+
+_PRIMEIRA_PALAVRA = re.compile(r'[^\W\d]\w*')
+
+
+def tokens(linha, numero):
+    """Lista de (tipo, valor, posição) da linha."""
+    resultado = []
+    posicao = 0
+    linha = linha.rstrip()
+    while posicao < len(linha):
+        encontrado = _TOKEN.match(linha, posicao)
+        if encontrado is None:
+            raise ErroSintaxe(f"Linha {numero}: símbolo inesperado em {linha[posicao:].strip()!r}")
+        tipo = encontrado.lastgroup
+        valor = encontrado.group(tipo)
+        if tipo == 'texto':
+            valor = valor[1:-1]
+        elif tipo == 'numero':
+            valor = float(valor) if '.' in valor else int(valor)
+        resultado.append((tipo, valor, encontrado.start(tipo)))
+        posicao = encontrado.end()
+    return resultado
+
+
+# -------------------- INSTRUÇÕES --------------------
+# (operação, argumento); a VM só compara os números das operações
+CONST = 0            # empilha o valor
+CARREGAR = 1         # empilha a variável do slot
+GUARDAR = 2          # desempilha para o slot
+BINARIO = 3          # desempilha b e a, empilha argumento(a, b)
+SALTAR_SE_FALSO = 4  # desempilha; se falso vai para o argumento
+SALTAR = 5           # vai para o argumento (adiante)
+VOLTAR = 6           # vai para o argumento (para trás: início de laço, confere o limite)
+MOSTRAR = 7          # desempilha e exibe
+NEGATIVO = 8         # -a
+NAO = 9              # não a
+E = 10               # se o topo é falso vai para o argumento (mantendo), senão descarta
+OU = 11              # se o topo é verdadeiro vai para o argumento (mantendo), senão descarta
+# Superinstruções: as formas mais comuns nos laços ("i < 10", "i + 1", "s + i") em uma só
+BINARIO_VC = 12      # argumento (slot, constante, função): empilha função(variável, constante)
+BINARIO_VV = 13      # argumento (slot, slot, função): empilha função(variável, variável)
+PERFIL = 14          # início de um comando (só com perfil): avisa o Perfil com o tipo do comando
+
+
+class Programa:
+    """Código compilado: instruções, nome de cada slot e linha de cada instrução."""
+
+    def __init__(self, codigo, nomes, linhas):
+        self.codigo = codigo
+        self.nomes = nomes
+        self.linhas = linhas
+
+
+class Compilador:
+    """Compila o código linha a linha; `finalizar()` devolve o Programa.
+
+    Com `perfil=True` cada comando começa com uma instrução PERFIL (no
+    enquanto, a cada volta), usada pelo Perfil para contar e medir os comandos.
+    """
+
+    def __init__(self, perfil=False):
+        self.perfil = perfil
+        self.codigo = []
+        self.linhas = []
+        self.slots = {}
+        self.nomes = []
+        self.blocos = []  # [tipo, linha de abertura, salto a corrigir, saltos para o fim, início, já teve senão]
+        self.numero = 0
+
+    # ---------- emissão ----------
+    def emitir(self, operacao, argumento=None):
+        self.codigo.append((operacao, argumento))
+        self.linhas.append(self.numero)
+        return len(self.codigo) - 1
+
+    def corrigir(self, posicao, alvo=None):
+        operacao, _ = self.codigo[posicao]
+        self.codigo[posicao] = (operacao, len(self.codigo) if alvo is None else alvo)
+
+    def slot(self, nome):
+        if nome not in self.slots:
+            self.slots[nome] = len(self.nomes)
+            self.nomes.append(nome)
+        return self.slots[nome]
+
+    # ---------- expressões ----------
+    def expressao(self, lista, inicio=0, precedencia_minima=1):
+        """Analisa a expressão a partir de lista[inicio]; devolve (nó, próxima posição).
+
+        Nós: ('const', valor), ('var', nome), ('bin', op, a, b), ('e'/'ou', a, b),
+        ('neg', a), ('nao', a). Subexpressões constantes já saem calculadas.
+        """
+        esquerda, posicao = self.unario(lista, inicio)
+        while posicao < len(lista):
+            tipo, valor, _ = lista[posicao]
+            if tipo not in ('operador', 'nome') or valor not in PRECEDENCIA:
+                break
+            precedencia = PRECEDENCIA[valor]
+            if precedencia < precedencia_minima:
+                break
+            direita, posicao = self.expressao(lista, posicao + 1, precedencia + 1)
+            esquerda = _dobrar((valor, esquerda, direita) if valor in ('e', 'ou') else ('bin', valor, esquerda, direita))
+        return esquerda, posicao
+
+    def unario(self, lista, posicao):
+        if posicao >= len(lista):
+            raise ErroSintaxe(f"Linha {self.numero}: expressão incompleta")
+        tipo, valor, _ = lista[posicao]
+
+        if (tipo, valor) == ('operador', '-'):
+            operando, posicao = self.unario(lista, posicao + 1)
+            return _dobrar(('neg', operando)), posicao
+        if (tipo, valor) == ('nome', 'não'):
+            operando, posicao = self.expressao(lista, posicao + 1, PRECEDENCIA['=='])
+            return _dobrar(('nao', operando)), posicao
+        if (tipo, valor) == ('operador', '('):
+            no, posicao = self.expressao(lista, posicao + 1)
+            if posicao >= len(lista) or lista[posicao][1] != ')':
+                raise ErroSintaxe(f"Linha {self.numero}: falta fechar o parêntese")
+            return no, posicao + 1
+        if tipo in ('texto', 'numero'):
+            return ('const', valor), posicao + 1
+        if tipo == 'nome' and valor in CONSTANTES:
+            return ('const', CONSTANTES[valor]), posicao + 1
+        if tipo == 'nome' and valor not in PALAVRAS:
+            return ('var', valor), posicao + 1
+        raise ErroSintaxe(f"Linha {self.numero}: {valor!r} inesperado na expressão")
+
+    def expressao_completa(self, lista):
+        no, posicao = self.expressao(lista)
+        if posicao != len(lista):
+            raise ErroSintaxe(f"Linha {self.numero}: {lista[posicao][1]!r} inesperado depois da expressão")
+        return no
+
+    def emitir_no(self, no):
+        tipo = no[0]
+        if tipo == 'const':
+            self.emitir(CONST, no[1])
+        elif tipo == 'var':
+            self.emitir(CARREGAR, self.slot(no[1]))
+        elif tipo == 'bin' and no[2][0] == 'var' and no[3][0] in ('var', 'const'):
+            funcao = OPERADORES[no[1]]
+            if no[3][0] == 'const':
+                self.emitir(BINARIO_VC, (self.slot(no[2][1]), no[3][1], funcao))
+            else:
+                self.emitir(BINARIO_VV, (self.slot(no[2][1]), self.slot(no[3][1]), funcao))
+        elif tipo == 'bin':
+            self.emitir_no(no[2])
+            self.emitir_no(no[3])
+            self.emitir(BINARIO, OPERADORES[no[1]])
+        elif tipo in ('e', 'ou'):
+            self.emitir_no(no[1])
+            salto = self.emitir(E if tipo == 'e' else OU)
+            self.emitir_no(no[2])
+            self.corrigir(salto)
+        else:
+            self.emitir_no(no[1])
+            self.emitir(NEGATIVO if tipo == 'neg' else NAO)
+
+    def emitir_teste(self, condicao):
+        """Testa a condição; devolve a posição do salto para corrigir (None se sempre verdadeira)."""
+        if condicao[0] == 'const':
+            return None if condicao[1] else self.emitir(SALTAR)
+        self.emitir_no(condicao)
+        return self.emitir(SALTAR_SE_FALSO)
+
+    # ---------- comandos ----------
+    def dividir(self, lista, palavra, comando):
+        """Separa a condição do comando em "se ... então ..." / "enquanto ... faça ..."."""
+        for posicao, (tipo, valor, _) in enumerate(lista):
+            if tipo == 'nome' and valor == palavra:
+                return lista[1:posicao], lista[posicao + 1:]
+        raise ErroSintaxe(f"Linha {self.numero}: falta {palavra!r} no {comando}")
+
+    def comando(self, lista, linha, dentro_de_linha=False):
+        palavra = lista[0][1] if lista[0][0] == 'nome' else None
+        inicio = len(self.codigo)
+        if self.perfil and palavra not in ('senão', 'fim'):
+            self.emitir(PERFIL, palavra if palavra in TIPOS_COMANDO else 'desconhecido')
+
+        if palavra == 'definir':
+            if len(lista) < 4 or lista[1][0] != 'nome' or lista[1][1] in PALAVRAS or lista[2][1] != 'como':
+                raise ErroSintaxe(f"Linha {self.numero}: use definir NOME como VALOR")
+            self.emitir_no(self.expressao_completa(lista[3:]))
+            self.emitir(GUARDAR, self.slot(lista[1][1]))
+
+        elif palavra == 'mostrar':
+            self.emitir_no(self.expressao_completa(lista[1:]))
+            self.emitir(MOSTRAR)
+
+        elif palavra in ('se', 'enquanto'):
+            separador = 'então' if palavra == 'se' else 'faça'
+            condicao, resto = self.dividir(lista, separador, palavra)
+            if not condicao:
+                raise ErroSintaxe(f"Linha {self.numero}: {palavra} sem condição")
+            salto = self.emitir_teste(self.expressao_completa(condicao))
+            if resto:
+                # comando na mesma linha
+                self.comando(resto, linha[resto[0][2]:], dentro_de_linha=True)
+                self.fechar(palavra, salto, [], inicio)
+            elif dentro_de_linha:
+                raise ErroSintaxe(f"Linha {self.numero}: bloco dentro de um comando de uma linha")
+            else:
+                self.blocos.append([palavra, self.numero, salto, [], inicio, False])
+
+        elif palavra in ('senão', 'fim'):
+            if dentro_de_linha or len(lista) > 1:
+                raise ErroSintaxe(f"Linha {self.numero}: {palavra} deve ficar sozinho na linha")
+            if not self.blocos:
+                raise ErroSintaxe(f"Linha {self.numero}: {palavra} sem bloco aberto")
+            bloco = self.blocos[-1]
+            if palavra == 'fim':
+                self.blocos.pop()
+                self.fechar(bloco[0], bloco[2], bloco[3], bloco[4])
+            elif bloco[0] != 'se' or bloco[5]:
+                raise ErroSintaxe(f"Linha {self.numero}: senão fora de um se")
+            else:
+                # o bloco do se termina saltando o senão; a condição falsa vem para cá
+                bloco[3].append(self.emitir(SALTAR))
+                if bloco[2] is not None:
+                    self.corrigir(bloco[2])
+                bloco[2] = None
+                bloco[5] = True
+
         else:
-            print(f"Comando não reconhecido: {linha}")
+            self.emitir(CONST, f"Comando não reconhecido: {linha.strip()}")
+            self.emitir(MOSTRAR)
 
-# Exemplo de código na nossa linguagem
-codigo = """
+    def fechar(self, tipo, salto, saltos_fim, inicio):
+        if tipo == 'enquanto':
+            self.emitir(VOLTAR, inicio)
+        if salto is not None:
+            self.corrigir(salto)
+        for posicao in saltos_fim:
+            self.corrigir(posicao)
+
+    def adicionar_linha(self, linha):
+        self.numero += 1
+        primeira = _PRIMEIRA_PALAVRA.match(linha.strip())
+        if not linha.strip():
+            return
+        if primeira is None or primeira.group() not in PALAVRAS:
+            self.comando([('?', None, 0)], linha)
+            return
+        self.comando(tokens(linha, self.numero), linha)
+
+    def finalizar(self):
+        if self.blocos:
+            tipo, numero = self.blocos[-1][:2]
+            raise ErroSintaxe(f"Linha {numero}: {tipo} sem fim")
+        return Programa(tuple(self.codigo), list(self.nomes), self.linhas)
+
+    def concluido(self):
+        """True se não há bloco aberto (o código emitido até aqui já pode rodar)."""
+        return not self.blocos
+
+    def retirar(self):
+        """Devolve o código emitido até aqui e recomeça do zero (as variáveis continuam)."""
+        codigo, linhas = tuple(self.codigo), self.linhas
+        self.codigo, self.linhas = [], []
+        return codigo, linhas
+
+
+def _dobrar(no):
+    """Dobra de constantes: calcula na compilação o que não depende de variáveis."""
+    tipo = no[0]
+    try:
+        if tipo == 'bin' and no[2][0] == 'const' and no[3][0] == 'const':
+            return ('const', OPERADORES[no[1]](no[2][1], no[3][1]))
+        if tipo == 'neg' and no[1][0] == 'const':
+            return ('const', -no[1][1])
+        if tipo == 'nao' and no[1][0] == 'const':
+            return ('const', not no[1][1])
+    except (TypeError, ValueError, ArithmeticError, MemoryError):
+        return no  # o erro fica para a execução, na linha certa
+    if tipo in ('e', 'ou') and no[1][0] == 'const':
+        # "falso e x" -> falso; "verdadeiro e x" -> x (o mesmo para "ou", ao contrário)
+        if bool(no[1][1]) == (tipo == 'ou'):
+            return no[1]
+        return no[2]
+    return no
+
+
+def compilar(codigo, perfil=False):
+    """Programa do código, compilado uma vez e guardado pelo hash."""
+    chave = (hashlib.sha1(codigo.encode('utf-8')).hexdigest(), perfil)
+    programa = _programas.get(chave)
+    if programa is None:
+        compilador = Compilador(perfil)
+        # Quebra o código em linhas
+        for linha in codigo.split("\n"):
+            compilador.adicionar_linha(linha)
+        programa = compilador.finalizar()
+
+        with _trava_programas:
+            if chave not in _programas:
+                while len(_programas) >= LIMITE_CACHE:
+                    del _programas[next(iter(_programas))]
+                _programas[chave] = programa
+            programa = _programas[chave]
+    return programa
+
+
+def limpar_cache():
+    """Descarta os programas compilados (o próximo compilar começa do zero)."""
+    with _trava_programas:
+        _programas.clear()
+
+
+# -------------------- SAÍDA --------------------
+class Saida:
+    """Saída do mostrar com buffer: as linhas são juntadas e escritas em blocos.
+
+    `destino` é um arquivo (ou qualquer objeto com write, como io.StringIO) ou
+    uma função que recebe o texto de cada bloco. No modo interativo (por padrão,
+    quando o destino é um terminal) o texto também é entregue ao fim de cada
+    comando de nível superior, para quem está digitando ver o resultado na hora.
+    """
+
+    def __init__(self, destino, tamanho_buffer=64 * 1024, interativa=None):
+        self._escrever = destino.write if hasattr(destino, 'write') else destino
+        self._esvaziar = getattr(destino, 'flush', None)
+        self.tamanho_buffer = tamanho_buffer
+        self.interativa = _terminal(destino) if interativa is None else interativa
+        self._partes = []
+        self._tamanho = 0
+
+    def escrever(self, linha):
+        self._partes.append(linha)
+        self._tamanho += len(linha) + 1
+        if self._tamanho >= self.tamanho_buffer:
+            self.descarregar()
+
+    def descarregar(self):
+        if self._partes:
+            self._partes.append('')
+            self._escrever('\n'.join(self._partes))
+            self._partes = []
+            self._tamanho = 0
+
+    def fim_de_comando(self):
+        """Chamado ao fim de cada comando de nível superior (ver executar_fluxo)."""
+        if self.interativa and self._partes:
+            self.descarregar()
+            if self._esvaziar is not None:
+                self._esvaziar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.descarregar()
+
+
+def _terminal(objeto):
+    try:
+        return objeto.isatty()
+    except (AttributeError, ValueError, OSError):
+        return False
+
+
+def _como_saida(saida):
+    if saida is None:
+        return Saida(sys.stdout)
+    if isinstance(saida, Saida):
+        return saida
+    return Saida(saida)
+
+
+# -------------------- PERFIL --------------------
+class Perfil:
+    """Execuções e tempo acumulado por tipo de comando (definir, mostrar, se, enquanto).
+
+    Só funciona com programas compilados com perfil (compilar(codigo, perfil=True)
+    ou executar_fluxo(..., perfil=...)). O tempo entre o início de um comando e
+    o do próximo vai para o primeiro: um se de uma linha conta só o teste, e o
+    comando dentro dele conta no tipo dele. Cada volta do enquanto é uma execução.
+    """
+
+    def __init__(self, relogio=time.perf_counter):
+        self.execucoes = {}
+        self.tempos = {}
+        self._relogio = relogio
+        self._atual = None
+        self._desde = 0.0
+
+    def marcar(self, tipo):
+        agora = self._relogio()
+        if self._atual is not None:
+            self.tempos[self._atual] = self.tempos.get(self._atual, 0.0) + agora - self._desde
+        self.execucoes[tipo] = self.execucoes.get(tipo, 0) + 1
+        self._atual = tipo
+        self._desde = agora
+
+    def encerrar(self):
+        """Fecha o comando em andamento (chamado ao fim de cada execução)."""
+        if self._atual is not None:
+            self.tempos[self._atual] = self.tempos.get(self._atual, 0.0) + self._relogio() - self._desde
+            self._atual = None
+
+    def total_execucoes(self):
+        return sum(self.execucoes.values())
+
+    def resumo(self):
+        """{tipo: {'execucoes', 'tempo_ms', 'us_por_execucao'}}, do mais demorado ao mais rápido."""
+        resultado = {}
+        for tipo in sorted(self.execucoes, key=lambda tipo: -self.tempos.get(tipo, 0.0)):
+            execucoes = self.execucoes[tipo]
+            tempo = self.tempos.get(tipo, 0.0)
+            resultado[tipo] = {
+                'execucoes': execucoes,
+                'tempo_ms': tempo * 1000,
+                'us_por_execucao': tempo / execucoes * 1e6,
+            }
+        return resultado
+
+    def tabela(self):
+        total = sum(self.tempos.values()) or 1.0
+        linhas = [f"{'comando':<14}{'execuções':>12}{'tempo (ms)':>14}{'µs/exec':>10}{'%':>7}"]
+        for tipo, dados in self.resumo().items():
+            linhas.append(f"{tipo:<14}{dados['execucoes']:>12}{dados['tempo_ms']:>14.1f}"
+                          f"{dados['us_por_execucao']:>10.2f}{dados['tempo_ms'] / 10 / total:>7.1f}")
+        return '\n'.join(linhas)
+
+
+# -------------------- VM --------------------
+_INDEFINIDO = object()
+
+
+def _nao_definida(linhas, nomes, pc, slot):
+    raise ErroExecucao(f"Linha {linhas[pc - 1]}: variável não definida: {nomes[slot]}")
+
+
+def _rodar(codigo, linhas, nomes, slots, limite, executadas, escrever, perfil=None):
+    """Laço da VM; devolve o total de instruções executadas (contando as anteriores)."""
+    pilha = []
+    empilhar = pilha.append
+    desempilhar = pilha.pop
+    fim = len(codigo)
+    pc = 0
+
+    try:
+        while pc < fim:
+            operacao, argumento = codigo[pc]
+            pc += 1
+            executadas += 1
+            if operacao == BINARIO_VC:
+                slot, constante, funcao = argumento
+                valor = slots[slot]
+                if valor is _INDEFINIDO:
+                    _nao_definida(linhas, nomes, pc, slot)
+                empilhar(funcao(valor, constante))
+            elif operacao == SALTAR_SE_FALSO:
+                if not desempilhar():
+                    pc = argumento
+            elif operacao == GUARDAR:
+                slots[argumento] = desempilhar()
+            elif operacao == BINARIO_VV:
+                slot, outro, funcao = argumento
+                valor = slots[slot]
+                segundo = slots[outro]
+                if valor is _INDEFINIDO:
+                    _nao_definida(linhas, nomes, pc, slot)
+                if segundo is _INDEFINIDO:
+                    _nao_definida(linhas, nomes, pc, outro)
+                empilhar(funcao(valor, segundo))
+            elif operacao == VOLTAR:
+                if executadas > limite:
+                    raise LimiteExcedido(f"Linha {linhas[pc - 1]}: mais de {limite} instruções executadas")
+                pc = argumento
+            elif operacao == CARREGAR:
+                valor = slots[argumento]
+                if valor is _INDEFINIDO:
+                    _nao_definida(linhas, nomes, pc, argumento)
+                empilhar(valor)
+            elif operacao == CONST:
+                empilhar(argumento)
+            elif operacao == BINARIO:
+                direita = desempilhar()
+                pilha[-1] = argumento(pilha[-1], direita)
+            elif operacao == SALTAR:
+                pc = argumento
+            elif operacao == MOSTRAR:
+                escrever(texto(desempilhar()))
+            elif operacao == E:
+                if not pilha[-1]:
+                    pc = argumento
+                else:
+                    desempilhar()
+            elif operacao == OU:
+                if pilha[-1]:
+                    pc = argumento
+                else:
+                    desempilhar()
+            elif operacao == NEGATIVO:
+                pilha[-1] = -pilha[-1]
+            elif operacao == PERFIL:
+                executadas -= 1  # não conta para o limite
+                if perfil is not None:
+                    perfil.marcar(argumento)
+            else:
+                pilha[-1] = not pilha[-1]
+    except (TypeError, ValueError, ArithmeticError, MemoryError) as erro:
+        # ValueError: inteiro grande demais para virar texto (limite do Python);
+        # MemoryError: passou do limite de memória do processo (lote.py)
+        raise ErroExecucao(f"Linha {linhas[pc - 1]}: {str(erro) or 'memória esgotada'}") from erro
+
+    return executadas
+
+
+def _variaveis(variaveis, nomes, slots):
+    resultado = dict(variaveis or {})
+    resultado.update((nome, valor) for nome, valor in zip(nomes, slots) if valor is not _INDEFINIDO)
+    return resultado
+
+
+def executar(programa, variaveis=None, limite=LIMITE_INSTRUCOES, saida=None, perfil=None):
+    """Executa um programa compilado e devolve o dicionário de variáveis.
+
+    O limite de instruções é conferido a cada volta de laço (código sem laço
+    sempre termina). `saida`: arquivo, função ou Saida (padrão: sys.stdout).
+    `perfil`: Perfil que recebe as medições (programa compilado com perfil=True).
+    """
+    nomes = programa.nomes
+    slots = [_INDEFINIDO] * len(nomes)
+    if variaveis:
+        for slot, nome in enumerate(nomes):
+            slots[slot] = variaveis.get(nome, _INDEFINIDO)
+
+    saida = _como_saida(saida)
+    try:
+        _rodar(programa.codigo, programa.linhas, nomes, slots, limite, 0, saida.escrever, perfil)
+    except ErroExecucao as erro:
+        erro.variaveis = _variaveis(variaveis, nomes, slots)
+        raise
+    finally:
+        if perfil is not None:
+            perfil.encerrar()
+        saida.descarregar()
+    return _variaveis(variaveis, nomes, slots)
+
+
+def executar_fluxo(linhas, variaveis=None, limite=LIMITE_INSTRUCOES, saida=None, perfil=None):
+    """Compila e executa o código linha a linha (arquivo aberto, sys.stdin ou lista).
+
+    Cada comando roda assim que termina (um bloco, no seu fim) e o código dele
+    é descartado em seguida: a memória não cresce com o tamanho do script. O
+    limite de instruções vale para o fluxo inteiro. Se a entrada ou a saída é um
+    terminal, o resultado do mostrar aparece ao fim de cada comando.
+    """
+    compilador = Compilador(perfil is not None)
+    slots = []
+    executadas = 0
+    for nome in variaveis or {}:
+        compilador.slot(nome)
+        slots.append(variaveis[nome])
+
+    saida = _como_saida(saida)
+    if _terminal(linhas):
+        saida.interativa = True
+    try:
+        for linha in linhas:
+            compilador.adicionar_linha(linha.rstrip('\r\n'))
+            if compilador.codigo and compilador.concluido():
+                codigo, numeros = compilador.retirar()
+                slots.extend([_INDEFINIDO] * (len(compilador.nomes) - len(slots)))
+                executadas = _rodar(codigo, numeros, compilador.nomes, slots, limite, executadas,
+                                    saida.escrever, perfil)
+                if perfil is not None:
+                    perfil.encerrar()  # a compilação da próxima linha não entra no perfil
+                saida.fim_de_comando()
+        compilador.finalizar()  # bloco sem fim no final do arquivo
+    except ErroExecucao as erro:
+        erro.variaveis = _variaveis(variaveis, compilador.nomes, slots)
+        raise
+    finally:
+        if perfil is not None:
+            perfil.encerrar()
+        saida.descarregar()
+    slots.extend([_INDEFINIDO] * (len(compilador.nomes) - len(slots)))
+    return _variaveis(variaveis, compilador.nomes, slots)
+
+
+def interpretador(codigo):
+    executar(compilar(codigo))
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description='Executa um programa da nossa linguagem, linha a linha.')
+    parser.add_argument('arquivo', nargs='?', help='arquivo do programa ("-" lê da entrada padrão; sem nada roda o exemplo)')
+    parser.add_argument('--saida', help='arquivo para o resultado do mostrar (padrão: saída padrão)')
+    parser.add_argument('--limite', type=int, default=LIMITE_INSTRUCOES, help='máximo de instruções executadas')
+    parser.add_argument('--perfil', action='store_true', help='mostra no stderr o tempo gasto em cada tipo de comando')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    argumentos = _argumentos()
+
+    if argumentos.arquivo is None:
+        # Exemplo de código na nossa linguagem
+        codigo = """
 definir nome como "lalala"
 mostrar "O nome é " + nome
 se verdadeiro então mostrar "Isso é verdadeiro"
-enquanto verdadeiro faça mostrar "Dentro do laço"
+
+definir contador como 1
+enquanto contador <= 3 faça
+    mostrar "Dentro do laço: volta " + contador
+    definir contador como contador + 1
+fim
 """
+        # Executa o código
+        interpretador(codigo)
+        sys.exit()
 
-# Executa o código
-interpretador(codigo)
+    entrada = sys.stdin if argumentos.arquivo == '-' else open(argumentos.arquivo, encoding='utf-8')
+    destino = open(argumentos.saida, 'w', encoding='utf-8') if argumentos.saida else sys.stdout
+    perfil = Perfil() if argumentos.perfil else None
+    try:
+        executar_fluxo(entrada, limite=argumentos.limite, saida=destino, perfil=perfil)
+    except (ErroSintaxe, ErroExecucao) as erro:
+        sys.exit(f"Erro: {erro}")
+    finally:
+        if destino is not sys.stdout:
+            destino.close()
+        if perfil is not None:
+            print(perfil.tabela(), file=sys.stderr)
@@ -0,0 +1,112 @@
+import threading
+from collections import namedtuple
+from functools import partial
+
+from instrumentacao import etapa
+from paralelo import MODO_PADRAO, executar_tarefas
+
+
+# Um gráfico do painel: nome, função que monta a figura a partir dos filtros e
+# nomes dos filtros dos quais a figura depende (vazio = não depende de nenhum)
+Grafico = namedtuple('Grafico', ['nome', 'construir', 'dependencias'])
+
+# Planejadores por nome, para que processos filhos (fork) encontrem os gráficos
+_registro = {}
+
+# Marca o lugar de uma figura que falhou
+_FALHOU = object()
+
+
+def _montar(grafico, filtros):
+    """Monta um gráfico, medindo o tempo como uma etapa do callback (ver instrumentacao.py)."""
+    with etapa(f'figura.{grafico.nome}'):
+        return grafico.construir(filtros)
+
+
+def _montar_registrado(nome_planejador, indice, filtros):
+    """Monta um gráfico de um planejador registrado (usado no modo 'processo')."""
+    return _montar(_registro[nome_planejador].graficos[indice], filtros)
+
+
+def _marcar_falha(indice, erro):
+    print(f"Erro ao montar o gráfico {indice}: {erro}")
+    return _FALHOU
+
+
+class PlanejadorDeGraficos:
+    """Monta as figuras de um callback reaproveitando o que não depende dos filtros.
+
+    Figuras sem dependências são montadas uma vez por versão dos dados e
+    reaproveitadas entre requisições; as demais são montadas a cada chamada.
+    Os intermediários compartilhados entre gráficos (série diária, quantis,
+    somas) ficam memorizados no próprio analisador.
+
+    As figuras que precisam ser montadas são independentes entre si e rodam em
+    um pool de threads ou processos (ver paralelo.py). Se uma delas falhar, só
+    o lugar dela recebe `figura_vazia()`.
+    """
+
+    def __init__(self, graficos, versao=lambda: 0, nome='painel', modo=None,
+                 max_workers=None, figura_vazia=lambda: None):
+        self.graficos = list(graficos)
+        self.versao = versao  # Função que retorna a versão atual dos dados
+        self.nome = nome
+        self.modo = modo or MODO_PADRAO
+        self.max_workers = max_workers
+        self.figura_vazia = figura_vazia
+        self._fixos = {}
+        self._versao_fixos = None
+        self._trava = threading.Lock()
+        _registro[nome] = self
+
+    def _figura_fixa(self, grafico, versao):
+        with self._trava:
+            if self._versao_fixos != versao:
+                self._fixos = {}
+                self._versao_fixos = versao
+            return self._fixos.get(grafico.nome)
+
+    def _guardar_fixa(self, grafico, versao, figura):
+        with self._trava:
+            if self._versao_fixos == versao:
+                self._fixos[grafico.nome] = figura
+
+    def _tarefa(self, indice, filtros):
+        grafico = self.graficos[indice]
+        filtros = {nome: filtros[nome] for nome in grafico.dependencias}
+        if self.modo == 'processo':
+            return partial(_montar_registrado, self.nome, indice, filtros)
+        return partial(_montar, grafico, filtros)
+
+    def executar(self, apenas=None, **filtros):
+        """Retorna as figuras de todos os gráficos, na ordem em que foram declarados.
+
+        Com `apenas` (conjunto de nomes), só esses gráficos são montados; os
+        demais voltam como None.
+        """
+        versao = self.versao()
+        figuras = [None] * len(self.graficos)
+        pendentes = []
+        for indice, grafico in enumerate(self.graficos):
+            if apenas is not None and grafico.nome not in apenas:
+                continue
+            if not grafico.dependencias:
+                figuras[indice] = self._figura_fixa(grafico, versao)
+            if figuras[indice] is None:
+                pendentes.append(indice)
+
+        montadas = executar_tarefas(
+            [self._tarefa(indice, filtros) for indice in pendentes],
+            modo=self.modo,
+            max_workers=self.max_workers,
+            em_erro=_marcar_falha,
+            geracao=(self.nome, versao)
+        )
+        for indice, figura in zip(pendentes, montadas):
+            grafico = self.graficos[indice]
+            if figura is _FALHOU:
+                figura = self.figura_vazia()
+            elif not grafico.dependencias:
+                self._guardar_fixa(grafico, versao, figura)
+            figuras[indice] = figura
+        return figuras
@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Largura (em pixels) dos gráficos de série temporal. Mais pontos do que
+# pixels não aparecem na tela, então as séries são reduzidas a esse tamanho.
+LARGURA_GRAFICO_PX = int(os.environ.get('DASH_LARGURA_GRAFICO', '1200'))
+
+
+def _numerico(x):
+    """Converte o eixo x (datas ou números) para float, para o cálculo das áreas."""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def lttb(x, y, n_pontos):
+    """Largest-Triangle-Three-Buckets: índices dos pontos que preservam a forma da série.
+
+    Mantém sempre o primeiro e o último ponto e escolhe, em cada balde, o
+    ponto que forma o maior triângulo com o ponto anterior escolhido e a
+    média do balde seguinte.
+    """
+    tamanho = len(y)
+    if n_pontos >= tamanho or n_pontos < 3:
+        return np.arange(tamanho)
+
+    x = _numerico(x)
+    y = np.asarray(y, dtype=float)
+    limites = np.linspace(1, tamanho - 1, n_pontos - 1).astype(int)
+
+    indices = np.empty(n_pontos, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = tamanho - 1
+    anterior = 0
+    for balde in range(n_pontos - 2):
+        inicio, fim = limites[balde], limites[balde + 1]
+        proximo_fim = limites[balde + 2] if balde + 2 < len(limites) else tamanho
+        media_x = x[fim:proximo_fim].mean()
+        media_y = y[fim:proximo_fim].mean()
+
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.nanargmax(areas)) if np.isfinite(areas).any() else inicio
+        indices[balde + 1] = anterior
+    return indices
+
+
+def min_max(y, n_baldes):
+    """Índices do mínimo e do máximo de cada balde (preserva picos e vales)."""
+    tamanho = len(y)
+    if 2 * n_baldes >= tamanho:
+        return np.arange(tamanho)
+
+    y = np.asarray(y, dtype=float)
+    limites = np.linspace(0, tamanho, n_baldes + 1).astype(int)
+    indices = []
+    for inicio, fim in zip(limites[:-1], limites[1:]):
+        trecho = y[inicio:fim]
+        if not np.isfinite(trecho).any():
+            indices.append(inicio)
+            continue
+        indices.append(inicio + int(np.nanargmin(trecho)))
+        indices.append(inicio + int(np.nanargmax(trecho)))
+    return np.unique(indices)
+
+
+def reduzir(df, x, y, n_pontos=None, extras=()):
+    """Reduz o dataframe a cerca de `n_pontos` linhas mantendo a forma da coluna y.
+
+    Usa LTTB na coluna y e acrescenta os mínimos/máximos das colunas `extras`,
+    para que picos dessas séries não desapareçam.
+    """
+    n_pontos = n_pontos or LARGURA_GRAFICO_PX
+    if len(df) <= n_pontos:
+        return df
+    indices = lttb(df[x].to_numpy(), df[y].to_numpy(), n_pontos)
+    for coluna in extras:
+        indices = np.union1d(indices, min_max(df[coluna].to_numpy(), n_pontos // 4))
+    return df.iloc[indices]
+
+
+def intervalo_zoom(relayout, eixo='xaxis'):
+    """Extrai o intervalo do eixo x do relayoutData de um gráfico (None se não houver zoom)."""
+    if not relayout or relayout.get(f'{eixo}.autorange'):
+        return None
+    if f'{eixo}.range[0]' in relayout:
+        inicio, fim = relayout[f'{eixo}.range[0]'], relayout[f'{eixo}.range[1]']
+    elif f'{eixo}.range' in relayout:
+        inicio, fim = relayout[f'{eixo}.range']
+    else:
+        return None
+    return pd.to_datetime(inicio), pd.to_datetime(fim)
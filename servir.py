@@ -0,0 +1,111 @@
+import argparse
+import gc
+import importlib
+import os
+import time
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # gunicorn não existe no Windows; lá só o servidor do Flask
+    BaseApplication = None
+
+
+# Painéis que podem ser servidos (módulo -> descrição)
+APPS = {
+    'lalala': 'painel de vendas (dataset_comp.csv)',
+    'aula04_B': 'análise de vendas (vendas.csv)',
+    'aula2': 'conhecimentos em linguagens',
+}
+
+# Configuração padrão, sobrescrita pelas opções da linha de comando
+BIND = os.environ.get('DASH_BIND', '0.0.0.0:8050')
+WORKERS = int(os.environ.get('DASH_WORKERS', '0')) or os.cpu_count() or 1
+THREADS = int(os.environ.get('DASH_THREADS', '4'))
+TIMEOUT = int(os.environ.get('DASH_TIMEOUT', '120'))
+
+
+def carregar_app(nome):
+    """Importa o painel (e com ele o dataset) e registra a rota /pronto.
+
+    Cada painel expõe `versao_dados()`, a versão dos dados do processo.
+
+    Chamado uma vez no processo principal, antes do fork: os workers herdam os
+    dados já carregados e compartilham essas páginas de memória (copy-on-write).
+    """
+    if nome not in APPS:
+        raise ValueError(f"App desconhecido: {nome} (opções: {', '.join(APPS)})")
+
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(nome)
+    server = modulo.app.server
+    carregado_em = time.time()
+
+    def pronto():
+        # Se a rota responde, o módulo (e o dataset) já foi carregado
+        return {
+            'status': 'pronto',
+            'app': nome,
+            'pid': os.getpid(),
+            'versao_dados': modulo.versao_dados(),
+            'carregado_em': carregado_em,
+        }
+
+    server.add_url_rule('/pronto', 'pronto', pronto)
+    print(f"{nome} carregado em {time.perf_counter() - inicio:.1f}s")
+
+    # Tira os objetos já carregados da coleta de lixo: sem isso o gc dos workers
+    # mexe nos cabeçalhos deles e copia as páginas compartilhadas
+    gc.freeze()
+    return server
+
+
+if BaseApplication is not None:
+    class ServidorGunicorn(BaseApplication):
+        """gunicorn configurado por código, com o app carregado antes do fork."""
+
+        def __init__(self, server, opcoes):
+            self._server = server
+            self._opcoes = opcoes
+            super().__init__()
+
+        def load_config(self):
+            for chave, valor in self._opcoes.items():
+                self.cfg.set(chave, valor)
+
+        def load(self):
+            return self._server
+
+
+def servir(nome, bind=BIND, workers=WORKERS, threads=THREADS, timeout=TIMEOUT):
+    server = carregar_app(nome)
+
+    if BaseApplication is None:
+        print("gunicorn não instalado: usando o servidor do Flask (1 processo, várias threads)")
+        host, porta = bind.rsplit(':', 1)
+        server.run(host=host, port=int(porta), threaded=True, debug=False)
+        return
+
+    ServidorGunicorn(server, {
+        'bind': bind,
+        'workers': workers,
+        'threads': threads,
+        'worker_class': 'gthread',
+        'timeout': timeout,
+        'preload_app': True,
+        'accesslog': '-',
+    }).run()
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description='Serve um dos painéis Dash com vários workers (gunicorn).')
+    parser.add_argument('app', choices=list(APPS), help='painel servido')
+    parser.add_argument('--bind', default=BIND, help='endereço:porta (DASH_BIND)')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='processos (DASH_WORKERS, padrão: núcleos)')
+    parser.add_argument('--threads', type=int, default=THREADS, help='threads por processo (DASH_THREADS)')
+    parser.add_argument('--timeout', type=int, default=TIMEOUT, help='segundos por requisição (DASH_TIMEOUT)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    argumentos = _argumentos()
+    servir(argumentos.app, argumentos.bind, argumentos.workers, argumentos.threads, argumentos.timeout)
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agregados import AgregadosVendas, EsbocoQuantis, Histograma, PRECISAO_QUANTIS
+
+
+def vendas(n, semente=0, valores=None):
+    rng = np.random.default_rng(semente)
+    datas = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365, n), unit='D')
+    return pd.DataFrame({
+        'produto': rng.choice(['A', 'B', 'C'], n),
+        'regiao': rng.choice(['Norte', 'Sul'], n),
+        'ano': datas.year,
+        'mes': datas.month,
+        'data': datas,
+        'dia_da_semana': datas.day_name(),
+        'valor': rng.lognormal(4, 1, n) if valores is None else valores,
+    })
+
+
+def em_blocos(df, tamanho):
+    agregados = AgregadosVendas()
+    for inicio in range(0, len(df), tamanho):
+        agregados.atualizar(df.iloc[inicio:inicio + tamanho])
+    return agregados
+
+
+@pytest.mark.parametrize('n, tamanho', [(100, 1), (700, 7), (5000, 1000), (5000, 20000)])
+def test_media_e_desvio_iguais_ao_pandas(n, tamanho):
+    df = vendas(n)
+    agregados = em_blocos(df, tamanho)
+    assert agregados.n == len(df)
+    assert agregados.media == pytest.approx(df['valor'].mean(), rel=1e-12)
+    assert agregados.desvio() == pytest.approx(df['valor'].std(), rel=1e-9)
+
+
+def test_somas_iguais_ao_pandas():
+    df = vendas(3000)
+    agregados = em_blocos(df, 256)
+    pd.testing.assert_series_equal(
+        agregados.por_produto.sort_index(), df.groupby('produto')['valor'].sum(),
+        check_names=False, check_index_type=False)
+    pd.testing.assert_series_equal(
+        agregados.serie_acumulada(), df.groupby('data')['valor'].sum().cumsum(),
+        check_names=False, check_freq=False)
+
+
+def test_combinar_blocos_processados_separadamente():
+    df = vendas(4000)
+    juntos = em_blocos(df.iloc[:1500], 100).combinar(em_blocos(df.iloc[1500:], 300))
+    assert juntos.media == pytest.approx(df['valor'].mean())
+    assert juntos.desvio() == pytest.approx(df['valor'].std())
+    assert juntos.histograma.contagens.sum() == len(df)
+
+
+@pytest.mark.parametrize('q', [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99])
+def test_quantis_dentro_da_precisao(q):
+    df = vendas(20000, semente=1)
+    agregados = em_blocos(df, 999)
+    assert agregados.quantil(q) == pytest.approx(df['valor'].quantile(q), rel=PRECISAO_QUANTIS)
+
+
+def test_quantis_com_negativos_e_zeros():
+    rng = np.random.default_rng(2)
+    valores = np.concatenate([rng.normal(-50, 10, 3000), np.zeros(500), rng.lognormal(3, 1, 3000)])
+    serie = pd.Series(rng.permutation(valores))
+    esboco = EsbocoQuantis()
+    for inicio in range(0, len(serie), 512):
+        esboco.atualizar(serie.iloc[inicio:inicio + 512])
+    for q in (0.05, 0.3, 0.5, 0.7, 0.95):
+        exato = serie.quantile(q)
+        assert esboco.quantil(q) == pytest.approx(exato, rel=PRECISAO_QUANTIS, abs=1e-12)
+
+
+def test_esboco_limita_as_caixas():
+    esboco = EsbocoQuantis(max_caixas=64)
+    esboco.atualizar(np.geomspace(1e-6, 1e6, 10000))
+    assert len(esboco.positivos) <= 64
+    assert esboco.positivos.sum() == 10000
+    # Só os valores mais perto de zero perdem precisão
+    assert esboco.quantil(0.99) == pytest.approx(np.quantile(np.geomspace(1e-6, 1e6, 10000), 0.99), rel=0.02)
+
+
+def test_histograma_limita_as_caixas_sem_perder_contagens():
+    valores = np.random.default_rng(3).uniform(0, 100000, 50000)
+    histograma = Histograma(largura=1.0, max_caixas=100)
+    for inicio in range(0, len(valores), 5000):
+        histograma.atualizar(valores[inicio:inicio + 5000])
+    assert len(histograma.contagens) <= 100
+    assert histograma.contagens.sum() == len(valores)
+
+    inicio, contagens, largura = histograma.caixas(maximo=10)
+    assert len(contagens) <= 10 and contagens.sum() == len(valores)
+    exatas, _ = np.histogram(valores, bins=np.append(inicio, inicio[-1] + largura))
+    np.testing.assert_array_equal(contagens, exatas)
+
+
+def test_agregados_vazios():
+    agregados = AgregadosVendas().atualizar(vendas(0))
+    assert agregados.n == 0
+    assert np.isnan(agregados.desvio()) and np.isnan(agregados.quantil(0.5))
+
+
+def test_bloco_sem_datas_validas_depois_da_serie_acumulada():
+    df = vendas(200)
+    agregados = em_blocos(df, 50)
+    acumulada = agregados.serie_acumulada().copy()
+    invalido = vendas(1, semente=9).assign(data=pd.NaT, ano=np.nan, mes=np.nan, dia_da_semana=np.nan)
+    agregados.atualizar(invalido)
+    assert agregados.n == 201
+    pd.testing.assert_series_equal(agregados.serie_acumulada(), acumulada)
+
+
+def test_serie_acumulada_estendida_igual_a_recalculada():
+    df = vendas(3000).sort_values('data', ignore_index=True)
+    agregados = em_blocos(df.iloc[:1000], 100)
+    agregados.serie_acumulada()
+    for inicio in range(1000, 3000, 250):
+        agregados.atualizar(df.iloc[inicio:inicio + 250])
+    pd.testing.assert_series_equal(
+        agregados.serie_acumulada(), df.groupby('data')['valor'].sum().cumsum(),
+        check_names=False, check_freq=False)
@@ -0,0 +1,179 @@
+import importlib
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from carregador import limpar_vendas, preparar_vendas
+from gera import gerar_dados_vendas
+
+pytest.importorskip('dash_core_components')
+
+
+@pytest.fixture(scope='module')
+def vendas_csv(tmp_path_factory):
+    """vendas.csv gerado, com alguns valores bem fora da faixa."""
+    pasta = tmp_path_factory.mktemp('aula04_B')
+    df = gerar_dados_vendas(5000, seed=11)
+    df.loc[::500, 'valor'] = 5000.0
+    df.loc[7::700, 'valor'] = -2000.0
+    caminho = str(pasta / 'vendas.csv')
+    df.to_csv(caminho, index=False)
+    return caminho
+
+
+@pytest.fixture(scope='module')
+def aula04_B(vendas_csv):
+    diretorio = os.getcwd()
+    os.chdir(os.path.dirname(vendas_csv))
+    try:
+        return importlib.import_module('aula04_B')
+    finally:
+        os.chdir(diretorio)
+
+
+def outliers_exatos(df):
+    q1, q3 = df['valor'].quantile(0.25), df['valor'].quantile(0.75)
+    iqr = q3 - q1
+    return df[(df['valor'] < q1 - 1.5 * iqr) | (df['valor'] > q3 + 1.5 * iqr)]
+
+
+def pontos(figura):
+    return np.sort(np.concatenate([np.asarray(traco.y, dtype=float) for traco in figura.data]))
+
+
+def test_outliers_em_memoria_usam_os_quartis_exatos(aula04_B, vendas_csv):
+    analise = aula04_B.AnalisadorDeVendas(preparar_vendas(vendas_csv), limpo=True)
+    valores = preparar_vendas(vendas_csv)['valor']
+    assert analise._quartis() == (valores.quantile(0.25), valores.quantile(0.75))
+    esperado = outliers_exatos(preparar_vendas(vendas_csv))
+    assert len(esperado)
+    np.testing.assert_array_equal(pontos(analise.analise_outliers()), np.sort(esperado['valor'].to_numpy()))
+
+
+def test_outliers_incluem_as_linhas_novas(aula04_B, vendas_csv):
+    analise = aula04_B.AnalisadorDeVendas(preparar_vendas(vendas_csv), limpo=True)
+    analise.analise_outliers()
+    novas = pd.DataFrame({'produto': ['Produto A'] * 3, 'regiao': ['Sul'] * 3,
+                          'valor': [9000.0, 100.0, 200.0], 'data': ['2024-01-01'] * 3})
+    analise.append(novas)
+    todas = pd.concat([preparar_vendas(vendas_csv), limpar_vendas(novas.copy())], ignore_index=True)
+    np.testing.assert_array_equal(pontos(analise.analise_outliers()), np.sort(outliers_exatos(todas)['valor'].to_numpy()))
+
+
+def test_streaming_usa_o_esboco_dentro_da_precisao(aula04_B, vendas_csv):
+    analise = aula04_B.AnalisadorDeVendas.de_csv_em_blocos(vendas_csv, tamanho_bloco=700)
+    valores = preparar_vendas(vendas_csv)['valor']
+    q1, q3 = analise._quartis()
+    assert q1 == pytest.approx(valores.quantile(0.25), rel=0.01)
+    assert q3 == pytest.approx(valores.quantile(0.75), rel=0.01)
+    assert analise.analise_media_desvio() == pytest.approx((valores.mean(), valores.std()))
+
+
+def acrescentar(caminho, linhas):
+    with open(caminho, 'a', encoding='utf-8') as arquivo:
+        arquivo.writelines(linha + '\n' for linha in linhas)
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_acompanhar_arquivo_com_datas_invalidas(aula04_B, vendas_csv, tmp_path, streaming):
+    caminho = str(tmp_path / 'vendas.csv')
+    with open(vendas_csv, encoding='utf-8') as origem, open(caminho, 'w', encoding='utf-8') as destino:
+        destino.write(origem.read())
+    if streaming:
+        analise = aula04_B.AnalisadorDeVendas.de_csv_em_blocos(caminho, tamanho_bloco=1000)
+    else:
+        analise = aula04_B.AnalisadorDeVendas(preparar_vendas(caminho), limpo=True)
+        analise.acompanhar_arquivo(caminho)
+    analise.vendas_acumuladas()  # monta a série acumulada antes das linhas novas
+    n = analise.agregados.n
+
+    acrescentar(caminho, ['Produto A,Sul,10.0,xx'])
+    assert analise.acompanhar_arquivo() == 1
+    acrescentar(caminho, ['Produto B,Norte,20.0,2030-01-01'])
+    assert analise.acompanhar_arquivo() == 1
+    assert analise.agregados.n == n + 2
+    assert analise.agregados.serie_acumulada().index[-1] == pd.Timestamp('2030-01-01')
+
+
+def test_linhas_voltam_a_ser_lidas_se_a_incorporacao_falhar(aula04_B, vendas_csv, tmp_path, monkeypatch):
+    caminho = str(tmp_path / 'vendas.csv')
+    with open(vendas_csv, encoding='utf-8') as origem, open(caminho, 'w', encoding='utf-8') as destino:
+        destino.write(origem.read())
+    analise = aula04_B.AnalisadorDeVendas(preparar_vendas(caminho), limpo=True)
+    analise.acompanhar_arquivo(caminho)
+    n = analise.agregados.n
+    acrescentar(caminho, ['Produto A,Sul,10.0,2030-01-01', 'Produto B,Sul,30.0,2030-01-02'])
+
+    with monkeypatch.context() as contexto:
+        def falhar(bloco):
+            raise MemoryError
+        contexto.setattr(analise.agregados, 'atualizar', falhar)
+        with pytest.raises(MemoryError):
+            analise.acompanhar_arquivo()
+    assert analise.acompanhar_arquivo() == 2
+    assert analise.agregados.n == n + 2
+    assert analise.acompanhar_arquivo() == 0
+
+
+def test_intermediario_calculado_uma_vez_com_graficos_concorrentes(aula04_B, vendas_csv):
+    analise = aula04_B.AnalisadorDeVendas(preparar_vendas(vendas_csv), limpo=True)
+    chamadas = []
+    inicio = threading.Barrier(8)
+
+    def calcular():
+        chamadas.append(1)
+        time.sleep(0.05)
+        return 'serie'
+
+    def pedir(resultados):
+        inicio.wait()
+        resultados.append(analise._intermediario('serie', calcular))
+
+    resultados = []
+    threads = [threading.Thread(target=pedir, args=(resultados,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert resultados == ['serie'] * 8 and len(chamadas) == 1
+
+    analise.append(pd.DataFrame({'produto': ['Produto A'], 'regiao': ['Sul'], 'valor': [1.0], 'data': ['2024-01-01']}))
+    analise._intermediario('serie', calcular)
+    assert len(chamadas) == 2  # versão nova dos dados, calculado de novo
+
+
+@pytest.mark.parametrize('inicio, fim', [
+    ('2024-03-10', '2024-04-20'), (None, '2024-02-01'), ('2024-05-01', None), (None, None),
+    ('2024-04-20', '2024-03-10'), ('1990-01-01', '1990-12-31'),
+])
+def test_fatia_datas_igual_ao_filtro(aula04_B, inicio, fim):
+    datas = pd.DatetimeIndex(sorted(pd.to_datetime(gerar_dados_vendas(500, seed=4)['data']).unique()))
+    a, b = aula04_B._fatia_datas(datas, inicio, fim)
+    filtro = np.ones(len(datas), dtype=bool)
+    if inicio is not None:
+        filtro &= datas >= pd.Timestamp(inicio)
+    if fim is not None:
+        filtro &= datas <= pd.Timestamp(fim)
+    assert datas[a:b].equals(datas[filtro])
+
+
+def test_vendas_diarias_no_intervalo(aula04_B, vendas_csv):
+    df = preparar_vendas(vendas_csv)
+    analise = aula04_B.AnalisadorDeVendas(df, limpo=True)
+    figura = analise.analise_vendas_diarias('2024-03-01', '2024-03-31', max_pontos=10_000)
+    dentro = df[(df['data'] >= '2024-03-01') & (df['data'] <= '2024-03-31')]
+    esperado = dentro.groupby('data')['valor'].sum()
+    traco = figura['data'][0]
+    assert pd.DatetimeIndex(traco['x']).equals(pd.DatetimeIndex(esperado.index))
+    np.testing.assert_allclose(np.asarray(traco['y'], dtype=float), esperado.to_numpy())
+
+
+def test_versao_dados_e_a_do_analisador(aula04_B, vendas_csv, monkeypatch):
+    analise = aula04_B.AnalisadorDeVendas(preparar_vendas(vendas_csv), limpo=True)
+    analise.versao = 3
+    monkeypatch.setattr(aula04_B, 'analise', analise)
+    assert aula04_B.versao_dados() == 3
@@ -0,0 +1,36 @@
+import json
+
+import numpy as np
+import plotly.graph_objs as go
+
+import aula2
+from figuras_leves import para_json
+
+
+def como_json(tracos):
+    return json.loads(para_json(go.Figure(tracos)))['data']
+
+
+def test_um_traco_por_linguagem_igual_ao_plotly():
+    figura = aula2.scarter_linguagens(['java', 'sql'])
+    esperado = [
+        go.Scatter(
+            x=list(aula2.dados_conceitos[linguagem]),
+            y=np.array(list(aula2.dados_conceitos[linguagem].values()), dtype=float),
+            mode='markers', name=linguagem.title(), showlegend=False,
+            marker={'size': 15, 'color': aula2.cores_map[linguagem]},
+        )
+        for linguagem in ['java', 'sql']
+    ]
+    assert como_json(figura['data']) == como_json(esperado)
+
+
+def test_nenhuma_linguagem_selecionada():
+    assert aula2.scarter_linguagens(None)['data'] == []
+
+
+def test_store_tem_os_tracos_de_cada_linguagem():
+    dados = aula2.dados_linguagens()
+    assert set(dados['tracos']) == set(aula2.dados_conceitos)
+    assert como_json(dados['tracos']['python']) == como_json(aula2.scarter_linguagens(['python'])['data'])
+    json.loads(para_json({'data': [], 'layout': dados['layout']}))
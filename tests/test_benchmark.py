@@ -0,0 +1,59 @@
+import sys
+
+import pytest
+
+import benchmark
+import benchmark_parser
+from benchmark import commit_atual, comparar, medir, tamanhos
+
+
+def test_tamanhos():
+    assert tamanhos('1e3,1e4,250') == [1000, 10000, 250]
+
+
+def test_commit_atual():
+    commit = commit_atual()
+    assert commit is None or (commit and ' ' not in commit)
+
+
+def test_medir_invalida_antes_de_cada_chamada():
+    chamadas = []
+    latencias, saida = medir(lambda x: x * 2, (3,), 4, invalidar=lambda: chamadas.append(1))
+    assert len(latencias) == 4 and saida == 6 and len(chamadas) == 4
+
+
+def test_comparar_conta_as_regressoes(capsys):
+    resultado = lambda cenario, p50: {'alvo': 'a', 'linhas': 1, 'cenario': cenario, 'cache': 'frio', 'p50_ms': p50}
+    base = {'commit': 'abc', 'resultados': [resultado('x', 10), resultado('y', 10), resultado('z', 0)]}
+    atual = {'resultados': [resultado('x', 13), resultado('y', 11), resultado('z', 5), resultado('novo', 1)]}
+    assert comparar(base, atual, limite=1.2) == 1
+    assert 'REGRESSÃO a/1/x/frio' in capsys.readouterr().out
+
+
+def test_pico_de_memoria_sem_resource(monkeypatch):
+    # Como no Windows: sem o módulo resource o pico de memória fica None
+    monkeypatch.setattr(benchmark, 'resource', None)
+    monkeypatch.setattr(benchmark, 'CENARIOS', {'falso': lambda modulo: ([('soma', sum, ([1, 2],))], None)})
+    monkeypatch.setattr(benchmark, 'tamanho_payload', lambda saida: 1)
+    monkeypatch.setitem(sys.modules, 'falso', object())
+    resultados = benchmark.executar_alvo('falso', 2)
+    assert [r['cache'] for r in resultados] == ['frio', 'quente']
+    assert all(r['pico_rss_mb'] is None for r in resultados)
+
+
+@pytest.mark.parametrize('nome', list(benchmark_parser.PROGRAMAS))
+def test_programas_do_benchmark_rodam(nome):
+    resultados = benchmark_parser.medir_programa(nome, 200, 2)
+    assert [r['cache'] for r in resultados] == ['frio', 'quente']
+    assert all(r['comandos'] > 0 and r['pico_memoria_mb'] >= 0 for r in resultados)
+
+
+def test_dataset_gerado_uma_vez_por_tamanho(tmp_path, monkeypatch):
+    pasta = benchmark.preparar_dataset(str(tmp_path), 'aula04_B', 500, seed=1)
+    caminho = tmp_path / 'vendas-500-s1' / 'vendas.csv'
+    assert pasta == str(tmp_path / 'vendas-500-s1') and caminho.exists()
+    assert sum(1 for _ in open(caminho, encoding='utf-8')) == 501
+
+    monkeypatch.setattr(benchmark, 'salvar_blocos', lambda *a: pytest.fail('gerou de novo'))
+    assert benchmark.preparar_dataset(str(tmp_path), 'aula04_B', 500, seed=1) == pasta
+    assert not list(tmp_path.rglob('*.tmp'))
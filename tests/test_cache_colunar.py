@@ -0,0 +1,119 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cache_colunar
+from cache_colunar import cache_valido, carregar_com_cache, ler_cache, pasta_cache, salvar_cache
+
+
+def preparar(caminho):
+    df = pd.read_csv(caminho, parse_dates=['data'])
+    df['loja'] = df['loja'].astype('category')
+    return df
+
+
+@pytest.fixture
+def csv(tmp_path):
+    caminho = str(tmp_path / 'vendas.csv')
+    pd.DataFrame({
+        'data': pd.date_range('2023-01-01', periods=50, freq='D'),
+        'loja': np.tile(['A', 'B', 'C', 'D', 'E'], 10),
+        'produto': [f'p{i % 7}' if i % 11 else None for i in range(50)],
+        'valor': np.arange(50) * 1.5,
+    }).to_csv(caminho, index=False)
+    return caminho
+
+
+@pytest.fixture
+def contar_preparos(monkeypatch):
+    chamadas = []
+
+    def contado(caminho):
+        chamadas.append(caminho)
+        return preparar(caminho)
+    monkeypatch.delenv('DASH_CACHE_COLUNAR', raising=False)
+    return contado, chamadas
+
+
+def test_ida_e_volta_igual_ao_csv(csv):
+    df = preparar(csv)
+    salvar_cache(df, csv)
+    lido = ler_cache(csv)
+    pd.testing.assert_frame_equal(lido, df, check_index_type=False)
+    assert isinstance(lido['loja'].dtype, pd.CategoricalDtype)
+    assert not [nome for nome in os.listdir(os.path.dirname(csv)) if nome.startswith('.tmp-')]
+
+
+def test_carrega_do_cache_sem_reler_o_csv(csv, contar_preparos):
+    contado, chamadas = contar_preparos
+    primeiro = carregar_com_cache(csv, contado)
+    segundo = carregar_com_cache(csv, contado)
+    assert len(chamadas) == 1
+    pd.testing.assert_frame_equal(primeiro, segundo)
+
+
+def test_csv_alterado_reconstroi(csv, contar_preparos):
+    contado, chamadas = contar_preparos
+    carregar_com_cache(csv, contado)
+    with open(csv, 'a', encoding='utf-8') as arquivo:
+        arquivo.write('2023-03-01,A,p1,999.0\n')
+    assert not cache_valido(csv)
+    assert carregar_com_cache(csv, contado)['valor'].iloc[-1] == 999.0
+    assert len(chamadas) == 2
+
+
+def test_mtime_alterado_com_mesmo_conteudo_continua_valido(csv):
+    salvar_cache(preparar(csv), csv)
+    info = os.stat(csv)
+    os.utime(csv, ns=(info.st_atime_ns, info.st_mtime_ns + 10 ** 9))
+    assert cache_valido(csv)
+
+
+def test_nova_versao_invalida_o_cache(csv, monkeypatch):
+    salvar_cache(preparar(csv), csv)
+    monkeypatch.setattr(cache_colunar, 'VERSAO_CACHE', cache_colunar.VERSAO_CACHE + 1)
+    assert not cache_valido(csv)
+
+
+def test_cache_incompleto_e_tratado_como_falta(csv):
+    salvar_cache(preparar(csv), csv)
+    os.remove(os.path.join(pasta_cache(csv), '000.npy'))
+    assert ler_cache(csv) is None
+    assert ler_cache(csv + '.inexistente') is None
+
+
+def test_varios_workers_atualizando_o_meta(csv):
+    salvar_cache(preparar(csv), csv)
+    info = os.stat(csv)
+    erros = []
+
+    def validar(deslocamento):
+        try:
+            os.utime(csv, ns=(info.st_atime_ns, info.st_mtime_ns + deslocamento))
+            for _ in range(20):
+                assert cache_valido(csv)
+        except Exception as erro:
+            erros.append(erro)
+
+    threads = [threading.Thread(target=validar, args=(i * 10 ** 9,)) for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not erros
+    assert [nome for nome in os.listdir(pasta_cache(csv)) if nome.endswith('.tmp')] == []
+
+
+def test_falha_ao_atualizar_o_meta_nao_invalida_o_cache(csv, monkeypatch):
+    salvar_cache(preparar(csv), csv)
+    info = os.stat(csv)
+    os.utime(csv, ns=(info.st_atime_ns, info.st_mtime_ns + 10 ** 9))
+
+    def falhar(origem, destino):
+        raise FileNotFoundError(origem)
+    monkeypatch.setattr(cache_colunar.os, 'replace', falhar)
+    assert cache_valido(csv)
+    assert [nome for nome in os.listdir(pasta_cache(csv)) if nome.endswith('.tmp')] == []
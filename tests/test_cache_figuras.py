@@ -0,0 +1,72 @@
+import numpy as np
+import plotly.graph_objs as go
+
+import cache_figuras
+from cache_figuras import CacheFiguras, chave_filtros, normalizar_filtro
+
+
+def test_filtros_equivalentes_geram_a_mesma_chave():
+    assert normalizar_filtro(None) is None
+    assert normalizar_filtro('todas_categorias') is None
+    assert normalizar_filtro([]) is None
+    assert normalizar_filtro(['JAN', 'ano_completo']) is None
+    assert normalizar_filtro(['MAR', 'JAN']) == normalizar_filtro(('JAN', 'MAR')) == ('JAN', 'MAR')
+    assert chave_filtros('visual01', 1, None, ['FEV', 'JAN']) == chave_filtros('visual01', 1, 'todas_categorias', ['JAN', 'FEV'])
+    assert chave_filtros('visual01', 1, 'Ana') != chave_filtros('visual01', 2, 'Ana')
+
+
+def test_lru_descarta_a_entrada_menos_usada():
+    cache = CacheFiguras(max_itens=2, ttl=None)
+    cache.guardar('a', 1)
+    cache.guardar('b', 2)
+    assert cache.obter('a') == 1
+    cache.guardar('c', 3)
+    assert cache.obter('b') is None
+    assert (cache.obter('a'), cache.obter('c')) == (1, 3)
+    assert cache.estatisticas()['remocoes'] == 1
+
+
+def test_entrada_vencida_e_descartada(monkeypatch):
+    agora = [100.0]
+    monkeypatch.setattr(cache_figuras.time, 'monotonic', lambda: agora[0])
+    cache = CacheFiguras(ttl=10)
+    cache.guardar('a', 1)
+    agora[0] += 5
+    assert cache.obter('a') == 1
+    agora[0] += 11
+    assert cache.obter('a') is None
+    assert cache.estatisticas()['expiracoes'] == 1
+
+
+def test_obter_figura_monta_uma_vez_e_devolve_copias():
+    cache = CacheFiguras()
+    chamadas = []
+
+    def construir():
+        chamadas.append(1)
+        return go.Figure(go.Bar(x=['a', 'b'], y=np.array([1.0, 2.0])))
+
+    primeira = cache.obter_figura('k', construir)
+    primeira['layout']['title'] = 'alterado'
+    primeira['data'][0]['name'] = 'alterado'
+    segunda = cache.obter_figura('k', construir)
+
+    assert len(chamadas) == 1
+    assert segunda['data'][0]['x'] == ['a', 'b'] and segunda['data'][0]['y'] == primeira['data'][0]['y']
+    assert 'title' not in segunda['layout'] and 'name' not in segunda['data'][0]
+    assert cache.estatisticas()['acertos'] == 1
+
+
+def test_tupla_com_falha_nao_e_guardada():
+    cache = CacheFiguras()
+    figuras = cache.obter_figura('k', lambda: ({'data': [], 'layout': {}}, None))
+    assert figuras == ({'data': [], 'layout': {}}, {})
+    assert cache.obter('k') is None
+
+
+def test_invalidar():
+    cache = CacheFiguras()
+    cache.obter_figura('k', lambda: {'data': [], 'layout': {}})
+    cache.invalidar()
+    assert cache.obter('k') is None
+    assert cache.estatisticas()['invalidacoes'] == 1
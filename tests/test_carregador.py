@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from carregador import carregar_particoes, categorizar, preparar_dataset_comp, preparar_vendas, tabela_codigos
+from gera import gerar_particionado
+
+
+@pytest.fixture
+def csv_comp(tmp_path):
+    caminho = tmp_path / 'dataset_comp.csv'
+    caminho.write_text(
+        'Cliente,Categorias,dt_Venda,Loja,Produto,Total Vendas\n'
+        'Ana,Roupas,2023-01-15,Santos,Camiseta,10.5\n'
+        'Bruno,Calçados,2023-02-01,Salvador,Tênis,20\n'
+        'Ana,Roupas,2023-12-31,Santos,Calça,30\n'
+        ',,2023-02-10,Santos,,5\n',
+        encoding='utf-8')
+    return str(caminho)
+
+
+@pytest.fixture
+def csv_vendas(tmp_path):
+    caminho = tmp_path / 'vendas.csv'
+    caminho.write_text(
+        'produto,regiao,valor,data\n'
+        'Produto B,Sul,"10,5",2024-03-02\n'
+        'Produto A,Norte,20,2024-01-01\n'
+        ',Sul,30,2024-01-05\n'
+        'Produto A,Leste,,2024-01-06\n'
+        'Produto C,Oeste,40,2024-02-10\n',
+        encoding='utf-8')
+    return str(caminho)
+
+
+def test_dataset_comp_com_dimensoes_categoricas(csv_comp):
+    df = preparar_dataset_comp(csv_comp)
+    for coluna in ['Cliente', 'Categorias', 'Mes', 'Loja', 'Produto']:
+        assert isinstance(df[coluna].dtype, pd.CategoricalDtype), coluna
+    assert df['Mes'].astype(str).tolist() == ['JAN', 'FEB', 'DEC', 'FEB']
+    assert df['Cliente'].isna().sum() == 1
+    assert df['Total Vendas'].sum() == pytest.approx(65.5)
+
+
+def test_vendas_limpas(csv_vendas):
+    df = preparar_vendas(csv_vendas)
+    assert df['produto'].astype(str).tolist() == ['Produto B', 'Produto A', 'Produto C']
+    assert df['valor'].tolist() == [10.5, 20.0, 40.0]
+    assert df[['mes', 'ano', 'dia']].iloc[0].tolist() == [3, 2024, 2]
+    assert isinstance(df['regiao'].dtype, pd.CategoricalDtype)
+
+
+def test_tabela_codigos_e_categorizar():
+    df = categorizar(pd.DataFrame({'loja': ['b', 'a', 'b'], 'valor': [1, 2, 3]}), ['loja', 'inexistente'])
+    assert isinstance(df['loja'].dtype, pd.CategoricalDtype)
+    assert tabela_codigos(df) == {'loja': {0: 'a', 1: 'b'}}
+    codigos = df['loja'].cat.codes.tolist()
+    assert [tabela_codigos(df)['loja'][codigo] for codigo in codigos] == ['b', 'a', 'b']
+    assert categorizar(df, ['loja']) is df
+
+
+def test_carregar_particoes_so_abre_as_do_intervalo(tmp_path, monkeypatch):
+    pasta = str(tmp_path / 'particionado')
+    gerar_particionado(4000, pasta, shards=2, processos=1, seed=3, hoje='2024-06-30')
+    completo = carregar_particoes(pasta)
+    assert len(completo) == 4000
+
+    abertos = []
+    ler_csv = pd.read_csv
+    monkeypatch.setattr(pd, 'read_csv', lambda caminho, *a, **k: abertos.append(caminho) or ler_csv(caminho, *a, **k))
+    parte = carregar_particoes(pasta, '2024-03-10', '2024-04-20')
+    assert abertos and all(('mes=03' in caminho or 'mes=04' in caminho) for caminho in abertos)
+    dentro = completo[(completo['data'] >= '2024-03-10') & (completo['data'] <= '2024-04-20')]
+    pd.testing.assert_frame_equal(parte.reset_index(drop=True), dentro.reset_index(drop=True), check_categorical=False)
@@ -0,0 +1,51 @@
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+
+import figuras_leves
+from figuras_leves import Esqueleto, coluna, com, para_json, tracos_por_serie, vazio
+
+
+def test_esqueleto_monta_uma_vez_por_chave():
+    chamadas = []
+
+    def construir(tema):
+        chamadas.append(tema)
+        return go.Figure(go.Bar(x=[1], y=[1]), layout={'title': {'text': tema}})
+
+    esqueleto = Esqueleto(construir)
+    assert esqueleto('claro') is esqueleto('claro')
+    esqueleto('escuro')
+    assert chamadas == ['claro', 'escuro']
+    assert esqueleto.traco('claro')['type'] == 'bar'
+    assert esqueleto.layout('escuro')['title']['text'] == 'escuro'
+
+
+def test_com_nao_altera_a_base():
+    base = {'type': 'bar', 'x': [1]}
+    copia = com(base, x=[2])
+    assert copia == {'type': 'bar', 'x': [2]} and base['x'] == [1]
+
+
+def test_coluna_e_vazio():
+    assert coluna(pd.Series(['a', 'b'], dtype='category')).dtype == object
+    assert vazio(np.array([1]), []) and not vazio([1], pd.Series([2]))
+
+
+def test_tracos_por_serie_igual_ao_plotly():
+    dados = {'Norte': {'A': 1.0, 'B': 2.0}, 'Sul': {'A': 3.0}}
+    tracos = tracos_por_serie(dados, ['Norte', 'Sul'], cores={'Sul': 'red'})
+    esperado = [
+        go.Scatter(mode='markers', x=['A', 'B'], y=np.array([1.0, 2.0]), name='Norte'),
+        go.Scatter(mode='markers', x=['A'], y=np.array([3.0]), name='Sul', marker={'color': 'red'}),
+    ]
+    assert json.loads(para_json(go.Figure(tracos))) == json.loads(para_json(go.Figure(esperado)))
+
+
+def test_tracos_passam_para_webgl_acima_do_limite():
+    dados = {'s': {i: float(i) for i in range(figuras_leves.LIMITE_WEBGL + 1)}}
+    assert tracos_por_serie(dados, ['s'])[0]['type'] == 'scattergl'
+    assert tracos_por_serie(dados, ['s'], limite_webgl=10 ** 6)[0]['type'] == 'scatter'
+    assert tracos_por_serie(dados, None) == []
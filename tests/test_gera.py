@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import gera
+from gera import gerar_blocos, gerar_dados_vendas, gerar_particionado, salvar_blocos, valores_dimensao
+
+GERA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gera.py')
+
+
+def test_mesma_semente_gera_os_mesmos_dados():
+    primeiro = gerar_dados_vendas(2000, seed=7, tamanho_bloco=300)
+    segundo = gerar_dados_vendas(2000, seed=7, tamanho_bloco=300)
+    pd.testing.assert_frame_equal(primeiro, segundo)
+    assert not primeiro.equals(gerar_dados_vendas(2000, seed=8, tamanho_bloco=300))
+
+
+def test_linha_de_comando_com_semente_e_reprodutivel(tmp_path):
+    saidas = []
+    for nome in ['a.csv', 'b.csv']:
+        subprocess.run([sys.executable, GERA, '--seed', '7', '--linhas', '500', '--saida', nome],
+                       cwd=tmp_path, check=True, capture_output=True)
+        saidas.append((tmp_path / nome).read_bytes())
+    assert saidas[0] == saidas[1]
+
+
+def test_data_de_referencia():
+    df = gerar_dados_vendas(5000, seed=1)
+    assert df['data'].max() <= pd.Timestamp(gera.DATA_REFERENCIA)
+    assert df['data'].min() >= pd.Timestamp(gera.DATA_REFERENCIA) - pd.Timedelta(days=365)
+
+    df = gerar_dados_vendas(5000, seed=1, hoje='2020-06-30')
+    assert df['data'].max() <= pd.Timestamp('2020-06-30') and df['data'].dt.year.min() == 2019
+
+
+def test_blocos_limitados_e_esquemas():
+    tamanhos = [len(bloco) for bloco in gerar_blocos(2500, tamanho_bloco=1000, seed=3)]
+    assert tamanhos == [1000, 1000, 500]
+    comp = gerar_dados_vendas(100, seed=3, esquema='comp')
+    assert comp.columns.tolist() == ['Cliente', 'Categorias', 'dt_Venda', 'Loja', 'Produto', 'Total Vendas']
+    assert gerar_dados_vendas(0, seed=3).columns.tolist() == ['produto', 'regiao', 'valor', 'data']
+
+
+def test_cardinalidade_e_assimetria():
+    assert valores_dimensao(['a', 'b', 'c'], 'X', 2) == ['a', 'b']
+    assert valores_dimensao(['a'], 'X', 3) == ['a', 'X 2', 'X 3']
+
+    df = gerar_dados_vendas(20000, seed=4, cardinalidades={'produto': 50}, assimetria=1.5)
+    contagens = df['produto'].value_counts()
+    assert len(df['produto'].cat.categories) == 50
+    assert contagens.index[0] == 'Produto A' and contagens.iloc[0] > 0.3 * len(df)
+    uniforme = gerar_dados_vendas(20000, seed=4, cardinalidades={'produto': 50})['produto'].value_counts()
+    assert uniforme.iloc[0] < 0.05 * len(df)
+
+
+@pytest.mark.parametrize('formato', ['csv', 'parquet'])
+def test_salvar_blocos_igual_ao_dataframe(tmp_path, formato):
+    if formato == 'parquet':
+        pytest.importorskip('pyarrow')
+    caminho = str(tmp_path / f'vendas.{formato}')
+    total = salvar_blocos(gerar_blocos(2500, tamanho_bloco=1000, seed=5), caminho, formato)
+    assert total == 2500
+    lido = pd.read_csv(caminho, parse_dates=['data']) if formato == 'csv' else pd.read_parquet(caminho)
+    esperado = gerar_dados_vendas(2500, seed=5, tamanho_bloco=1000)
+    pd.testing.assert_frame_equal(lido, esperado, check_categorical=False, check_dtype=False)
+
+
+def ler_pasta(pasta):
+    arquivos = {}
+    for raiz, _, nomes in os.walk(pasta):
+        for nome in nomes:
+            caminho = os.path.join(raiz, nome)
+            with open(caminho, 'rb') as arquivo:
+                arquivos[os.path.relpath(caminho, pasta)] = arquivo.read()
+    return arquivos
+
+
+def test_particionado_depende_so_da_semente_e_dos_shards(tmp_path):
+    pastas = []
+    for processos in [1, 3]:
+        pasta = str(tmp_path / f'processos{processos}')
+        gerar_particionado(3000, pasta, shards=4, processos=processos, seed=7, tamanho_bloco=500)
+        pastas.append(ler_pasta(pasta))
+    assert pastas[0] == pastas[1]
+
+
+def test_manifesto_descreve_as_particoes(tmp_path):
+    pasta = str(tmp_path / 'dados')
+    manifesto = gerar_particionado(3000, pasta, shards=3, processos=2, seed=2)
+    assert manifesto['linhas'] == 3000
+    assert sum(shard['linhas'] for shard in manifesto['shards']) == 3000
+    for particao in manifesto['particoes']:
+        parte = pd.read_csv(os.path.join(pasta, particao['arquivo']), parse_dates=['data'])
+        assert len(parte) == particao['linhas']
+        assert (parte['data'].dt.year == particao['ano']).all() and (parte['data'].dt.month == particao['mes']).all()
+        assert parte['valor'].min() == particao['valor_min'] and parte['valor'].max() == particao['valor_max']
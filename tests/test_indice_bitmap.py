@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indice_bitmap import IndiceBitmap, aplicar, combinar
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'loja': ['A', 'B', 'A', 'C', 'B', 'A'],
+        'categoria': pd.Categorical(['x', 'y', 'x', 'y', 'x', 'y'], categories=['x', 'y', 'z']),
+        'valor': [1, 2, 3, 4, 5, 6],
+    })
+
+
+def test_bitmaps_iguais_as_mascaras(df):
+    indice = IndiceBitmap(df['loja'])
+    assert sorted(indice.valores()) == ['A', 'B', 'C']
+    for valor in indice.valores():
+        np.testing.assert_array_equal(indice.bitmap(valor), (df['loja'] == valor).to_numpy())
+    assert not indice.bitmap('D').any()
+
+
+def test_categoria_sem_linhas_nao_e_indexada(df):
+    assert IndiceBitmap(df['categoria']).valores() == ['x', 'y']
+
+
+def test_filtrar(df):
+    indice = IndiceBitmap(df['loja'])
+    assert indice.filtrar(None) is None
+    assert indice.filtrar(['A', 'B', 'C']) is None
+    assert indice.filtrar(['A', 'B', 'C', 'D']) is None
+    np.testing.assert_array_equal(indice.filtrar('B'), df['loja'].eq('B').to_numpy())
+    np.testing.assert_array_equal(indice.filtrar(['A', 'C']), df['loja'].isin(['A', 'C']).to_numpy())
+    assert not indice.filtrar(['D']).any()
+    assert not indice.filtrar([]).any()
+
+
+def test_bitmaps_compartilhados_sao_somente_leitura(df):
+    bitmap = IndiceBitmap(df['loja']).filtrar('A')
+    with pytest.raises(ValueError):
+        bitmap[0] = False
+
+
+def test_combinar_e_aplicar(df):
+    lojas = IndiceBitmap(df['loja'])
+    categorias = IndiceBitmap(df['categoria'])
+    assert combinar(None, None) is None
+    assert aplicar(df, None) is df
+
+    mascara = combinar(lojas.filtrar(['A', 'B']), None, categorias.filtrar('x'))
+    esperado = df[df['loja'].isin(['A', 'B']) & (df['categoria'] == 'x')]
+    pd.testing.assert_frame_equal(aplicar(df, mascara), esperado)
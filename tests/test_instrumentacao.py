@@ -0,0 +1,72 @@
+import os
+
+import pytest
+from flask import Flask
+
+import instrumentacao
+
+
+@pytest.fixture
+def ativo(monkeypatch):
+    monkeypatch.setattr(instrumentacao, 'ATIVO', True)
+    instrumentacao.zerar()
+    yield
+    instrumentacao.zerar()
+
+
+def test_desligado_devolve_a_propria_funcao(monkeypatch):
+    monkeypatch.setattr(instrumentacao, 'ATIVO', False)
+
+    def callback():
+        return 1
+
+    assert instrumentacao.instrumentar_callback('x')(callback) is callback
+    with instrumentacao.etapa('filtro') as medida:
+        medida.linhas = 10
+    assert instrumentacao.etapa('filtro') is instrumentacao.etapa('outra')
+
+
+def test_histograma_cumulativo():
+    histograma = instrumentacao.Histograma((1, 10))
+    for valor in (0.5, 5, 50):
+        histograma.observar(valor)
+    assert histograma.contagens == [1, 2]
+    assert histograma.total == 3 and histograma.soma == 55.5
+
+
+def test_etapas_e_linhas_por_callback(ativo):
+    @instrumentacao.instrumentar_callback('grafico')
+    def callback(n):
+        with instrumentacao.etapa('filtro') as medida:
+            medida.linhas = n
+        return n
+
+    callback(3)
+    callback(4)
+    texto = instrumentacao.metricas_prometheus()
+    worker = os.getpid()
+    assert f'dash_callback_duracao_segundos_count{{worker="{worker}",callback="grafico",etapa="total"}} 2' in texto
+    assert f'dash_callback_duracao_segundos_count{{worker="{worker}",callback="grafico",etapa="filtro"}} 2' in texto
+    assert f'dash_callback_linhas_total{{worker="{worker}",callback="grafico",etapa="filtro"}} 7' in texto
+
+
+def test_rota_mede_o_corpo_enviado(ativo):
+    app = Flask(__name__)
+    instrumentacao.registrar_rota(app)
+
+    @app.route('/callback')
+    @instrumentacao.instrumentar_callback('rota')
+    def rota():
+        return 'x' * 1234
+
+    cliente = app.test_client()
+    assert cliente.get('/callback').status_code == 200
+    resposta = cliente.get('/metrics')
+    assert resposta.content_type.startswith('text/plain')
+    texto = resposta.get_data(as_text=True)
+    assert 'callback="rota",etapa="serializacao"} 1' in texto
+    assert f'dash_callback_resposta_bytes_sum{{worker="{os.getpid()}",callback="rota"}} 1234' in texto
+
+
+def test_rotulos_escapados():
+    assert instrumentacao._rotulos(callback='a"b\\c\n') == '{callback="a\\"b\\\\c\\n"}'
@@ -0,0 +1,124 @@
+import importlib
+import json
+import os
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+from plotly.utils import PlotlyJSONEncoder
+
+from gera import gerar_dados_vendas
+
+pytest.importorskip('dash_bootstrap_templates')
+
+
+@pytest.fixture(scope='module')
+def lalala(tmp_path_factory):
+    """O painel carregado sobre um dataset gerado, com linhas sem Cliente, Produto ou Categorias."""
+    pasta = tmp_path_factory.mktemp('lalala')
+    df = gerar_dados_vendas(3000, seed=5, esquema='comp')
+    for coluna, passo in [('Cliente', 37), ('Produto', 41), ('Categorias', 43)]:
+        df[coluna] = df[coluna].astype(object)
+        df.loc[::passo, coluna] = None
+    caminho = str(pasta / 'dataset_comp.csv')
+    df.to_csv(caminho, index=False)
+
+    diretorio = os.getcwd()
+    os.chdir(pasta)
+    try:
+        modulo = importlib.import_module('lalala')
+    finally:
+        os.chdir(diretorio)
+    modulo.arquivo_dados = caminho
+    return modulo
+
+
+def top5_direto(df, cliente=None, meses=None, categoria=None):
+    """O TOP5 do visual01 calculado direto nas linhas, sem o cubo."""
+    filtro = pd.Series(True, index=df.index)
+    if cliente is not None:
+        filtro &= df['Cliente'] == cliente
+    if meses and 'ano_completo' not in meses:
+        filtro &= df['Mes'].isin(meses)
+    if categoria not in (None, 'todas_categorias'):
+        filtro &= df['Categorias'] == categoria
+    grupos = df[filtro].groupby(['Produto', 'Categorias'], observed=True)['Total Vendas'].sum()
+    return np.sort(grupos.to_numpy())[::-1][:5]
+
+
+def test_cubo_mantem_o_total_das_linhas_sem_dimensao(lalala):
+    df, cubo = lalala.dados.df, lalala.dados.cubo
+    assert df[['Cliente', 'Produto', 'Categorias']].isna().any().all()
+    assert cubo['Total Vendas'].sum() == pytest.approx(df['Total Vendas'].sum())
+    assert len(cubo) < len(df)
+
+
+@pytest.mark.parametrize('cliente, meses, categoria', [
+    (None, None, None),
+    ('Ana', None, None),
+    (None, ['JAN', 'FEB'], None),
+    ('Bruno', ['MAR'], 'Roupas'),
+    (None, ['ano_completo'], 'todas_categorias'),
+    ('Cliente inexistente', None, None),
+])
+def test_visual01_igual_ao_calculo_nas_linhas(lalala, cliente, meses, categoria):
+    figura = lalala.criar_visual01(cliente, meses, categoria, True)
+    y = figura['data'][0]['y'] if figura['data'] else []
+    esperado = top5_direto(lalala.dados.df, cliente, meses, categoria)
+    np.testing.assert_allclose(np.sort(np.asarray(y, dtype=float))[::-1], esperado)
+
+
+@pytest.mark.parametrize('modo', ['sequencial', 'thread', 'processo'])
+def test_visual02_03_em_paralelo_igual_ao_sequencial(lalala, monkeypatch, modo):
+    if modo == 'processo' and not hasattr(os, 'fork'):
+        pytest.skip('o modo processo depende do fork')
+    import paralelo
+    esperado = (lalala.criar_visual02('Roupas', True), lalala.criar_visual03(['JAN'], 'Roupas', True))
+    monkeypatch.setattr(paralelo, 'MODO_PADRAO', modo)
+    fig2, fig3 = lalala.criar_visual02_03(['JAN'], 'Roupas', True)
+    for figura, referencia in zip((fig2, fig3), esperado):
+        np.testing.assert_allclose(
+            np.asarray(figura['data'][0].get('y', figura['data'][0].get('r')), dtype=float),
+            np.asarray(referencia['data'][0].get('y', referencia['data'][0].get('r')), dtype=float))
+
+
+def test_tarefas_do_pool_nao_levam_os_dados(lalala):
+    import pickle
+    tarefa = partial(lalala._montar_no_pool, 'visual03', lalala.dados.versao, ['JAN'], 'Roupas', True)
+    assert len(pickle.dumps(tarefa)) < 500
+    with pytest.raises(RuntimeError):
+        lalala._montar_no_pool('visual02', lalala.dados.versao + 1, 'Roupas', True)
+
+
+def test_cubo_do_cliente_conta_as_linhas_sem_categoria(lalala):
+    df = lalala.dados.df
+    assert df['Categorias'].isna().any()
+    cubo = lalala.dados_cubo_cliente(lalala.dados.cubo)
+    linhas = pd.DataFrame(cubo['linhas'])
+    assert (linhas['categoria'] == -1).any()
+    assert (linhas[['mes', 'loja']] >= 0).all().all()
+
+    # "todas as categorias" soma também as linhas sem categoria, como o groupby do servidor
+    linhas['Mes'] = [cubo['meses'][codigo] for codigo in linhas['mes']]
+    linhas['Loja'] = [cubo['lojas'][codigo] for codigo in linhas['loja']]
+    no_cliente = linhas.groupby(['Mes', 'Loja'])['total'].sum().sort_index()
+    no_servidor = df.groupby(['Mes', 'Loja'], observed=True)['Total Vendas'].sum()
+    no_servidor.index = no_servidor.index.map(lambda chave: tuple(map(str, chave)))
+    np.testing.assert_allclose(no_cliente.to_numpy(), no_servidor.sort_index().to_numpy())
+    assert list(no_cliente.index) == list(no_servidor.sort_index().index)
+
+
+def test_versao_dados_acompanha_a_recarga(lalala, monkeypatch):
+    monkeypatch.setattr(lalala, 'dados', lalala.dados._replace(versao=7))
+    assert lalala.versao_dados() == 7
+
+
+@pytest.mark.parametrize('ligado', [True, False])
+def test_config_temas_igual_ao_template_do_servidor(lalala, ligado):
+    # O navegador troca o template pelo config_temas: tem de dar o mesmo que o servidor montaria
+    como_json = lambda objeto: json.loads(json.dumps(objeto, cls=PlotlyJSONEncoder))
+    config = como_json(lalala.config_temas)
+    figura = como_json(lalala.visual01(None, None, None, ligado))
+    tema = config['temas'][0][0 if ligado else 1]
+    assert figura['layout']['template'] == config['templates'][tema]
@@ -0,0 +1,76 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+import lote
+from lote import executar_lote, executar_programa, ler_programas
+
+
+_executar_programa = lote.executar_programa
+
+
+def derrubar(tarefa):
+    """executar_programa que mata o processo no programa 'mata'."""
+    if tarefa[0] == 'mata':
+        os._exit(1)
+    return _executar_programa(tarefa)
+
+
+def programas(n):
+    return [(f'p{i}', {'codigo': f'definir a como {i}\nmostrar a * 2'}) for i in range(n)]
+
+
+def test_resultados_na_ordem_da_entrada():
+    resultados = list(executar_lote(programas(50), processos=2, tamanho_bloco=7))
+    assert [r['id'] for r in resultados] == [f'p{i}' for i in range(50)]
+    assert all(r['ok'] for r in resultados)
+    assert resultados[10]['saida'] == '20\n' and resultados[10]['variaveis'] == {'a': 10}
+    json.dumps(resultados)
+
+
+def test_erro_guarda_as_variaveis_parciais():
+    resultado = executar_programa(('p', {'codigo': 'definir a como 3\ndefinir b como a / 0'}, 1000, 0))
+    assert not resultado['ok'] and resultado['erro']['tipo'] == 'ErroExecucao'
+    assert resultado['variaveis']['a'] == 3
+
+
+def test_jsonl_com_linhas_invalidas(tmp_path):
+    entrada = tmp_path / 'programas.jsonl'
+    entrada.write_text(
+        '{"id": "a", "codigo": "mostrar 1"}\n'
+        '{"id": "b", "codigo": \n'
+        '\n'
+        '{"id": "c"}\n'
+        '[1, 2]\n'
+        '{"codigo": "mostrar 2"}\n',
+        encoding='utf-8')
+    resultados = list(executar_lote(ler_programas(str(entrada)), processos=1))
+    assert [r['id'] for r in resultados] == ['a', 2, 'c', 5, 6]
+    assert [r['ok'] for r in resultados] == [True, False, False, False, True]
+    for resultado in resultados[1:4]:
+        assert resultado['erro']['tipo'] == 'EntradaInvalida'
+        assert resultado['variaveis'] is None and resultado['saida'] == ''
+    assert 'falta "codigo"' in resultados[2]['erro']['mensagem']
+    assert resultados[4]['saida'] == '2\n'
+
+
+def test_pasta_de_programas(tmp_path):
+    (tmp_path / 'b.txt').write_text('mostrar 2', encoding='utf-8')
+    (tmp_path / 'a.txt').write_text('mostrar 1', encoding='utf-8')
+    resultados = list(executar_lote(ler_programas(str(tmp_path)), processos=1))
+    assert [(r['id'], r['saida']) for r in resultados] == [('a.txt', '1\n'), ('b.txt', '2\n')]
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='o executar_programa trocado só chega aos processos com fork')
+def test_processo_derrubado_so_afeta_o_proprio_programa(monkeypatch):
+    monkeypatch.setattr(lote, 'executar_programa', derrubar)
+    entrada = programas(60)
+    entrada.insert(23, ('mata', {'codigo': 'mostrar 1'}))
+    resultados = list(executar_lote(entrada, processos=3, tamanho_bloco=5))
+
+    assert [r['id'] for r in resultados] == [identificador for identificador, _ in entrada]
+    falhas = [r for r in resultados if not r['ok']]
+    assert [(r['id'], r['erro']['tipo']) for r in falhas] == [('mata', 'ProcessoEncerrado')]
@@ -0,0 +1,76 @@
+import contextvars
+import os
+import threading
+import time
+from functools import partial
+
+import pytest
+
+import paralelo
+from paralelo import executar_tarefas, obter_pool, usar_pool
+
+MODOS = ['sequencial', 'thread', pytest.param('processo', marks=pytest.mark.skipif(
+    not hasattr(os, 'fork'), reason='o modo processo depende do fork'))]
+
+_contexto = contextvars.ContextVar('contexto', default=None)
+
+
+def dobrar(valor):
+    time.sleep(0.01 * (valor % 3))
+    return valor * 2
+
+
+def quebrar(valor):
+    if valor == 3:
+        raise ValueError('três')
+    return valor
+
+
+def encerrar_processo():
+    os._exit(1)
+
+
+def anotar(indice, erro):
+    return ('erro', indice, type(erro).__name__)
+
+
+@pytest.mark.parametrize('modo', MODOS)
+def test_resultados_na_ordem_das_tarefas(modo):
+    tarefas = [partial(dobrar, valor) for valor in range(10)]
+    assert executar_tarefas(tarefas, modo=modo, max_workers=3) == [valor * 2 for valor in range(10)]
+
+
+@pytest.mark.parametrize('modo', MODOS)
+def test_erro_em_uma_tarefa_nao_afeta_as_outras(modo):
+    tarefas = [partial(quebrar, valor) for valor in range(5)]
+    resultados = executar_tarefas(tarefas, modo=modo, max_workers=2, em_erro=anotar)
+    assert resultados == [0, 1, 2, ('erro', 3, 'ValueError'), 4]
+
+
+def test_threads_rodam_no_contexto_de_quem_chamou():
+    _contexto.set('callback')
+    resultados = executar_tarefas([_contexto.get, _contexto.get], modo='thread')
+    assert resultados == ['callback', 'callback']
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='o modo processo depende do fork')
+def test_processo_encerrado_descarta_o_pool_quebrado():
+    tarefas = [partial(dobrar, 1), encerrar_processo, partial(dobrar, 2)]
+    resultados = executar_tarefas(tarefas, modo='processo', max_workers=2, em_erro=anotar)
+    assert resultados[1] == ('erro', 1, 'BrokenProcessPool')
+    # a próxima chamada recebe um pool novo
+    assert executar_tarefas([partial(dobrar, 4), partial(dobrar, 5)], modo='processo', max_workers=2) == [8, 10]
+
+
+def test_pool_aposentado_so_encerra_depois_das_tarefas_em_andamento():
+    liberar = threading.Event()
+    with usar_pool('thread', 2, geracao=None) as pool:
+        futuro = pool.submit(liberar.wait, 5)
+        # Outra chamada aposenta o pool (ex.: pool quebrado) enquanto este bloco ainda o usa
+        paralelo._descartar_quebrado('thread', 2, pool)
+        assert obter_pool('thread', 2) is not pool
+        assert pool.submit(int, '7').result() == 7  # ainda aceita tarefas
+        liberar.set()
+        assert futuro.result() is True
+    with pytest.raises(RuntimeError):
+        pool.submit(int, '1')  # encerrado quando o último uso terminou
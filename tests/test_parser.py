@@ -0,0 +1,174 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import parser
+from parser import ErroExecucao, ErroSintaxe, LimiteExcedido, Saida, compilar, executar, executar_fluxo
+
+
+def rodar(codigo, **opcoes):
+    """Executa o código e devolve (linhas mostradas, variáveis)."""
+    saida = io.StringIO()
+    variaveis = executar(compilar(codigo), saida=saida, **opcoes)
+    return saida.getvalue().splitlines(), variaveis
+
+
+@pytest.mark.parametrize('expressao, esperado', [
+    ('2 + 3 * 4', '14'),
+    ('(2 + 3) * 4', '20'),
+    ('10 - 4 - 3', '3'),
+    ('7 / 2', '3.5'),
+    ('7 % 4 * 2', '6'),
+    ('-2 * 3', '-6'),
+    ('1 + 2 == 3', 'verdadeiro'),
+    ('1 < 2 e 3 < 2', 'falso'),
+    ('falso e falso ou verdadeiro', 'verdadeiro'),
+    ('verdadeiro ou verdadeiro e falso', 'verdadeiro'),
+    ('não falso e falso', 'falso'),
+    ('"a" + 1 + 2', 'a12'),
+    ('"ab" * 3', 'ababab'),
+])
+def test_precedencia(expressao, esperado):
+    assert rodar(f'mostrar {expressao}')[0] == [esperado]
+
+
+def test_precedencia_com_variaveis_igual_a_constantes():
+    # O dobramento de constantes não pode mudar o resultado
+    codigo = 'definir a como 2\ndefinir b como 3\nmostrar a + b * 4 - (a + b) * 4'
+    assert rodar(codigo)[0] == rodar('mostrar 2 + 3 * 4 - (2 + 3) * 4')[0] == ['-6']
+
+
+def test_se_senao_aninhados():
+    codigo = '\n'.join([
+        'definir i como 0',
+        'enquanto i < 6 faça',
+        '    se i % 2 == 0 então',
+        '        se i < 3 então',
+        '            mostrar "par pequeno"',
+        '        senão',
+        '            mostrar "par grande"',
+        '        fim',
+        '    senão',
+        '        mostrar i',
+        '    fim',
+        '    definir i como i + 1',
+        'fim',
+        'mostrar "fim"',
+    ])
+    linhas, variaveis = rodar(codigo)
+    assert linhas == ['par pequeno', '1', 'par pequeno', '3', 'par grande', '5', 'fim']
+    assert variaveis == {'i': 6}
+
+
+def test_comandos_de_uma_linha():
+    linhas, _ = rodar('definir n como 3\nenquanto n > 0 faça definir n como n - 1\nse n == 0 então mostrar "zero"')
+    assert linhas == ['zero']
+
+
+def test_fluxo_igual_ao_compilado():
+    codigo = 'definir i como 0\nenquanto i < 3 faça\nmostrar i\ndefinir i como i + 1\nfim\nmostrar "ok"'
+    saida = io.StringIO()
+    variaveis = executar_fluxo(io.StringIO(codigo), saida=saida)
+    assert (saida.getvalue().splitlines(), variaveis) == rodar(codigo)
+
+
+def test_limite_de_instrucoes():
+    with pytest.raises(LimiteExcedido, match='Linha 4: mais de 1000 instruções'):
+        rodar('definir i como 0\nenquanto verdadeiro faça\ndefinir i como i + 1\nfim', limite=1000)
+
+
+def test_limite_de_instrucoes_vale_para_o_fluxo_inteiro():
+    # Cada laço sozinho cabe no limite, mas os dois juntos não
+    laco = 'definir i como 0\nenquanto i < 5 faça\ndefinir i como i + 1\nfim\n'
+    executar_fluxo(io.StringIO(laco), limite=100, saida=io.StringIO())
+    with pytest.raises(LimiteExcedido):
+        executar_fluxo(io.StringIO(laco * 4), limite=100, saida=io.StringIO())
+
+
+@pytest.mark.parametrize('codigo, linha', [
+    ('mostrar 1\nmostrar (1 + 2', 2),
+    ('mostrar 1\nmostrar 1 +', 2),
+    ('definir x 1', 1),
+    ('mostrar 1\nmostrar 2\nsenão', 3),
+    ('mostrar 1\nfim', 2),
+    ('se verdadeiro então\nmostrar 1', 1),
+    ('mostrar 1 @ 2', 1),
+])
+def test_erro_de_sintaxe_informa_a_linha(codigo, linha):
+    with pytest.raises(ErroSintaxe, match=f'^Linha {linha}:'):
+        compilar(codigo)
+
+
+@pytest.mark.parametrize('codigo, linha', [
+    ('definir a como 1\nmostrar b', 2),
+    ('definir a como 1\n\nmostrar a / 0', 3),
+    ('definir a como "x"\nmostrar a - 1', 2),
+    ('definir i como 0\nenquanto i < 3 faça\ndefinir i como i + 1\nfim\nmostrar 1 / (i - 3)', 5),
+])
+def test_erro_de_execucao_informa_a_linha(codigo, linha):
+    with pytest.raises(ErroExecucao, match=f'^Linha {linha}:'):
+        rodar(codigo)
+
+
+def test_erro_de_execucao_guarda_as_variaveis():
+    with pytest.raises(ErroExecucao) as erro:
+        rodar('definir a como 3\ndefinir b como a * 2\ndefinir c como b / 0')
+    assert erro.value.variaveis == {'a': 3, 'b': 6}
+
+
+def test_textos_e_inteiros_grandes_viram_erro():
+    with pytest.raises(ErroExecucao, match='texto com mais de'):
+        rodar('definir a como "x" * 1000000000000')
+    with pytest.raises(ErroExecucao, match='inteiro com mais de'):
+        rodar('definir a como 2\nenquanto verdadeiro faça definir a como a * a')
+
+
+def test_cache_de_programas_com_threads(monkeypatch):
+    monkeypatch.setattr(parser, 'LIMITE_CACHE', 8)
+    monkeypatch.setattr(parser, '_programas', {})
+    codigos = [f'definir x como {i}\nmostrar x' for i in range(200)] * 4
+
+    with ThreadPoolExecutor(8) as pool:
+        programas = list(pool.map(compilar, codigos))
+
+    assert len(parser._programas) <= 8
+    assert [rodar(codigo)[0] for codigo in codigos[:3]] == [['0'], ['1'], ['2']]
+    assert [executar(programa, saida=io.StringIO())['x'] for programa in programas[:3]] == [0, 1, 2]
+    assert compilar(codigos[-1]) is compilar(codigos[-1])
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def entregas(codigo, destino, entrada=None):
+    """Executa o código em fluxo e devolve os blocos de texto entregues ao destino."""
+    blocos = []
+    escrever = destino.write
+    destino.write = lambda texto: blocos.append(texto) or escrever(texto)
+    executar_fluxo(entrada or io.StringIO(codigo), saida=destino)
+    return blocos
+
+
+def test_saida_junta_as_linhas_em_blocos():
+    blocos = []
+    with Saida(blocos.append, tamanho_buffer=8) as saida:
+        for linha in ('abc', 'def', 'g'):
+            saida.escrever(linha)
+        assert blocos == ['abc\ndef\n']
+    assert blocos == ['abc\ndef\n', 'g\n']
+
+
+def test_fluxo_em_arquivo_entrega_no_fim():
+    assert entregas('mostrar 1\nmostrar 2\n', io.StringIO()) == ['1\n2\n']
+
+
+def test_fluxo_em_terminal_entrega_a_cada_comando():
+    codigo = 'mostrar 1\ndefinir i como 0\nenquanto i < 2 faça\n    mostrar i\n    definir i como i + 1\nfim\n'
+    assert entregas(codigo, Terminal()) == ['1\n', '0\n1\n']
+
+
+def test_entrada_em_terminal_liga_o_modo_interativo():
+    assert entregas('', io.StringIO(), entrada=Terminal('mostrar 1\nmostrar 2\n')) == ['1\n', '2\n']
@@ -0,0 +1,67 @@
+import os
+import threading
+
+import pytest
+
+from planejador import Grafico, PlanejadorDeGraficos
+
+
+def criar_planejador(nome, chamadas, versao, modo='thread'):
+    def construir(rotulo):
+        def montar(filtros):
+            with trava:
+                chamadas.append(rotulo)
+            if filtros.get('produto') == 'quebra':
+                raise ValueError('falhou')
+            return {'grafico': rotulo, 'filtros': filtros}
+        return montar
+
+    trava = threading.Lock()
+    return PlanejadorDeGraficos([
+        Grafico('produtos', construir('produtos'), ('produto',)),
+        Grafico('regioes', construir('regioes'), ('regiao',)),
+        Grafico('fixo', construir('fixo'), ()),
+    ], versao=lambda: versao[0], nome=nome, modo=modo, figura_vazia=lambda: 'vazia')
+
+
+def test_cada_grafico_recebe_so_os_seus_filtros():
+    planejador = criar_planejador('filtros', [], [0])
+    produtos, regioes, fixo = planejador.executar(produto='A', regiao='Sul', ano=2024)
+    assert produtos == {'grafico': 'produtos', 'filtros': {'produto': 'A'}}
+    assert regioes == {'grafico': 'regioes', 'filtros': {'regiao': 'Sul'}}
+    assert fixo == {'grafico': 'fixo', 'filtros': {}}
+
+
+def test_grafico_sem_dependencias_montado_uma_vez_por_versao():
+    chamadas, versao = [], [0]
+    planejador = criar_planejador('fixos', chamadas, versao)
+    for produto in ['A', 'B', 'C']:
+        planejador.executar(produto=produto, regiao='Sul')
+    assert chamadas.count('fixo') == 1 and chamadas.count('produtos') == 3
+    versao[0] = 1
+    planejador.executar(produto='A', regiao='Sul')
+    assert chamadas.count('fixo') == 2
+
+
+def test_falha_em_um_grafico_nao_afeta_os_outros(capsys):
+    planejador = criar_planejador('falha', [], [0])
+    produtos, regioes, fixo = planejador.executar(produto='quebra', regiao='Sul')
+    assert produtos == 'vazia'
+    assert regioes['grafico'] == 'regioes' and fixo['grafico'] == 'fixo'
+    assert 'falhou' in capsys.readouterr().out
+
+
+def test_apenas_os_graficos_pedidos():
+    chamadas = []
+    planejador = criar_planejador('apenas', chamadas, [0])
+    figuras = planejador.executar(apenas={'regioes'}, produto='A', regiao='Sul')
+    assert figuras[0] is None and figuras[2] is None and figuras[1]['grafico'] == 'regioes'
+    assert chamadas == ['regioes']
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='o modo processo depende do fork')
+def test_modo_processo_encontra_os_graficos_pelo_registro():
+    planejador = criar_planejador('processo', [], [0], modo='processo')
+    produtos, regioes, fixo = planejador.executar(produto='A', regiao='Norte')
+    assert produtos['filtros'] == {'produto': 'A'} and regioes['filtros'] == {'regiao': 'Norte'}
+    assert fixo['grafico'] == 'fixo'
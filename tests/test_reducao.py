@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from reducao import intervalo_zoom, lttb, min_max, reduzir
+
+
+def serie(n, semente=0):
+    rng = np.random.default_rng(semente)
+    return pd.DataFrame({
+        'data': pd.date_range('2020-01-01', periods=n, freq='h'),
+        'valor': rng.normal(0, 1, n).cumsum(),
+        'pico': rng.normal(0, 1, n),
+    })
+
+
+@pytest.mark.parametrize('n, n_pontos', [(10000, 1000), (1001, 1000), (5000, 3), (777, 50)])
+def test_lttb_mantem_extremos_e_quantidade(n, n_pontos):
+    df = serie(n)
+    indices = lttb(df['data'].to_numpy(), df['valor'].to_numpy(), n_pontos)
+    assert len(indices) == n_pontos
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert (np.diff(indices) > 0).all()
+
+
+def test_lttb_nao_reduz_series_pequenas():
+    df = serie(100)
+    np.testing.assert_array_equal(lttb(df['data'], df['valor'], 100), np.arange(100))
+    np.testing.assert_array_equal(lttb(df['data'], df['valor'], 500), np.arange(100))
+
+
+def test_lttb_mantem_um_pico_isolado():
+    y = np.zeros(10000)
+    y[4321] = 100
+    assert 4321 in lttb(np.arange(10000), y, 200)
+
+
+def test_lttb_aceita_nan():
+    df = serie(3000)
+    df.loc[100:400, 'valor'] = np.nan
+    indices = lttb(df['data'].to_numpy(), df['valor'].to_numpy(), 300)
+    assert len(indices) == 300 and indices[-1] == 2999
+
+
+def test_min_max_mantem_minimo_e_maximo_de_cada_balde():
+    y = serie(1000)['pico'].to_numpy()
+    indices = min_max(y, 10)
+    for balde in np.array_split(np.arange(1000), 10):
+        assert balde[np.argmin(y[balde])] in indices
+        assert balde[np.argmax(y[balde])] in indices
+
+
+def test_reduzir_inclui_picos_dos_extras():
+    df = serie(20000)
+    df.loc[12345, 'pico'] = 1000
+    reduzido = reduzir(df, 'data', 'valor', n_pontos=500, extras=['pico'])
+    assert len(reduzido) >= 500
+    assert reduzido['data'].is_monotonic_increasing
+    assert 12345 in reduzido.index
+    assert len(reduzir(df.iloc[:100], 'data', 'valor', n_pontos=500)) == 100
+
+
+@pytest.mark.parametrize('relayout, esperado', [
+    (None, None),
+    ({'xaxis.autorange': True}, None),
+    ({'yaxis.range[0]': 1, 'yaxis.range[1]': 2}, None),
+    ({'xaxis.range[0]': '2020-01-02', 'xaxis.range[1]': '2020-01-05 12:00'},
+     (pd.Timestamp('2020-01-02'), pd.Timestamp('2020-01-05 12:00'))),
+    ({'xaxis.range': ['2020-01-02', '2020-01-03']}, (pd.Timestamp('2020-01-02'), pd.Timestamp('2020-01-03'))),
+])
+def test_intervalo_zoom(relayout, esperado):
+    assert intervalo_zoom(relayout) == esperado
@@ -0,0 +1,20 @@
+import gc
+
+import pytest
+
+import servir
+
+
+def test_app_desconhecido():
+    with pytest.raises(ValueError, match='App desconhecido'):
+        servir.carregar_app('inexistente')
+
+
+def test_pronto_informa_a_versao_dos_dados():
+    server = servir.carregar_app('aula2')
+    gc.unfreeze()
+    resposta = server.test_client().get('/pronto')
+    assert resposta.status_code == 200
+    corpo = resposta.get_json()
+    assert corpo['status'] == 'pronto' and corpo['app'] == 'aula2'
+    assert corpo['versao_dados'] == 0